@@ -29,7 +29,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobs.middleware.RequestIdMiddleware',
+    'jobs.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'jobs.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -43,10 +46,15 @@ AUTH_USER_MODEL = 'jobs.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'jobs.authentication.LazyJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'jobs.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 25,  # Adjust as needed
+    'MAX_PAGE_SIZE': int(os.getenv('MAX_PAGE_SIZE', '100')),
 }
 
 # JWT Settings
@@ -56,6 +64,10 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+# Seconds between reloads of the ids of disabled users, which
+# jobs.authentication checks instead of loading the user on every request
+JWT_REVOCATION_CACHE_SECONDS = int(os.getenv('JWT_REVOCATION_CACHE_SECONDS', '30'))
+
 ROOT_URLCONF = 'job_board.urls'
 
 TEMPLATES = [
@@ -90,6 +102,76 @@ DATABASES = {
     }
 }
 
+# Local and test runs can use SQLite instead of MySQL (DB_ENGINE=sqlite)
+if os.getenv('DB_ENGINE', 'mysql') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock at BEGIN: concurrent writers then wait instead of
+        # failing with "database is locked" when a read transaction upgrades
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+        # A file (not shared-cache memory) so concurrent test writers wait on locks
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+
+
+# Response compression (jobs.middleware.CompressionMiddleware): Brotli when the
+# client accepts it and the brotli package is installed, gzip otherwise
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+
+
+# Cache: Redis (REDIS_URL) in production, local memory otherwise
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Serialized jobs and listing pages (seconds); stale entries are served for
+# JOB_CACHE_GRACE more seconds while one request refreshes them.
+JOB_CACHE_TIMEOUT = int(os.getenv('JOB_CACHE_TIMEOUT', '60'))
+JOB_CACHE_GRACE = int(os.getenv('JOB_CACHE_GRACE', '30'))
+
+# Bulk job imports: rows per bulk_create/transaction (and the most a request
+# may ask for with ?batch_size=), and error rows reported
+JOB_IMPORT_BATCH_SIZE = int(os.getenv('JOB_IMPORT_BATCH_SIZE', '1000'))
+JOB_IMPORT_MAX_BATCH_SIZE = int(os.getenv('JOB_IMPORT_MAX_BATCH_SIZE', '5000'))
+JOB_IMPORT_MAX_ERRORS = int(os.getenv('JOB_IMPORT_MAX_ERRORS', '1000'))
+
+# Rows fetched per keyset batch by streaming exports
+JOB_EXPORT_CHUNK_SIZE = int(os.getenv('JOB_EXPORT_CHUNK_SIZE', '2000'))
+
+
+# Background tasks (jobs.tasks), run by `python manage.py run_tasks`: tasks
+# claimed per batch, seconds a claim lasts, and attempts before a task is
+# parked (retried after JOB_TASK_RETRY_DELAY seconds, doubled per attempt).
+# JOB_TASKS_EAGER=True runs them in the writing process instead (no worker).
+JOB_TASK_BATCH_SIZE = int(os.getenv('JOB_TASK_BATCH_SIZE', '100'))
+JOB_TASK_LEASE = int(os.getenv('JOB_TASK_LEASE', '300'))
+JOB_TASK_MAX_ATTEMPTS = int(os.getenv('JOB_TASK_MAX_ATTEMPTS', '5'))
+JOB_TASK_RETRY_DELAY = int(os.getenv('JOB_TASK_RETRY_DELAY', '10'))
+JOB_TASKS_EAGER = os.getenv('JOB_TASKS_EAGER', 'False') == 'True'
+
+# Mail (new application notifications): printed to the console unless
+# EMAIL_BACKEND points at SMTP (EMAIL_HOST, EMAIL_PORT, ...)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@jobboard.local')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -112,12 +194,59 @@ AUTH_PASSWORD_VALIDATORS = [
 
 
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'jobs.hashers.ConfigurableBCryptSHA256PasswordHasher',
     'django.contrib.auth.hashers.BCryptPasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
 ]
 
+# bcrypt work factor; existing hashes are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+# Password verification pool: threads (default: CPU count), extra queued
+# logins before answering 503 (default: 4 per thread), and wait timeout
+LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', '0')) or None
+LOGIN_HASH_QUEUE = int(os.getenv('LOGIN_HASH_QUEUE')) if os.getenv('LOGIN_HASH_QUEUE') else None
+LOGIN_HASH_TIMEOUT = float(os.getenv('LOGIN_HASH_TIMEOUT', '5'))
+
+
+
+# Request metrics (/metrics). METRICS_TOKEN, when set, must be sent as a Bearer
+# token by the scraper. METRICS_SLOW_REQUEST_MS enables the slow-request log.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS', '0')) or None
+
+
+# Logging: JSON lines written by a background thread (jobs.log), tagged with
+# the request id. LOG_QUEUE_SIZE bounds memory; records beyond it are dropped.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'jobs.log.RequestIdFilter'},
+    },
+    'handlers': {
+        'queue': {
+            '()': 'jobs.log.QueueListenerHandler',
+            'stream': 'ext://sys.stderr',
+            'queue_size': int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+            'filters': ['request_id'],
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'jobs': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
 
 
 # Internationalization
@@ -2,5 +2,9 @@ from django.contrib import admin
 from .models import *
 
 admin.site.register(User)
+admin.site.register(Company)
+admin.site.register(Location)
+admin.site.register(Category)
 admin.site.register(Job)
-admin.site.register(JobApplication)
\ No newline at end of file
+admin.site.register(JobApplication)
+admin.site.register(Task)
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+    Native async versions of the read endpoints, for ASGI deployments
+    (e.g. `uvicorn job_board.asgi:application`). They accept the same
+    parameters and return the same payloads, cache entries and validators
+    (ETag / Last-Modified) as the DRF views in views.py: both build their
+    payloads with reads.py and conditional.py. Those are sync (cache lock
+    waits, search backends with raw cursors), so they run through
+    sync_to_async; the owner applications query is awaited on the async ORM.
+"""
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import condition, require_GET
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from .authentication import LazyJWTAuthentication
+from .conditional import job_etag, job_last_modified, jobs_etag, jobs_last_modified
+from .facets import FacetError, requested_facets
+from .geo import GeoError
+from .models import Job, JobApplication
+from .pagination import PaginationError, get_page_number, get_page_size
+from .reads import job_detail as read_job_detail, jobs_page, search_facets, search_page
+from .search import SearchQuery
+from .serializers import FieldSelectionError, JobFieldset, application_values, application_row_to_dict
+from functools import wraps
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+_jwt = LazyJWTAuthentication()
+
+
+async def aauthenticate(request):
+    """
+        Validate the Bearer token (pure CPU) and return a LazyUser without
+        querying the users table. Returns None when no valid credentials are
+        present.
+    """
+    header = _jwt.get_header(request)
+    raw_token = _jwt.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    return await _jwt.aget_user(_jwt.get_validated_token(raw_token))
+
+
+def async_authenticated(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await aauthenticate(request)
+        except AuthenticationFailed as auth_error:
+            logger.info("Async view: invalid credentials: %s", auth_error)
+            user = None
+        if user is None:
+            return JsonResponse({
+                "success": False,
+                "message": "Authentication credentials were not provided or are invalid."
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """
+        django.views.decorators.http.condition for async views. condition()
+        calls the validators on the event loop, where they can't query; here
+        Django's own checks run through sync_to_async around a stand-in view.
+    """
+    def decorator(view):
+        @condition(etag_func=etag_func, last_modified_func=last_modified_func)
+        def check(request, *args, **kwargs):
+            # Preconditions passed: carries the validators to the real response
+            return HttpResponse()
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            checked = await sync_to_async(check)(request, *args, **kwargs)
+            if checked.status_code != status.HTTP_200_OK:
+                # 304 Not Modified or 412 Precondition Failed
+                return checked
+            response = await view(request, *args, **kwargs)
+            for header in ("ETag", "Last-Modified"):
+                if checked.has_header(header) and not response.has_header(header):
+                    response.headers[header] = checked.headers[header]
+            return response
+        return wrapper
+    return decorator
+
+
+def error_response(message, status_code):
+    return JsonResponse({"success": False, "message": message}, status=status_code)
+
+
+@require_GET
+@async_authenticated
+@async_condition(etag_func=jobs_etag, last_modified_func=jobs_last_modified)
+async def jobs_list(request):
+    try:
+        page_size = get_page_size(request.GET)
+        fieldset = JobFieldset.from_params(request.GET)
+    except (PaginationError, FieldSelectionError) as params_error:
+        return error_response(str(params_error), status.HTTP_400_BAD_REQUEST)
+
+    page = await sync_to_async(jobs_page)(request.GET.get("cursor"), page_size, fieldset)
+    if page is None:
+        return error_response("Jobs not found!", status.HTTP_404_NOT_FOUND)
+    return JsonResponse({
+        "success": True,
+        "message": "Jobs found successfully!",
+        "data": page["data"],
+        "next": page["next"]
+    })
+
+
+@require_GET
+@async_authenticated
+@async_condition(etag_func=job_etag, last_modified_func=job_last_modified)
+async def job_detail(request, job_id):
+    try:
+        fieldset = JobFieldset.from_params(request.GET)
+    except FieldSelectionError as fields_error:
+        return error_response(str(fields_error), status.HTTP_400_BAD_REQUEST)
+
+    job_dict = await sync_to_async(read_job_detail)(job_id, fieldset)
+    if not job_dict:
+        return error_response("Job not found!", status.HTTP_404_NOT_FOUND)
+    return JsonResponse({"success": True, "data": job_dict})
+
+
+@require_GET
+@async_authenticated
+@async_condition(etag_func=jobs_etag, last_modified_func=jobs_last_modified)
+async def search_jobs(request):
+    try:
+        page = get_page_number(request.GET)
+        page_size = get_page_size(request.GET)
+        fieldset = JobFieldset.from_params(request.GET)
+        facet_columns, facet_size = requested_facets(request.GET)
+        query = SearchQuery.from_params(request.GET)
+    except (PaginationError, FieldSelectionError, FacetError, GeoError) as params_error:
+        return error_response(str(params_error), status.HTTP_400_BAD_REQUEST)
+
+    results = await sync_to_async(search_page)(query, page, page_size, fieldset)
+    if not results["data"]:
+        return error_response("No jobs found matching search criteria.", status.HTTP_404_NOT_FOUND)
+    payload = {
+        "success": True,
+        "message": "Jobs found successfully!",
+        "data": results["data"],
+        "page": page,
+        "next_page": page + 1 if results["has_next"] else None
+    }
+    if facet_columns:
+        payload["facets"] = await sync_to_async(search_facets)(query, facet_columns, facet_size)
+    return JsonResponse(payload)
+
+
+@require_GET
+@async_authenticated
+async def job_applications_by_owner(request, job_id):
+    posted_by_id = await Job.objects.filter(id=job_id).values_list("posted_by_id", flat=True).afirst()
+    if posted_by_id is None:
+        return error_response("Job not found!", status.HTTP_404_NOT_FOUND)
+    if posted_by_id != request.user.id:
+        return error_response(
+            "You are not authorized to view applications for this job.", status.HTTP_403_FORBIDDEN
+        )
+
+    applications_list = [
+        application_row_to_dict(row)
+        async for row in application_values(JobApplication.objects.filter(job_id=job_id))
+    ]
+    if not applications_list:
+        return error_response("Job doesn't have applications yet!", status.HTTP_404_NOT_FOUND)
+    return JsonResponse({
+        "success": True,
+        "message": "Job applications found successfully!",
+        "data": applications_list
+    })
@@ -0,0 +1,161 @@
+"""
+    JWT authentication without a database query per request.
+
+    simplejwt's JWTAuthentication loads the User row before the view runs,
+    although most views only need request.user.id. LazyJWTAuthentication
+    validates the token (pure CPU) and returns a LazyUser: `id` and `pk` come
+    from the token claims, and the row is loaded on first access to any other
+    attribute (e.g. is_staff for IsAdminUser, or assigning it to a foreign
+    key). Tokens issued by `issue_tokens` also carry the user's names, so
+    views that only echo who the user is don't need the row either.
+
+    Disabled (is_active=False) users are rejected through a per-process set of
+    revoked ids, reloaded with one query at most every
+    JWT_REVOCATION_CACHE_SECONDS. Saves and deletes of users update it at once
+    in the process that made them (see signals.py); other processes notice
+    deactivations on their next reload, and deletions when the token expires,
+    so deactivate users rather than deleting them.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+import threading
+import time
+
+
+class RevokedUsers:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._inactive = frozenset()
+            self._deleted = frozenset()
+            self._loaded_at = None
+
+    def _expired(self):
+        timeout = getattr(settings, "JWT_REVOCATION_CACHE_SECONDS", 30)
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= timeout
+
+    def _store(self, ids):
+        with self._lock:
+            self._inactive = frozenset(ids)
+            self._loaded_at = time.monotonic()
+
+    def _inactive_users(self):
+        return get_user_model().objects.filter(is_active=False).values_list("id", flat=True)
+
+    def is_revoked(self, user_id):
+        if self._expired():
+            self._store(self._inactive_users())
+        return user_id in self._inactive or user_id in self._deleted
+
+    async def ais_revoked(self, user_id):
+        if self._expired():
+            self._store([pk async for pk in self._inactive_users()])
+        return user_id in self._inactive or user_id in self._deleted
+
+    def user_saved(self, user_id, is_active):
+        with self._lock:
+            if is_active:
+                self._inactive = self._inactive - {user_id}
+            else:
+                self._inactive = self._inactive | {user_id}
+            self._deleted = self._deleted - {user_id}
+
+    def user_deleted(self, user_id):
+        with self._lock:
+            self._deleted = self._deleted | {user_id}
+
+
+revoked_users = RevokedUsers()
+
+# Copied from the refresh token into every access token derived from it
+NAME_CLAIMS = ("first_name", "other_names")
+
+
+def issue_tokens(user):
+    refresh = RefreshToken.for_user(user)
+    for claim in NAME_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    return refresh
+
+
+def user_names(user):
+    """
+        (first_name, other_names) of the authenticated user, without loading
+        a LazyUser's row.
+    """
+    if type(user) is LazyUser:
+        return user.names()
+    return user.first_name, user.other_names
+
+
+class LazyUser(SimpleLazyObject):
+    """
+        The authenticated user, known by id until something needs the row.
+        isinstance(lazy_user, User) is True, at the cost of loading it.
+    """
+    def __init__(self, user_id, claims=None):
+        self.__dict__["_user_id"] = user_id
+        self.__dict__["_claims"] = claims or {}
+        super().__init__(lambda: get_user_model().objects.get(pk=user_id))
+
+    @property
+    def id(self):
+        return self._user_id
+
+    @property
+    def pk(self):
+        return self._user_id
+
+    # Checked by permissions and throttles on every request; answered without the row
+    is_authenticated = True
+    is_anonymous = False
+
+    def __bool__(self):
+        return True
+
+    def names(self):
+        # Tokens issued before the name claims existed: two columns, not the row
+        if all(claim in self._claims for claim in NAME_CLAIMS):
+            return tuple(self._claims[claim] for claim in NAME_CLAIMS)
+        return get_user_model().objects.filter(pk=self._user_id).values_list(*NAME_CLAIMS).get()
+
+
+class LazyJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if jwt_settings.CHECK_REVOKE_TOKEN or jwt_settings.USER_ID_FIELD != "id":
+            # Comparing the password hash (or looking up another field) needs the row
+            return super().get_user(validated_token)
+        user_id = self.claimed_user_id(validated_token)
+        if jwt_settings.CHECK_USER_IS_ACTIVE and revoked_users.is_revoked(user_id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return LazyUser(user_id, self.name_claims(validated_token))
+
+    async def aget_user(self, validated_token):
+        """
+            get_user for async views. The LazyUser must not be hydrated there
+            (the ORM load is synchronous): read only its id.
+        """
+        user_id = self.claimed_user_id(validated_token)
+        if jwt_settings.CHECK_USER_IS_ACTIVE and await revoked_users.ais_revoked(user_id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return LazyUser(user_id, self.name_claims(validated_token))
+
+    def name_claims(self, validated_token):
+        return {claim: validated_token[claim] for claim in NAME_CLAIMS if claim in validated_token}
+
+    def claimed_user_id(self, validated_token):
+        try:
+            return get_user_model()._meta.pk.to_python(validated_token[jwt_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError):
+            raise InvalidToken(_("Token contained no recognizable user identification"))
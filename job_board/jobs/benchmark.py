@@ -0,0 +1,235 @@
+"""
+    In-process benchmark of every route in jobs/urls.py.
+
+    Each scenario drives one route and method with concurrent clients
+    (django.test.Client, one per thread, through the full middleware stack,
+    no network) and reports req/s, p50/p95/p99 latency and SQL queries per
+    request (read from the Server-Timing header set by MetricsMiddleware).
+    Results are plain dicts, so they can be written as JSON and compared with
+    a stored baseline.
+"""
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlencode
+from .authentication import issue_tokens
+from .dimensions import intern_jobs
+from .geo import locate_job
+from .loadtest import summarize
+from .models import DIMENSION_MODELS, User, Job, JobApplication
+from .seeding import SEED_PASSWORD, WORDS
+import json
+import re
+import threading
+import time
+import uuid
+
+
+_queries_re = re.compile(r'desc="(\d+) queries"')
+
+
+class BenchmarkContext:
+    """
+        Users, tokens and row ids the scenarios point at, created on top of
+        the seeded data.
+    """
+    def __init__(self, sample_size=1000):
+        self.run = uuid.uuid4().hex[:8]
+        self.started = timezone.now()
+        password = make_password(SEED_PASSWORD)
+        self.owner = User.objects.create(
+            username=f"bench_owner_{self.run}", email=f"bench_owner_{self.run}@example.com",
+            first_name="Bench", other_names="Owner", password=password, is_staff=True,
+        )
+        self.applicant = User.objects.create(
+            username=f"bench_applicant_{self.run}", email=f"bench_applicant_{self.run}@example.com",
+            first_name="Bench", other_names="Applicant", password=password,
+        )
+        self.token = str(issue_tokens(self.owner).access_token)
+        self.applicant_token = str(issue_tokens(self.applicant).access_token)
+
+        self.job = Job.objects.create(
+            title="Benchmark Developer", company="Bench", location="Maputo",
+            description="Benchmark job with applications.", category="IT", posted_by=self.owner,
+        )
+        self.application = JobApplication.objects.create(job=self.job, applicant=self.applicant, cover_letter="Benchmark")
+        others = User.objects.exclude(id__in=[self.owner.id, self.applicant.id]).order_by("id")
+        for applicant_id in others.values_list("id", flat=True)[:20]:
+            JobApplication.objects.create(job=self.job, applicant_id=applicant_id, cover_letter="Benchmark")
+
+        self.job_ids = list(Job.objects.order_by("-id").values_list("id", flat=True)[:sample_size])
+        self.pool = []
+
+    def fresh_jobs(self, count):
+        """
+            `count` new jobs owned by the benchmark owner, for scenarios that
+            consume one job per request (apply, update, delete).
+        """
+        first = Job.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        jobs = [
+            Job(title=f"Benchmark pool {number}", company="Bench", location="Maputo",
+                description="Benchmark pool job.", category="IT", posted_by=self.owner)
+            for number in range(count)
+        ]
+        intern_jobs(jobs, DIMENSION_MODELS)
+        for job in jobs:
+            locate_job(job)
+        Job.objects.bulk_create(jobs)
+        self.pool = list(Job.objects.filter(id__gt=first, posted_by=self.owner).order_by("id").values_list("id", flat=True))
+
+
+@dataclass
+class Scenario:
+    route: str
+    method: str
+    # (context, request number) -> {"path": ..., "data": ..., "content_type": ...}
+    build: Callable
+    expected: tuple = (200,)
+    prepare: Optional[Callable] = None
+    token: str = "owner"
+
+    @property
+    def name(self):
+        return f"{self.method} {self.route}"
+
+
+def _json(payload):
+    return {"data": json.dumps(payload), "content_type": "application/json"}
+
+
+def _job_payload(number):
+    return {
+        "title": f"Benchmark Developer {number}", "company": "Bench", "location": "Maputo",
+        "description": "Created by the benchmark.", "category": "IT",
+    }
+
+
+SCENARIOS = (
+    Scenario("login", "POST", lambda c, n: dict(
+        path="/auth/login", **_json({"identifier": c.owner.email, "password": SEED_PASSWORD})
+    ), token=None),
+    Scenario("register_user", "POST", lambda c, n: dict(path="/auth/register_user", **_json({
+        "first_name": "Bench", "other_names": "User", "email": f"bench_{c.run}_{n}@example.com",
+        "username": f"bench_{c.run}_{n}", "password": SEED_PASSWORD,
+    })), expected=(201,), token=None),
+    Scenario("jobs", "GET", lambda c, n: dict(path="/jobs")),
+    Scenario("jobs", "POST", lambda c, n: dict(path="/jobs", **_json(_job_payload(n))), expected=(201,)),
+    Scenario("import_jobs", "POST", lambda c, n: dict(
+        path="/jobs/import",
+        data="\n".join(json.dumps(_job_payload(f"{n}.{row}")) for row in range(10)),
+        content_type="application/x-ndjson",
+    ), expected=(201,)),
+    Scenario("job_detail", "GET", lambda c, n: dict(path=f"/jobs/{c.job_ids[n % len(c.job_ids)]}")),
+    Scenario("job_detail", "PUT", lambda c, n: dict(
+        path=f"/jobs/{c.pool[n]}", **_json({"title": f"Updated {n}"})
+    ), prepare=lambda c, total: c.fresh_jobs(total)),
+    Scenario("job_detail", "DELETE", lambda c, n: dict(path=f"/jobs/{c.pool[n]}"),
+             prepare=lambda c, total: c.fresh_jobs(total)),
+    Scenario("apply_for_job", "POST", lambda c, n: dict(
+        path=f"/jobs/{c.pool[n]}/apply", **_json({"cover_letter": "Benchmark application."})
+    ), expected=(201,), prepare=lambda c, total: c.fresh_jobs(total), token="applicant"),
+    Scenario("applications_for_job_owner", "GET", lambda c, n: dict(path=f"/jobs/{c.job.id}/applications/owner")),
+    Scenario("my_applications", "GET", lambda c, n: dict(path="/applications/mine"), token="applicant"),
+    Scenario("application_detail", "GET", lambda c, n: dict(path=f"/applications/{c.application.id}")),
+    Scenario("search_jobs", "GET", lambda c, n: dict(path=f"/search?keywords={WORDS[n % len(WORDS)]}"),
+             expected=(200, 404)),
+    Scenario("owner_dashboard", "GET", lambda c, n: dict(path="/dashboard/jobs")),
+    Scenario("export", "GET", lambda c, n: dict(path="/export/jobs?" + urlencode({"since": c.started.isoformat()}))),
+    Scenario("async_jobs", "GET", lambda c, n: dict(path="/async/jobs")),
+    Scenario("async_job_detail", "GET", lambda c, n: dict(path=f"/async/jobs/{c.job_ids[n % len(c.job_ids)]}")),
+    Scenario("async_applications_for_job_owner", "GET",
+             lambda c, n: dict(path=f"/async/jobs/{c.job.id}/applications/owner")),
+    Scenario("async_search_jobs", "GET", lambda c, n: dict(path=f"/async/search?keywords={WORDS[n % len(WORDS)]}"),
+             expected=(200, 404)),
+    Scenario("cache_stats", "GET", lambda c, n: dict(path="/cache/stats")),
+    Scenario("metrics", "GET", lambda c, n: dict(path="/metrics"), token=None),
+)
+
+
+def run_scenario(scenario, context, total, concurrency):
+    if scenario.prepare:
+        scenario.prepare(context, total)
+    cache.clear()
+
+    token = {"owner": context.token, "applicant": context.applicant_token}.get(scenario.token)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    numbers = iter(range(total))
+    lock = threading.Lock()
+    latencies, queries, statuses = [], [], {}
+    errors = [0]
+
+    def worker():
+        client = Client(raise_request_exception=False)
+        local_latencies, local_queries, local_errors = [], [], 0
+        try:
+            while True:
+                with lock:
+                    number = next(numbers, None)
+                if number is None:
+                    break
+                request = scenario.build(context, number)
+                started = time.perf_counter()
+                response = client.generic(
+                    scenario.method, request["path"], request.get("data", ""),
+                    request.get("content_type", "application/octet-stream"), headers=headers,
+                )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code not in scenario.expected:
+                    local_errors += 1
+                    continue
+                local_latencies.append(elapsed)
+                match = _queries_re.search(response.get("Server-Timing", ""))
+                if match:
+                    local_queries.append(int(match.group(1)))
+        finally:
+            connections.close_all()
+            with lock:
+                latencies.extend(local_latencies)
+                queries.extend(local_queries)
+                errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = summarize(latencies, errors[0], time.perf_counter() - started)
+    result["queries_per_request"] = round(sum(queries) / len(queries), 2) if queries else None
+    result["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return result
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+        Regressions of `results` against `baseline` (both keyed by scenario
+        name): throughput down, p95 up or queries per request up by more than
+        `threshold` (0.2 = 20%), or errors where the baseline had none.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if before.get("requests_per_second") and result["requests_per_second"] is not None \
+                and result["requests_per_second"] < before["requests_per_second"] * (1 - threshold):
+            regressions.append(f"{name}: {result['requests_per_second']} req/s, baseline {before['requests_per_second']}")
+        if before.get("p95_ms") and result["p95_ms"] is not None and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms, baseline {before['p95_ms']} ms")
+        if before.get("queries_per_request") is not None and result["queries_per_request"] is not None \
+                and result["queries_per_request"] > before["queries_per_request"] * (1 + threshold):
+            regressions.append(
+                f"{name}: {result['queries_per_request']} queries/request, baseline {before['queries_per_request']}"
+            )
+        if result["errors"] and not before.get("errors"):
+            regressions.append(f"{name}: {result['errors']} errors, baseline had none")
+    return regressions
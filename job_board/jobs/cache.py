@@ -0,0 +1,213 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from collections import Counter
+import hashlib
+import threading
+import time
+
+
+LIST_VERSION_KEY = "jobs:list:version"
+SEARCH_INDEX_VERSION_KEY = "jobs:search_index:version"
+
+# Per-job versions expire rather than piling up for every job ever read; an
+# expired version only costs a miss, the next lookup starts a new one
+JOB_VERSION_TIMEOUT = 24 * 60 * 60
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, "JOB_CACHE_ALIAS", "default")]
+
+
+def cache_is_shared():
+    """
+        Whether every worker uses the same cache. A per-process cache (local
+        memory, the default without REDIS_URL) never sees the invalidations
+        of writes made by other workers.
+    """
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def cache_stats():
+    """
+        Hit/miss counters of this process since start (or the last reset).
+    """
+    with _stats_lock:
+        stats = {event: _stats[event] for event in ("hits", "stale_hits", "misses", "invalidations")}
+    lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def job_version_key(job_id):
+    return f"jobs:detail:{job_id}:version"
+
+
+def job_detail_key(job_id, fields=None):
+    """
+        Key for one job's payload (or a sparse variant of it, `fields`). It
+        carries the job's version, bumped when a write commits: a request
+        that read the row before the write stores its payload under the old
+        version, where nobody looks any more. Take the key before reading.
+    """
+    key = f"jobs:detail:{job_id}:{_version(job_version_key(job_id), JOB_VERSION_TIMEOUT)}"
+    if fields:
+        return f"{key}:{hashlib.sha1(fields.encode()).hexdigest()}"
+    return key
+
+
+def job_state_key(job_id):
+    return f"jobs:detail:{job_id}:{_version(job_version_key(job_id), JOB_VERSION_TIMEOUT)}:state"
+
+
+def _version(key, timeout=None):
+    version = get_cache().get(key)
+    if version is None:
+        version = time.time_ns()
+        if not get_cache().add(key, version, timeout):
+            version = get_cache().get(key, version)
+    return version
+
+
+def _list_version_timeout():
+    # Unshared, the version expires no later than the pages stored under it,
+    # so other workers' writes show up within JOB_CACHE_TIMEOUT
+    return None if cache_is_shared() else getattr(settings, "JOB_CACHE_TIMEOUT", 60)
+
+
+def list_version():
+    """
+        Nanosecond timestamp of the last job write seen by the cache (or of the
+        first lookup after the key expired or was evicted).
+    """
+    return _version(LIST_VERSION_KEY, _list_version_timeout())
+
+
+def job_list_state_key():
+    return f"jobs:list:{list_version()}:state"
+
+
+def search_index_version():
+    """
+        Version of the in-memory search index (see search_index.py). A process
+        whose index was built under another version rebuilds it.
+    """
+    return _version(SEARCH_INDEX_VERSION_KEY)
+
+
+def bump_search_index_version():
+    get_cache().set(SEARCH_INDEX_VERSION_KEY, time.time_ns(), None)
+
+
+def _params_digest(params):
+    filters = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return hashlib.sha1(filters.encode()).hexdigest()
+
+
+def job_list_key(kind, params):
+    """
+        Key for one listing page: the filter set is hashed and prefixed with the
+        current list version, so bumping the version orphans every cached page.
+    """
+    return f"jobs:list:{list_version()}:{kind}:{_params_digest(params)}"
+
+
+def applicant_version_key(user_id):
+    return f"applications:applicant:{user_id}:version"
+
+
+def applicant_list_key(user_id, params):
+    """
+        Key for one page of a user's own applications. It carries the user's
+        version, bumped when they apply or an application of theirs is
+        deleted, and the job list version, since the page embeds job summaries.
+    """
+    version = _version(applicant_version_key(user_id))
+    return f"applications:applicant:{user_id}:{version}:{list_version()}:{_params_digest(params)}"
+
+
+def get_or_set(key, loader, timeout=None):
+    """
+        Read-through lookup. Entries are stored with a soft expiry and kept for
+        an extra grace period: once soft-expired, a single caller (holding a
+        short lock) recomputes while the others keep serving the stale value,
+        so a popular key never sends a burst of identical queries to the DB.
+
+        A None result (not found) is cached like any other: every key carries
+        a version that the writes able to change the answer bump.
+    """
+    cache = get_cache()
+    timeout = timeout or getattr(settings, "JOB_CACHE_TIMEOUT", 60)
+    lock_key = f"{key}:lock"
+    lock_timeout = getattr(settings, "JOB_CACHE_LOCK_TIMEOUT", 10)
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            record("hits")
+            return value
+        if not cache.add(lock_key, 1, lock_timeout):
+            record("stale_hits")
+            return value
+    elif not cache.add(lock_key, 1, lock_timeout):
+        # Cold key being computed by someone else: wait briefly for their result
+        deadline = time.monotonic() + getattr(settings, "JOB_CACHE_LOCK_WAIT", 0.5)
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            entry = cache.get(key)
+            if entry is not None:
+                record("hits")
+                return entry[0]
+            if cache.get(lock_key) is None:
+                # The holder gave up (its loader raised): stop waiting
+                break
+        record("misses")
+        return loader()
+
+    record("misses")
+    try:
+        value = loader()
+        store(key, value, timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+def store(key, value, timeout=None):
+    """
+        Write an entry the way get_or_set does, for values loaded as a side
+        effect of another lookup.
+    """
+    timeout = timeout or getattr(settings, "JOB_CACHE_TIMEOUT", 60)
+    grace = getattr(settings, "JOB_CACHE_GRACE", 30)
+    get_cache().set(key, (value, time.time() + timeout), timeout + grace)
+
+
+def invalidate_job(job_id):
+    get_cache().set(job_version_key(job_id), time.time_ns(), JOB_VERSION_TIMEOUT)
+    invalidate_job_lists()
+
+
+def invalidate_applicant(user_id):
+    get_cache().set(applicant_version_key(user_id), time.time_ns(), None)
+    record("invalidations")
+
+
+def invalidate_job_lists():
+    get_cache().set(LIST_VERSION_KEY, time.time_ns(), _list_version_timeout())
+    record("invalidations")
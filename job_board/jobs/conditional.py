@@ -0,0 +1,129 @@
+"""
+    Validators for HTTP conditional requests (ETag / Last-Modified).
+
+    Each function pair is meant for django.views.decorators.http.condition, so
+    a matching If-None-Match / If-Modified-Since returns 304 before the view
+    runs any serialization. The state behind both validators is read once
+    (from the cache where possible) and memoized on the request.
+"""
+from django.db.models import Count, Max
+from .cache import get_or_set, job_detail_key, job_list_state_key, job_state_key, store
+from .models import Job, JobApplication
+from .serializers import JOB_VALUES, FieldSelectionError, JobFieldset, job_row_to_dict
+import hashlib
+
+
+def _memoize(request, name, load):
+    attr = f"_conditional_{name}"
+    if not hasattr(request, attr):
+        setattr(request, attr, load())
+    return getattr(request, attr)
+
+
+def _etag(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _query_string(request):
+    params = request.GET
+    return "&".join(f"{name}={params.get(name)}" for name in sorted(params))
+
+
+"""
+    Single job
+"""
+def _wants_full_job(request):
+    try:
+        return JobFieldset.from_params(request.GET).is_default
+    except FieldSelectionError:
+        return False
+
+
+def _job_state(request, job_id):
+    def load():
+        if not _wants_full_job(request):
+            return Job.objects.filter(id=job_id).values_list("date_updated", flat=True).first()
+        # The detail view reads the same row next: fetch its payload in the same
+        # query. The key is taken first, so a write committing meanwhile orphans it
+        detail_key = job_detail_key(job_id)
+        row = Job.objects.filter(id=job_id).values(*JOB_VALUES, "date_updated").first()
+        store(detail_key, job_row_to_dict(row) if row else None)
+        return row["date_updated"] if row else None
+    return _memoize(request, "job", lambda: get_or_set(job_state_key(job_id), load))
+
+
+def job_etag(request, job_id):
+    date_updated = _job_state(request, job_id)
+    if date_updated is None:
+        return None
+    return _etag("job", job_id, date_updated.isoformat(), _query_string(request))
+
+
+def job_last_modified(request, job_id):
+    return _job_state(request, job_id)
+
+
+"""
+    Job collections (/jobs, /search)
+
+    Derived from the table: max(date_updated) catches creates and edits,
+    the row count catches deletes. The aggregate is cached under the list
+    version (see cache.py), so requests between two writes run no query.
+    Writes the cache didn't see (another worker's, with a per-process
+    cache, or a bulk UPDATE) change the validators once the version
+    expires, together with the pages cached under it.
+"""
+def _jobs_state(request):
+    return _memoize(request, "jobs", lambda: get_or_set(
+        job_list_state_key(), lambda: Job.objects.aggregate(last_updated=Max("date_updated"), count=Count("id"))
+    ))
+
+
+def jobs_etag(request, *args, **kwargs):
+    state = _jobs_state(request)
+    last_updated = state["last_updated"].isoformat() if state["last_updated"] else ""
+    return _etag("jobs", request.path, last_updated, state["count"], _query_string(request))
+
+
+def jobs_last_modified(request, *args, **kwargs):
+    return _jobs_state(request)["last_updated"]
+
+
+"""
+    Single application
+
+    The response embeds the job, so both rows' date_updated count. Validators
+    are only produced for the job owner or the applicant; anyone else falls
+    through to the view and gets its 403.
+"""
+def _application_state(request, application_id):
+    return _memoize(
+        request, "application",
+        lambda: JobApplication.objects.filter(id=application_id).values(
+            "date_updated", "applicant_id", "job__posted_by_id", "job__date_updated"
+        ).first()
+    )
+
+
+def _authorized_application(request, application_id):
+    state = _application_state(request, application_id)
+    if state is None or request.user.id not in (state["applicant_id"], state["job__posted_by_id"]):
+        return None
+    return state
+
+
+def application_etag(request, application_id):
+    state = _authorized_application(request, application_id)
+    if state is None:
+        return None
+    return _etag(
+        "application", application_id, request.user.id,
+        state["date_updated"].isoformat(), state["job__date_updated"].isoformat()
+    )
+
+
+def application_last_modified(request, application_id):
+    state = _authorized_application(request, application_id)
+    if state is None:
+        return None
+    return max(state["date_updated"], state["job__date_updated"])
@@ -0,0 +1,55 @@
+"""
+    Denormalized application counters on Job (application_count, last_applied_at).
+
+    Application inserts and deletes queue a `count_applications` task
+    (tasks.py) in their transaction. The worker recounts both counters of
+    the affected jobs from the applications table, with one UPDATE per
+    batch of tasks rather than one per application, so applies never wait
+    on the job row. Recounting is idempotent: retried or concurrent runs
+    never drift. Paths that bypass model signals (bulk_create, raw SQL)
+    are repaired by `reconcile_counters` / the reconcile_application_counts
+    command.
+"""
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_applications(job_model, application_model, job_ids):
+    applications = application_model.objects.filter(job_id=OuterRef("pk")).order_by().values("job_id")
+    job_model.objects.filter(id__in=job_ids).update(
+        application_count=Coalesce(Subquery(applications.annotate(count=Count("id")).values("count")), 0),
+        last_applied_at=Subquery(applications.annotate(last=Max("date_created")).values("last")),
+    )
+
+
+def reconcile_counters(job_model, application_model, batch_size=1000):
+    """
+        Recompute both counters for every job, `batch_size` jobs at a time
+        (keyset on id), and write back only the rows that drifted.
+        Returns (checked, fixed).
+    """
+    checked = fixed = 0
+    last_id = 0
+    while True:
+        jobs = list(
+            job_model.objects.filter(id__gt=last_id).order_by("id")
+            .values("id", "application_count", "last_applied_at")[:batch_size]
+        )
+        if not jobs:
+            return checked, fixed
+        last_id = jobs[-1]["id"]
+        actual = {
+            row["job_id"]: row for row in
+            application_model.objects.filter(job_id__in=[job["id"] for job in jobs])
+            .values("job_id").annotate(count=Count("id"), last=Max("date_created"))
+        }
+
+        stale = []
+        for job in jobs:
+            row = actual.get(job["id"], {"count": 0, "last": None})
+            if (job["application_count"], job["last_applied_at"]) != (row["count"], row["last"]):
+                stale.append(job_model(id=job["id"], application_count=row["count"], last_applied_at=row["last"]))
+        if stale:
+            job_model.objects.bulk_update(stale, ["application_count", "last_applied_at"])
+        checked += len(jobs)
+        fixed += len(stale)
@@ -0,0 +1,140 @@
+"""
+    Dimension tables for the attributes repeated on every job: each distinct
+    company, location and category is stored once (Company, Location,
+    Category) and jobs reference it by id, so equality filters and facet
+    GROUP BYs compare integers instead of strings.
+
+    Values are interned: the lookup key folds case, accents and whitespace,
+    so "Maputo", " maputo" and "MAPUTO" share one row, named after the first
+    spelling seen. Jobs keep that canonical name in their text columns as
+    well, which the full-text indexes (FTS5, MySQL FULLTEXT) read and which
+    responses are served from without a join.
+
+    Interned rows are remembered per process once their transaction commits,
+    so saving a job with known values costs no query. Job.save interns its
+    own values; bulk writers (importer, seeder, migrations) call
+    `intern_jobs` once per batch.
+"""
+from django.db import transaction
+import threading
+import unicodedata
+
+
+DIMENSION_COLUMNS = ("company", "location", "category")
+
+KEY_LENGTH = 100
+
+
+def dimension_key(value):
+    """
+        "São  Paulo " -> "sao paulo": the identity of a dimension value.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())[:KEY_LENGTH]
+
+
+def canonical_name(value):
+    return " ".join(str(value or "").split())
+
+
+class InternCache:
+    """
+        (model label, key) -> (id, name) of committed dimension rows. Rows are
+        never deleted in normal operation (jobs protect them); signals.py
+        clears the cache when one is, or when the tables are flushed.
+    """
+    def __init__(self, limit=50000):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.limit = limit
+
+    def get(self, label, key):
+        return self._entries.get((label, key))
+
+    def remember(self, label, rows):
+        with self._lock:
+            if len(self._entries) + len(rows) > self.limit:
+                self._entries.clear()
+            for key, row in rows.items():
+                self._entries[(label, key)] = row
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+interned = InternCache()
+
+
+def intern_values(model, values, batch_size=500):
+    """
+        {value: (id, canonical name)} for every non-blank value in `values`,
+        creating the rows that don't exist yet. Values missing from the cache
+        cost one SELECT per `batch_size` keys, plus one INSERT and one SELECT
+        when some are new.
+    """
+    label = model._meta.label
+    names = {}
+    for value in values:
+        key = dimension_key(value)
+        if key:
+            names.setdefault(key, canonical_name(value))
+
+    rows = {}
+    missing = []
+    for key in names:
+        cached = interned.get(label, key)
+        if cached:
+            rows[key] = cached
+        else:
+            missing.append(key)
+
+    loaded = {}
+    for start in range(0, len(missing), batch_size):
+        keys = missing[start:start + batch_size]
+        loaded.update(_load(model, keys))
+        new = [model(key=key, name=names[key]) for key in keys if key not in loaded]
+        if new:
+            # A concurrent writer may insert the same keys: keep theirs
+            model.objects.bulk_create(new, ignore_conflicts=True)
+            loaded.update(_load(model, [row.key for row in new]))
+    if loaded:
+        rows.update(loaded)
+        transaction.on_commit(lambda: interned.remember(label, loaded))
+
+    return {value: rows[dimension_key(value)] for value in values if dimension_key(value)}
+
+
+def _load(model, keys):
+    return {key: (pk, name) for pk, key, name in model.objects.filter(key__in=keys).values_list("id", "key", "name")}
+
+
+def lookup_value(model, value):
+    """
+        Id of the row `value` interns to, or None if there is none. Never
+        creates rows (for filters).
+    """
+    key = dimension_key(value)
+    if not key:
+        return None
+    cached = interned.get(model._meta.label, key)
+    if cached:
+        return cached[0]
+    return model.objects.filter(key=key).values_list("id", flat=True).first()
+
+
+def intern_jobs(jobs, models):
+    """
+        Point the `<column>_ref` foreign keys of `jobs` at the rows of their
+        values, rewriting the values to their canonical names, with one
+        intern_values call per column. `models` maps the columns to intern to
+        their dimension models.
+    """
+    for column, model in models.items():
+        rows = intern_values(model, [getattr(job, column) for job in jobs])
+        for job in jobs:
+            row = rows.get(getattr(job, column))
+            if row:
+                setattr(job, column, row[1])
+            setattr(job, f"{column}_ref_id", row[0] if row else None)
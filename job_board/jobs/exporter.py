@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Job, JobApplication
+import csv
+import io
+import json
+import zlib
+
+
+FORMATS = ("jsonl", "csv")
+
+RESOURCES = {
+    "jobs": (Job, (
+        "id", "title", "company", "location", "description", "category",
+        "posted_by_id", "date_created", "date_updated",
+    )),
+    "applications": (JobApplication, (
+        "id", "job_id", "applicant_id", "cover_letter", "date_created", "date_updated",
+    )),
+}
+
+CONTENT_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_since(value):
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        raise ExportError("since must be an ISO 8601 datetime, e.g. 2025-01-21T12:00:00Z.")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def iter_rows(resource, since=None, chunk_size=None):
+    """
+        Yield every row of `resource` as a dict, in id order, one keyset batch
+        at a time. mysqlclient buffers a whole result set client-side even with
+        .iterator(), so batching on `id > last_id` is what keeps memory flat.
+    """
+    if resource not in RESOURCES:
+        raise ExportError(f"Unknown resource '{resource}'. Use one of: {', '.join(RESOURCES)}.")
+    model, fields = RESOURCES[resource]
+    chunk_size = chunk_size or getattr(settings, "JOB_EXPORT_CHUNK_SIZE", 2000)
+
+    queryset = model.objects.order_by("id")
+    if since is not None:
+        queryset = queryset.filter(date_updated__gte=since)
+
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).values(*fields)[:chunk_size])
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1]["id"]
+
+
+def _value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def serialize_rows(rows, export_format, fields):
+    if export_format == "jsonl":
+        for row in rows:
+            yield json.dumps({key: _value(value) for key, value in row.items()}, ensure_ascii=False) + "\n"
+    elif export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([_value(row[field]) for field in fields])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        raise ExportError(f"Unsupported format '{export_format}'. Use one of: {', '.join(FORMATS)}.")
+
+
+def encode(lines, compress=False, flush_size=64 * 1024):
+    """
+        Encode text lines to bytes, grouped into ~flush_size chunks and gzipped
+        on the fly when `compress` is set.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    pending_size = 0
+
+    def flush():
+        data = b"".join(pending)
+        pending.clear()
+        return compressor.compress(data) if compressor else data
+
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= flush_size:
+            pending_size = 0
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export(resource, export_format="jsonl", since=None, compress=False, chunk_size=None):
+    """
+        Byte chunks of the full export. Validates arguments eagerly so errors
+        surface before a streaming response has started.
+    """
+    if resource not in RESOURCES:
+        raise ExportError(f"Unknown resource '{resource}'. Use one of: {', '.join(RESOURCES)}.")
+    if export_format not in FORMATS:
+        raise ExportError(f"Unsupported format '{export_format}'. Use one of: {', '.join(FORMATS)}.")
+    fields = RESOURCES[resource][1]
+    rows = iter_rows(resource, since=since, chunk_size=chunk_size)
+    return encode(serialize_rows(rows, export_format, fields), compress=compress)
+
+
+def export_filename(resource, export_format, compress=False):
+    return f"{resource}.{export_format}" + (".gz" if compress else "")
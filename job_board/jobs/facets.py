@@ -0,0 +1,181 @@
+"""
+    Facet counts for search: jobs per category, location and company.
+
+    Counts over all jobs come from the JobFacet rollup, one row per (facet,
+    value), recounted for the values a Job save or delete touched by a task
+    queued in its transaction (tasks.py), so the top values of a facet are
+    an index range read. Counts for a filtered search take one pass over the
+    matching jobs: a single GROUP BY on the dimension ids of all requested
+    columns (see dimensions.py), folded into per-facet counts in Python.
+    Paths that bypass model signals (bulk_create, queryset.update) queue
+    the task themselves or are repaired by `rebuild_facets` / the
+    rebuild_job_facets command.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ExpressionWrapper, F, IntegerField
+from collections import Counter
+from .dimensions import dimension_key
+
+
+FACET_COLUMNS = ("category", "location", "company")
+
+
+class FacetError(ValueError):
+    pass
+
+
+def requested_facets(params):
+    """
+        (columns, size) from the `facets` (comma separated) and `facet_size`
+        query params. `columns` is empty when no facets are requested.
+    """
+    names = [name.strip() for name in params.get("facets", "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in FACET_COLUMNS]
+    if unknown:
+        raise FacetError(f"Unknown facets: {', '.join(unknown)}. Available: {', '.join(FACET_COLUMNS)}.")
+    try:
+        size = int(params.get("facet_size", getattr(settings, "JOB_FACET_SIZE", 10)))
+    except ValueError:
+        raise FacetError("facet_size must be an integer.")
+    if size < 1:
+        raise FacetError("facet_size must be greater than zero.")
+    return tuple(dict.fromkeys(names)), min(size, getattr(settings, "JOB_FACET_MAX_SIZE", 100))
+
+
+def loaded_facet_values(instance):
+    # Deferred fields are missing from __dict__; reading them would cost a query
+    return {column: instance.__dict__[column] for column in FACET_COLUMNS if column in instance.__dict__}
+
+
+def facet_changes(before, after):
+    """
+        Count deltas {(facet, value): delta} between two {column: value} maps.
+        Columns missing from `after` are unchanged.
+    """
+    changes = Counter()
+    for column, value in after.items():
+        if before.get(column) != value:
+            changes[(column, before.get(column))] -= 1
+            changes[(column, value)] += 1
+    return changes
+
+
+def recount_facets(job_model, facet_model, values):
+    """
+        Set the rollup rows of `values` ({(facet, value)}) to the number of
+        jobs that have them, counted through the indexed `<facet>_ref` keys.
+        Recounting rather than applying deltas makes a task that runs twice
+        (retried, or its lease ran out mid-run) leave the same counts.
+    """
+    for facet in FACET_COLUMNS:
+        names = sorted({value for column, value in values if column == facet and value not in (None, "")})
+        if not names:
+            continue
+        # Locked first and in order, so concurrent recounts of a value take turns
+        list(facet_model.objects.select_for_update().filter(facet=facet, value__in=names).order_by("value")
+             .values_list("id", flat=True))
+        counts = dict(
+            job_model.objects.filter(**{f"{facet}_ref__key__in": {dimension_key(name) for name in names}})
+            .values(f"{facet}_ref__name").annotate(count=Count("id")).order_by()
+            .values_list(f"{facet}_ref__name", "count")
+        )
+        for name in names:
+            rows = facet_model.objects.filter(facet=facet, value=name)
+            count = counts.get(name, 0)
+            if rows.update(count=count) or not count:
+                continue
+            try:
+                with transaction.atomic():
+                    facet_model.objects.create(facet=facet, value=name, count=count)
+            except IntegrityError:
+                # Created by a concurrent recount in between
+                rows.update(count=count)
+
+
+def rebuild_facets(job_model, facet_model):
+    """
+        Recompute the rollup from the jobs table, one GROUP BY per facet.
+        Returns the number of rows written.
+    """
+    rows = []
+    for column in FACET_COLUMNS:
+        counts = (
+            job_model.objects.exclude(**{f"{column}__isnull": True}).exclude(**{column: ""})
+            .values(column).annotate(count=Count("id")).order_by()
+        )
+        rows += [facet_model(facet=column, value=row[column], count=row["count"]) for row in counts.iterator()]
+    with transaction.atomic():
+        facet_model.objects.all().delete()
+        facet_model.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rollup_facets(facet_model, columns, size):
+    return {
+        column: [
+            {"value": value, "count": count}
+            for value, count in facet_model.objects.filter(facet=column, count__gt=0)
+            .order_by("-count", "value").values_list("value", "count")[:size]
+        ]
+        for column in columns
+    }
+
+
+def group_facets(queryset, columns, size, group_on_index=True):
+    """
+        Top values of each column over `queryset`. The matching rows are read
+        once (the search condition is evaluated once), grouped by the
+        `<column>_ref` ids of every column together; only the names of the
+        top ids are loaded. Without `group_on_index` the ids are grouped as
+        expressions (`id + 0`), which no index can return in group order, so
+        the database reads the rows through the index of the WHERE clause.
+    """
+    refs = {column: queryset.model._meta.get_field(f"{column}_ref") for column in columns}
+    if group_on_index:
+        groups = {column: ref.attname for column, ref in refs.items()}
+        rows = queryset.values(*groups.values())
+    else:
+        groups = {column: f"{column}_group" for column in columns}
+        rows = queryset.values(**{
+            groups[column]: ExpressionWrapper(F(ref.attname) + 0, output_field=IntegerField())
+            for column, ref in refs.items()
+        })
+    counters = {column: Counter() for column in columns}
+    for row in rows.annotate(jobs=Count("id")).order_by().iterator():
+        for column, group in groups.items():
+            if row[group] is not None:
+                counters[column][row[group]] += row["jobs"]
+
+    facets = {}
+    for column, counter in counters.items():
+        top = counter.most_common()
+        if len(top) > size:
+            # Keep the ties of the last count: they are ordered by name
+            top = [(pk, count) for pk, count in top if count >= top[size - 1][1]]
+        names = dict(
+            refs[column].related_model.objects.filter(id__in=[pk for pk, _ in top]).values_list("id", "name")
+        ) if top else {}
+        facets[column] = sorted(
+            ({"value": names[pk], "count": count} for pk, count in top if pk in names),
+            key=lambda item: (-item["count"], item["value"])
+        )[:size]
+    return facets
+
+
+def count_facets(rows, columns, size):
+    """
+        Top values of each column over `rows` ({column: value} dicts).
+    """
+    counters = {column: Counter() for column in columns}
+    for row in rows:
+        for column in columns:
+            if row.get(column):
+                counters[column][row[column]] += 1
+    return {
+        column: [
+            {"value": value, "count": count}
+            for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:size]
+        ]
+        for column, counter in counters.items()
+    }
@@ -0,0 +1,306 @@
+"""
+    "Jobs near me" without spatial extensions.
+
+    Jobs get coordinates from an offline gazetteer of known places, looked up
+    by their location (or from the client, for places it doesn't know). On
+    save each job also stores:
+
+    - `geo_cell`, the cell of a fixed 0.1° grid (~11 km) holding it, as one
+      integer per cell numbered row by row, so the cells of a box are a few
+      contiguous integer ranges on an ordinary B-tree index;
+    - `geo_x`, `geo_y`, `geo_z`, its position on the unit sphere, so the
+      exact great-circle distance check is a dot product: plain arithmetic
+      that SQLite and MySQL evaluate without trigonometric functions.
+
+    A radius search narrows to the cells of the circle's bounding box (index
+    range scans), then keeps the rows whose dot product with the center is
+    at least cos(radius / earth radius).
+"""
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.lookups import GreaterThanOrEqual
+from dataclasses import dataclass
+from .dimensions import dimension_key
+import math
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Job columns written by locate_job
+GEO_FIELDS = ("latitude", "longitude", "geo_cell", "geo_x", "geo_y", "geo_z")
+
+# Changing the grid means recomputing geo_cell for every job
+GRID_DEGREES = 0.1
+GRID_ROWS = round(180 / GRID_DEGREES)
+GRID_COLUMNS = round(360 / GRID_DEGREES)
+
+# Boxes taller than this many grid rows are filtered on coordinates alone
+MAX_CELL_RANGES = 100
+
+# Known places (latitude, longitude); names match case- and accent-insensitively
+GAZETTEER = {
+    # Mozambique
+    "Maputo": (-25.9692, 32.5732),
+    "Matola": (-25.9622, 32.4589),
+    "Beira": (-19.8436, 34.8389),
+    "Nampula": (-15.1165, 39.2666),
+    "Quelimane": (-17.8786, 36.8883),
+    "Tete": (-16.1564, 33.5867),
+    "Pemba": (-12.9740, 40.5178),
+    "Xai-Xai": (-25.0519, 33.6442),
+    "Chimoio": (-19.1164, 33.4833),
+    "Lichinga": (-13.3128, 35.2406),
+    "Inhambane": (-23.8650, 35.3833),
+    "Maxixe": (-23.8597, 35.3472),
+    "Nacala": (-14.5428, 40.6728),
+    "Dondo": (-19.6094, 34.7431),
+    "Cuamba": (-14.8031, 36.5372),
+    "Montepuez": (-13.1256, 38.9997),
+    "Gurúè": (-15.4667, 36.9833),
+    "Mocuba": (-16.8392, 36.9856),
+    "Chókwè": (-24.5333, 32.9833),
+    "Angoche": (-16.2325, 39.9086),
+    "Manica": (-18.9333, 32.8833),
+    "Moatize": (-16.1167, 33.7333),
+    "Vilankulo": (-22.0000, 35.3167),
+    "Ilha de Moçambique": (-15.0342, 40.7358),
+    # Region
+    "Johannesburg": (-26.2041, 28.0473),
+    "Pretoria": (-25.7479, 28.2293),
+    "Durban": (-29.8587, 31.0218),
+    "Cape Town": (-33.9249, 18.4241),
+    "Mbabane": (-26.3054, 31.1367),
+    "Harare": (-17.8252, 31.0335),
+    "Lilongwe": (-13.9626, 33.7741),
+    "Blantyre": (-15.7861, 35.0058),
+    "Lusaka": (-15.3875, 28.3228),
+    "Dar es Salaam": (-6.7924, 39.2083),
+    "Nairobi": (-1.2921, 36.8219),
+    "Luanda": (-8.8390, 13.2894),
+    "Lisboa": (38.7223, -9.1393),
+    "Porto": (41.1579, -8.6291),
+    "São Paulo": (-23.5505, -46.6333),
+}
+
+ALIASES = {
+    "Lisbon": "Lisboa",
+    "Joburg": "Johannesburg",
+    "Ilha": "Ilha de Moçambique",
+}
+
+_places = {dimension_key(name): point for name, point in GAZETTEER.items()}
+_places.update({dimension_key(alias): GAZETTEER[name] for alias, name in ALIASES.items()})
+
+
+class GeoError(ValueError):
+    pass
+
+
+def place_point(name):
+    """
+        (latitude, longitude) of a known place, or None. "Beira, Sofala"
+        falls back to "Beira".
+    """
+    key = dimension_key(name)
+    if not key:
+        return None
+    return _places.get(key) or _places.get(key.split(",")[0].strip())
+
+
+def grid_row(latitude):
+    return min(max(math.floor((latitude + 90) / GRID_DEGREES), 0), GRID_ROWS - 1)
+
+
+def grid_column(longitude):
+    return min(max(math.floor((longitude + 180) / GRID_DEGREES), 0), GRID_COLUMNS - 1)
+
+
+def grid_cell(latitude, longitude):
+    return grid_row(latitude) * GRID_COLUMNS + grid_column(longitude)
+
+
+def unit_vector(latitude, longitude):
+    phi, lam = math.radians(latitude), math.radians(longitude)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def distance_km(a, b):
+    """
+        Great-circle (haversine) distance between two (latitude, longitude).
+    """
+    phi1, phi2 = math.radians(a[0]), math.radians(b[0])
+    dphi, dlam = phi2 - phi1, math.radians(b[1] - a[1])
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(h), 1.0))
+
+
+def cell_ranges(south, west, north, east):
+    """
+        Inclusive (low, high) geo_cell ranges covering a box that doesn't
+        cross the antimeridian: one per grid row, merged when rows span the
+        whole width.
+    """
+    first, last = grid_column(west), grid_column(east)
+    ranges = []
+    for row in range(grid_row(south), grid_row(north) + 1):
+        low, high = row * GRID_COLUMNS + first, row * GRID_COLUMNS + last
+        if ranges and ranges[-1][1] + 1 == low:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((low, high))
+    return ranges
+
+
+def _coordinate(params, name, low, high):
+    try:
+        value = float(params.get(name))
+    except (TypeError, ValueError):
+        raise GeoError(f"{name} must be a number.")
+    if not low <= value <= high:
+        raise GeoError(f"{name} must be between {low} and {high}.")
+    return value
+
+
+@dataclass(frozen=True)
+class Area:
+    """
+        Where to search: a circle (`center`, `radius_km`) or a box. `boxes`
+        are (south, west, north, east) tuples, two when the area crosses the
+        antimeridian.
+    """
+    boxes: tuple
+    center: tuple = None
+    radius_km: float = None
+
+    @classmethod
+    def from_params(cls, params):
+        """
+            ?near=<place> or ?lat=&lon= (with optional radius_km), or
+            ?bbox=south,west,north,east. None without any of them.
+        """
+        if params.get("bbox"):
+            parts = params["bbox"].split(",")
+            if len(parts) != 4:
+                raise GeoError("bbox must be south,west,north,east.")
+            bounds = dict(zip(("south", "west", "north", "east"), parts))
+            south, north = _coordinate(bounds, "south", -90, 90), _coordinate(bounds, "north", -90, 90)
+            west, east = _coordinate(bounds, "west", -180, 180), _coordinate(bounds, "east", -180, 180)
+            if south > north:
+                raise GeoError("bbox south must not be greater than north.")
+            return cls(boxes=_split_antimeridian(south, west, north, east))
+
+        if params.get("near"):
+            center = place_point(params["near"])
+            if center is None:
+                raise GeoError(f"Unknown place: {params['near']}. Use lat and lon instead.")
+        elif params.get("lat") or params.get("lon"):
+            center = (_coordinate(params, "lat", -90, 90), _coordinate(params, "lon", -180, 180))
+        else:
+            return None
+
+        limit = getattr(settings, "JOB_GEO_MAX_RADIUS_KM", 500)
+        if params.get("radius_km"):
+            radius = _coordinate(params, "radius_km", 0, limit)
+        else:
+            radius = getattr(settings, "JOB_GEO_RADIUS_KM", 25)
+        return cls(boxes=_circle_boxes(center, radius), center=center, radius_km=radius)
+
+    def __str__(self):
+        if self.center:
+            return f"{self.center[0]},{self.center[1]};{self.radius_km}"
+        return ";".join(",".join(str(bound) for bound in box) for box in self.boxes)
+
+    def closeness(self):
+        """
+            Dot product of a job's unit vector with the center's: the cosine
+            of the angle between them, larger when nearer.
+        """
+        x, y, z = unit_vector(*self.center)
+        return ExpressionWrapper(F("geo_x") * x + F("geo_y") * y + F("geo_z") * z, output_field=FloatField())
+
+    def condition(self):
+        """
+            Q for the jobs inside the area: grid cell ranges first (index),
+            then the exact bounds or distance.
+        """
+        condition = Q()
+        for south, west, north, east in self.boxes:
+            box = Q(latitude__range=(south, north), longitude__range=(west, east))
+            ranges = cell_ranges(south, west, north, east)
+            if len(ranges) <= MAX_CELL_RANGES:
+                cells = Q()
+                for low, high in ranges:
+                    cells |= Q(geo_cell__range=(low, high))
+                box &= cells
+            condition |= box
+        if self.center:
+            threshold = math.cos(self.radius_km / EARTH_RADIUS_KM)
+            condition &= Q(GreaterThanOrEqual(self.closeness(), Value(threshold)))
+        return condition
+
+    def closeness_to(self, latitude, longitude):
+        """
+            `closeness` of one point, computed in process.
+        """
+        x, y, z = unit_vector(*self.center)
+        point_x, point_y, point_z = unit_vector(latitude, longitude)
+        return point_x * x + point_y * y + point_z * z
+
+    def contains(self, latitude, longitude):
+        """
+            `condition` for one point, checked in process.
+        """
+        if latitude is None or longitude is None:
+            return False
+        if not any(
+            south <= latitude <= north and west <= longitude <= east for south, west, north, east in self.boxes
+        ):
+            return False
+        return not self.center or self.closeness_to(latitude, longitude) >= math.cos(self.radius_km / EARTH_RADIUS_KM)
+
+    def distance_km(self, latitude, longitude):
+        return round(distance_km(self.center, (latitude, longitude)), 3)
+
+
+def _split_antimeridian(south, west, north, east):
+    if west <= east:
+        return ((south, west, north, east),)
+    return (south, west, north, 180.0), (south, -180.0, north, east)
+
+
+def _circle_boxes(center, radius):
+    latitude, longitude = center
+    angle = radius / EARTH_RADIUS_KM
+    south, north = latitude - math.degrees(angle), latitude + math.degrees(angle)
+    if south <= -90 or north >= 90 or angle >= math.pi / 2:
+        # Reaches a pole: every longitude
+        return ((max(south, -90.0), -180.0, min(north, 90.0), 180.0),)
+    spread = math.degrees(math.asin(min(math.sin(angle) / math.cos(math.radians(latitude)), 1.0)))
+    west, east = longitude - spread, longitude + spread
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return _split_antimeridian(south, west, north, east)
+
+
+def locate_job(job):
+    """
+        Fill the coordinates of `job` from the gazetteer, unless the caller
+        set them, and derive geo_cell and the unit vector. Coordinates given
+        earlier are kept while the location stays the same.
+    """
+    loaded = getattr(job, "_stored_geo", None)
+    point = (job.latitude, job.longitude)
+    if None in point:
+        point = place_point(job.location)
+    elif loaded is not None and point == loaded[1:] and job.location != loaded[0]:
+        # Moved without new coordinates
+        point = place_point(job.location)
+    if point is None:
+        job.latitude = job.longitude = job.geo_cell = job.geo_x = job.geo_y = job.geo_z = None
+        return
+    job.latitude, job.longitude = float(point[0]), float(point[1])
+    job.geo_cell = grid_cell(job.latitude, job.longitude)
+    job.geo_x, job.geo_y, job.geo_z = unit_vector(job.latitude, job.longitude)
+
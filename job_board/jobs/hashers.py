@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.contrib.auth.hashers import BCryptSHA256PasswordHasher, check_password, make_password
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+
+class ConfigurableBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """
+        bcrypt_sha256 with the work factor taken from settings.BCRYPT_ROUNDS.
+        Hashes made with another work factor still verify, and are upgraded on
+        the next successful login (must_update compares the rounds).
+    """
+    @property
+    def rounds(self):
+        return getattr(settings, "BCRYPT_ROUNDS", 12)
+
+
+class LoginBusy(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """
+        Thread pool that refuses new work instead of queueing without limit, so
+        a login burst is shed with 503 rather than starving the other views.
+        bcrypt releases the GIL, so the pool threads hash in parallel.
+
+        The pool bounds concurrency, it adds no capacity: the request thread
+        still waits for its hash (see verify_password), and logins per second
+        are set by the cores and BCRYPT_ROUNDS alone.
+    """
+    def __init__(self, max_workers, max_pending):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusy("Too many concurrent logins.")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, "LOGIN_HASH_WORKERS", None) or os.cpu_count() or 1
+                pending = getattr(settings, "LOGIN_HASH_QUEUE", None)
+                _executor = BoundedExecutor(workers, workers * 4 if pending is None else pending)
+    return _executor
+
+
+def _verify(password, encoded):
+    """
+        Returns (is_correct, new_encoded). new_encoded is set when the stored
+        hash uses an outdated algorithm or work factor.
+    """
+    upgraded = []
+    is_correct = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return is_correct, upgraded[0] if upgraded else None
+
+
+def verify_password(password, encoded):
+    """
+        Verify a password on the bounded hashing pool. Raises LoginBusy when
+        the pool is saturated and TimeoutError if the result takes longer than
+        LOGIN_HASH_TIMEOUT seconds.
+
+        Blocks the calling thread until the hash is done: what the pool buys is
+        a cap on hashes in flight (and a fast 503 past it), not throughput.
+    """
+    future = get_executor().submit(_verify, password, encoded)
+    return future.result(timeout=getattr(settings, "LOGIN_HASH_TIMEOUT", 5))
@@ -0,0 +1,233 @@
+from django.conf import settings
+from django.db import transaction
+from pydantic import TypeAdapter, ValidationError
+from collections import Counter
+from .cache import invalidate_job_lists
+from .dimensions import intern_jobs
+from .facets import FACET_COLUMNS
+from .geo import locate_job
+from .models import DIMENSION_MODELS, Job, make_description_preview
+from .serializers import JobSchema
+from .signals import queue_facet_changes
+import csv
+import json
+import time
+
+
+FORMATS = ("jsonl", "csv")
+
+CONTENT_TYPES = {
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+    "text/csv": "csv",
+}
+
+JOB_BATCH_ADAPTER = TypeAdapter(list[JobSchema])
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def format_from_content_type(content_type):
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in CONTENT_TYPES:
+        raise ImportFormatError(
+            f"Unsupported content type '{media_type}'. Use one of: {', '.join(CONTENT_TYPES)}."
+        )
+    return CONTENT_TYPES[media_type]
+
+
+class DecodedLines:
+    """
+        Iterator over the decoded lines of a byte stream. A line that can't be
+        decoded raises UnicodeDecodeError and iteration goes on with the next
+        one, so the error is reported against its row only.
+    """
+    def __init__(self, stream, encoding="utf-8"):
+        self._lines = iter(stream)
+        self.encoding = encoding
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._lines)
+        return line.decode(self.encoding) if isinstance(line, bytes) else line
+
+
+def decode_lines(stream, encoding="utf-8"):
+    return DecodedLines(stream, encoding)
+
+
+ROW_ERRORS = (csv.Error, UnicodeDecodeError)
+
+
+def _row_error(error):
+    if isinstance(error, UnicodeDecodeError):
+        return f"Invalid {error.encoding} text: {error.reason}."
+    return f"Invalid CSV: {error}"
+
+
+def _rows(iterator):
+    """
+        Yield (item, error) for each item of `iterator`, turning a decoding or
+        CSV parse error into an error for that row instead of ending the import.
+    """
+    while True:
+        try:
+            yield next(iterator), None
+        except StopIteration:
+            return
+        except ROW_ERRORS as error:
+            yield None, _row_error(error)
+
+
+def iter_records(lines, format):
+    """
+        Yield (row_number, record, error) for every non-blank row of a JSON Lines
+        or CSV stream. Exactly one of `record` / `error` is set.
+    """
+    if format == "jsonl":
+        for row_number, (line, error) in enumerate(_rows(iter(lines)), start=1):
+            if error:
+                yield row_number, None, error
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield row_number, None, f"Invalid JSON: {error}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Each line must be a JSON object."
+                continue
+            yield row_number, record, None
+    elif format == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            reader.fieldnames
+        except ROW_ERRORS as error:
+            # Without a header no row can be read
+            yield 1, None, _row_error(error)
+            return
+        # Row numbers count the header as row 1, like a spreadsheet
+        for row_number, (record, error) in enumerate(_rows(reader), start=2):
+            if error:
+                yield row_number, None, error
+                continue
+            yield row_number, {key: value or None for key, value in record.items() if key}, None
+    else:
+        raise ImportFormatError(f"Unsupported format '{format}'. Use one of: {', '.join(FORMATS)}.")
+
+
+class ImportReport:
+    def __init__(self, max_errors=None):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors or getattr(settings, "JOB_IMPORT_MAX_ERRORS", 1000)
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def to_dict(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round((self.created + self.failed) / self.seconds) if self.seconds else None,
+        }
+
+
+def validate_batch(batch, report):
+    """
+        Validate a batch of (row_number, record) with a single pydantic call; if
+        any row is invalid, fall back to row-by-row to report each error.
+    """
+    try:
+        schemas = JOB_BATCH_ADAPTER.validate_python([record for _, record in batch])
+    except ValidationError:
+        pass
+    else:
+        return [(row_number, data) for (row_number, _), data in zip(batch, schemas)]
+
+    valid = []
+    for row_number, record in batch:
+        try:
+            valid.append((row_number, JobSchema(**record)))
+        except ValidationError as validation_error:
+            report.add_error(row_number, [
+                {"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+                for error in validation_error.errors()
+            ])
+    return valid
+
+
+def write_batch(valid, posted_by, report):
+    jobs = [
+        Job(
+            title=data.title,
+            company=data.company,
+            location=data.location,
+            description=data.description,
+            description_preview=make_description_preview(data.description),
+            category=data.category,
+            latitude=data.latitude,
+            longitude=data.longitude,
+            posted_by=posted_by,
+        )
+        for _, data in valid
+    ]
+    with transaction.atomic():
+        # bulk_create skips Job.save and the post_save signals: intern and
+        # locate the batch and queue its facet counts here
+        intern_jobs(jobs, DIMENSION_MODELS)
+        for job in jobs:
+            locate_job(job)
+        Job.objects.bulk_create(jobs)
+        queue_facet_changes(Counter((column, getattr(job, column)) for job in jobs for column in FACET_COLUMNS))
+    report.created += len(jobs)
+
+
+def import_jobs(records, posted_by, batch_size=None):
+    """
+        Validate and insert jobs from `iter_records` output in chunks of
+        `batch_size` (at most JOB_IMPORT_MAX_BATCH_SIZE), one transaction per
+        chunk. Invalid rows are skipped and reported; valid rows of the same
+        chunk are still written.
+    """
+    batch_size = batch_size or getattr(settings, "JOB_IMPORT_BATCH_SIZE", 1000)
+    batch_size = min(max(batch_size, 1), getattr(settings, "JOB_IMPORT_MAX_BATCH_SIZE", 5000))
+    report = ImportReport()
+    batch = []
+
+    def flush():
+        valid = validate_batch(batch, report)
+        if valid:
+            write_batch(valid, posted_by, report)
+        batch.clear()
+
+    for row_number, record, error in records:
+        if error:
+            report.add_error(row_number, [{"field": None, "message": error}])
+            continue
+        batch.append((row_number, record))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    # bulk_create sends no post_save signals, so drop cached listings here
+    if report.created:
+        transaction.on_commit(invalidate_job_lists)
+    report.seconds = time.perf_counter() - report.started
+    return report
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import http.client
+import math
+import threading
+import time
+
+
+def percentile(samples, fraction):
+    """
+        Nearest-rank percentile of an already sorted list.
+    """
+    if not samples:
+        return None
+    rank = max(math.ceil(fraction * len(samples)) - 1, 0)
+    return samples[rank]
+
+
+def summarize(latencies, errors, seconds):
+    latencies = sorted(latencies)
+    completed = len(latencies)
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(completed / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+def run_load(url, total, concurrency, headers=None, timeout=30):
+    """
+        Send `total` GET requests to `url` from `concurrency` client threads,
+        each keeping one HTTP/1.1 connection alive. Socket errors and 4xx/5xx
+        responses count as errors, except 404 (an empty listing is a valid
+        answer on a small dataset).
+    """
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    headers = headers or {}
+
+    remaining = [total]
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+
+    def client():
+        connection = connection_class(parts.netloc, timeout=timeout)
+        local_latencies = []
+        local_errors = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400 and response.status != 404:
+                    local_errors += 1
+                else:
+                    local_latencies.append(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = connection_class(parts.netloc, timeout=timeout)
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return summarize(latencies, errors[0], time.perf_counter() - started)
@@ -0,0 +1,88 @@
+"""
+    Structured (JSON lines) logging off the request path.
+
+    QueueListenerHandler only copies the record onto a bounded queue in the
+    calling thread; a QueueListener thread does the JSON encoding and the
+    write. When the queue is full, records are dropped and counted instead of
+    blocking the request. Configured through settings.LOGGING.
+"""
+from logging.handlers import QueueHandler, QueueListener
+import contextvars
+import copy
+import datetime
+import logging
+import orjson
+import queue
+import sys
+import threading
+
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed with extra={...}
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+
+class RequestIdFilter(logging.Filter):
+    """
+        Stamp records with the id of the request being served (see
+        jobs.middleware.RequestIdMiddleware). Runs in the emitting thread.
+    """
+    def filter(self, record):
+        request_id = request_id_var.get()
+        if request_id is None:
+            # django.request logs after the middleware returned, but passes the request along
+            request_id = getattr(getattr(record, "request", None), "request_id", None)
+        record.request_id = request_id
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for name, value in vars(record).items():
+            if name not in RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str, option=orjson.OPT_UTC_Z).decode()
+
+
+class QueueListenerHandler(QueueHandler):
+    def __init__(self, stream=None, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(JSONFormatter())
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.listener = QueueListener(self.queue, target)
+        # Stopped (and drained) by close(), which logging.shutdown() calls at exit
+        self.listener.start()
+
+    def prepare(self, record):
+        # Merge args now (they may change after the call returns) but leave
+        # JSON encoding and traceback formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from jobs.benchmark import SCENARIOS, BenchmarkContext, compare, run_scenario
+from jobs.models import Job
+from jobs.seeding import seed
+import django
+import json
+import logging
+import platform
+import time
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every route in jobs/urls.py in process against a separate, seeded benchmark "
+        "database: req/s, p50/p95/p99 latency and queries per request, optionally compared "
+        "with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="10k", help="Seeded jobs.")
+        parser.add_argument("--jobs", type=int, help="Seeded jobs (overrides --scale).")
+        parser.add_argument("--applications-per-job", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the fixture generator.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients.")
+        parser.add_argument("--only", action="append", help="Route name to run (repeatable).")
+        parser.add_argument("--keepdb", action="store_true",
+                            help="Keep the benchmark database (and its seeded rows) for the next run.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--baseline", help="JSON results of an earlier run to compare against.")
+        parser.add_argument("--threshold", type=float, default=0.2,
+                            help="Allowed relative regression against the baseline (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in SCENARIOS if not options["only"] or s.route in options["only"]]
+        if not scenarios:
+            raise CommandError(f"No scenario matches {options['only']}.")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as baseline_file:
+                baseline = json.load(baseline_file)["results"]
+
+        jobs = options["jobs"] or SCALES[options["scale"]]
+        # Quiet per-request logs; they would dominate the timings
+        for name, level in (("jobs", logging.WARNING), ("django.request", logging.ERROR)):
+            logging.getLogger(name).setLevel(level)
+
+        # django.test.Client sends Host: testserver
+        allowed_hosts = override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"])
+        allowed_hosts.enable()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"], serialize=False)
+        try:
+            if Job.objects.count() < jobs:
+                started = time.perf_counter()
+                created = seed(jobs=jobs, applications_per_job=options["applications_per_job"], seed=options["seed"])
+                self.stdout.write(
+                    f"Seeded {created['users']} users, {created['jobs']} jobs and {created['applications']} "
+                    f"applications in {time.perf_counter() - started:.1f}s"
+                )
+            context = BenchmarkContext()
+            results = {}
+            for scenario in scenarios:
+                result = run_scenario(scenario, context, options["requests"], options["concurrency"])
+                results[scenario.name] = result
+                self.stdout.write(
+                    f"{scenario.name:42} {result['requests_per_second']!s:>8} req/s  p50 {result['p50_ms']} ms  "
+                    f"p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+                    f"queries {result['queries_per_request']}  errors {result['errors']}"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            allowed_hosts.disable()
+
+        report = {
+            "meta": {
+                "jobs": jobs,
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "timestamp": int(time.time()),
+            },
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options["threshold"])
+            if regressions:
+                raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS(f"No regressions beyond {options['threshold']:.0%} of the baseline."))
@@ -0,0 +1,65 @@
+from django.contrib.auth.hashers import BCryptSHA256PasswordHasher, check_password
+from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+from jobs.hashers import ConfigurableBCryptSHA256PasswordHasher, LoginBusy, verify_password
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password verifications (logins) per second and per core, one effect at a "
+        "time: the work factor (stock 12 rounds versus BCRYPT_ROUNDS, both inline), then the "
+        "bounded pool (BCRYPT_ROUNDS inline versus on the pool)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=100, help="Logins per run.")
+        parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1, help="Concurrent clients.")
+
+    def run(self, verify, logins, concurrency):
+        rejected = 0
+
+        def attempt(_):
+            nonlocal rejected
+            try:
+                verify()
+            except LoginBusy:
+                rejected += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            list(clients.map(attempt, range(logins)))
+        seconds = time.perf_counter() - started
+        return (logins - rejected) / seconds, rejected
+
+    def report(self, label, rate, rejected):
+        cores = os.cpu_count() or 1
+        self.stdout.write(
+            f"{label}: {rate:.1f} logins/s, {rate / cores:.1f} logins/s per core"
+            + (f", {rejected} rejected with 503" if rejected else "")
+        )
+
+    def handle(self, *args, **options):
+        password = "Password123!"
+        baseline_hasher = BCryptSHA256PasswordHasher()
+        baseline = baseline_hasher.encode(password, baseline_hasher.salt())
+        hasher = ConfigurableBCryptSHA256PasswordHasher()
+        configured = hasher.encode(password, hasher.salt())
+
+        self.stdout.write(
+            f"{options['logins']} logins, {options['concurrency']} concurrent clients, {os.cpu_count()} cores"
+        )
+        logins, concurrency = options["logins"], options["concurrency"]
+        stock_rate, _ = self.run(lambda: check_password(password, baseline), logins, concurrency)
+        self.report(f"stock (inline, {baseline_hasher.rounds} rounds)", stock_rate, 0)
+        inline_rate, _ = self.run(lambda: check_password(password, configured), logins, concurrency)
+        self.report(f"configured (inline, {hasher.rounds} rounds)", inline_rate, 0)
+        pool_rate, rejected = self.run(lambda: verify_password(password, configured), logins, concurrency)
+        self.report(f"configured (pool, {hasher.rounds} rounds)", pool_rate, rejected)
+
+        # Each effect is measured with everything else equal
+        self.stdout.write(f"work factor: {inline_rate / stock_rate:.2f}x logins/s")
+        self.stdout.write(
+            f"pool: {pool_rate / inline_rate:.2f}x logins/s (it bounds concurrent hashing, it adds no capacity)"
+        )
@@ -0,0 +1,104 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from jobs.middleware import brotli, compress
+from jobs.renderers import ORJSONRenderer
+from jobs.serializers import DATETIME_FORMAT, job_row_to_dict
+from datetime import timedelta
+import random
+import time
+
+
+WORDS = (
+    "api backend python django mysql team remote senior junior design build maintain deploy "
+    "cloud data product customer support growth mobile web security testing review mentor "
+    "lead scale performance service platform integration payments logistics health education "
+    "contract full-time salary benefits flexible hours office maputo beira nampula english portuguese"
+).split()
+
+
+def legacy_row_to_dict(row):
+    # job_row_to_dict as it was before format_datetime (strftime per row)
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "company": row["company"],
+        "location": row["location"],
+        "description": row["description"],
+        "category": row["category"],
+        "posted_by": {
+            "id": row["posted_by_id"],
+            "full_name": f"{row['posted_by__first_name']} {row['posted_by__other_names']}"
+        },
+        "date_created": row["date_created"].strftime(DATETIME_FORMAT),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure serialization time and wire bytes of job listing payloads: "
+        "DRF's JSONRenderer with strftime versus ORJSONRenderer, uncompressed, gzip and Brotli."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Jobs per payload.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported).")
+        parser.add_argument("--description-length", type=int, default=1500, help="Characters per description.")
+
+    def rows(self, size, description_length):
+        now = timezone.now()
+        generator = random.Random(0)
+
+        def description():
+            # Varied words so compression ratios resemble real text rather than one repeated line
+            text = " ".join(generator.choices(WORDS, k=description_length // 6 + 1))
+            return text[:description_length]
+
+        return [
+            {
+                "id": pk,
+                "title": f"Backend Developer {pk}",
+                "company": "Onit",
+                "location": "Maputo",
+                "description": description(),
+                "category": "IT",
+                "posted_by_id": pk % 50,
+                "posted_by__first_name": "John",
+                "posted_by__other_names": "Doe",
+                "date_created": now - timedelta(minutes=pk),
+            }
+            for pk in range(1, size + 1)
+        ]
+
+    def best(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000, result
+
+    def handle(self, *args, **options):
+        pipelines = [
+            ("before (strftime + JSONRenderer)", legacy_row_to_dict, JSONRenderer()),
+            ("after (format_datetime + ORJSONRenderer)", job_row_to_dict, ORJSONRenderer()),
+        ]
+        for size in options["sizes"]:
+            rows = self.rows(size, options["description_length"])
+            self.stdout.write(f"{size} jobs")
+            for label, to_dict, renderer in pipelines:
+                milliseconds, body = self.best(
+                    lambda: renderer.render({"success": True, "data": [to_dict(row) for row in rows]}),
+                    options["repeat"]
+                )
+                self.stdout.write(f"  {label}: {milliseconds:.1f} ms, {len(body):,} bytes")
+
+            encodings = ["gzip"] + (["br"] if brotli is not None else [])
+            for encoding in encodings:
+                milliseconds, compressed = self.best(lambda: compress(body, encoding), options["repeat"])
+                self.stdout.write(
+                    f"  {encoding}: {milliseconds:.1f} ms, {len(compressed):,} bytes "
+                    f"({len(compressed) / len(body):.1%} of uncompressed)"
+                )
+            if brotli is None:
+                self.stdout.write("  br: skipped (brotli is not installed)")
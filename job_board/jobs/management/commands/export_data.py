@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobs.exporter import FORMATS, RESOURCES, ExportError, export, parse_since
+import sys
+
+
+class Command(BaseCommand):
+    help = "Stream a full (or incremental) export of jobs or applications as JSON Lines or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=tuple(RESOURCES))
+        parser.add_argument("--output", choices=FORMATS, default="jsonl", help="Output format.")
+        parser.add_argument("--since", help="Only rows with date_updated at or after this ISO 8601 datetime.")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output on the fly.")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Rows fetched per database batch.")
+        parser.add_argument("--file", default="-", help="Destination file (default: stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            chunks = export(
+                options["resource"],
+                export_format=options["output"],
+                since=parse_since(options["since"]),
+                compress=options["gzip"],
+                chunk_size=options["chunk_size"],
+            )
+        except ExportError as export_error:
+            raise CommandError(str(export_error))
+
+        if options["file"] == "-":
+            stream = sys.stdout.buffer
+            for chunk in chunks:
+                stream.write(chunk)
+            stream.flush()
+        else:
+            with open(options["file"], "wb") as stream:
+                for chunk in chunks:
+                    stream.write(chunk)
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobs.importer import FORMATS, decode_lines, import_jobs, iter_records
+from jobs.models import User
+import json
+import sys
+
+
+class Command(BaseCommand):
+    help = "Bulk import jobs from a JSON Lines or CSV file (or '-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or '-' to read from stdin.")
+        parser.add_argument("--user", required=True, help="Email or username of the user the jobs are posted by.")
+        parser.add_argument("--format", choices=FORMATS, help="Input format (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows per bulk insert/transaction.")
+        parser.add_argument("--report", help="Write the full per-row error report as JSON to this file.")
+
+    def handle(self, *args, **options):
+        field = "email" if "@" in options["user"] else "username"
+        posted_by = User.objects.filter(**{field: options["user"]}).first()
+        if posted_by is None:
+            raise CommandError(f"User '{options['user']}' not found.")
+
+        path = options["path"]
+        import_format = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+
+        # Read bytes and decode line by line, so a badly encoded row is
+        # reported as such instead of aborting the import
+        if path == "-":
+            records = iter_records(decode_lines(sys.stdin.buffer), import_format)
+            report = import_jobs(records, posted_by, options["batch_size"])
+        else:
+            with open(path, "rb") as stream:
+                records = iter_records(decode_lines(stream), import_format)
+                report = import_jobs(records, posted_by, options["batch_size"])
+
+        result = report.to_dict()
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as report_file:
+                json.dump(result, report_file, indent=2)
+        for error in result["errors"][:20]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} job(s), {result['failed']} row(s) failed "
+            f"in {result['seconds']}s ({result['rows_per_second']} rows/s)."
+        ))
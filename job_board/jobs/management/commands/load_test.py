@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from jobs.authentication import issue_tokens
+from jobs.loadtest import run_load
+from jobs.models import User
+import json
+
+# Sync DRF view -> native async counterpart
+DEFAULT_PAIRS = (
+    ("/jobs", "/async/jobs"),
+    ("/search?keywords=developer", "/async/search?keywords=developer"),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test a running server: compare requests/s and p50/p95/p99 latency of the "
+        "sync read endpoints against their /async/ counterparts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server to test.")
+        parser.add_argument("--user", help="Email of the user to mint an access token for.")
+        parser.add_argument("--token", help="Access token to use instead of --user.")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint.")
+        parser.add_argument("--concurrency", type=int, default=200, help="Concurrent clients.")
+        parser.add_argument("--path", action="append", dest="paths",
+                            help="Path to test (repeatable); defaults to the sync/async pairs.")
+        parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+
+    def handle(self, *args, **options):
+        token = options["token"]
+        if not token:
+            user = User.objects.filter(email=options["user"]).first() if options["user"] else None
+            if user is None:
+                raise CommandError("Pass --token, or --user with the email of an existing user.")
+            token = str(issue_tokens(user).access_token)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        paths = options["paths"] or [path for pair in DEFAULT_PAIRS for path in pair]
+        results = {}
+        for path in paths:
+            results[path] = run_load(
+                options["base_url"].rstrip("/") + path,
+                total=options["requests"],
+                concurrency=options["concurrency"],
+                headers=headers,
+            )
+            if not options["json"]:
+                result = results[path]
+                self.stdout.write(
+                    f"{path:45} {result['requests_per_second']:>8} req/s  "
+                    f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+                    f"errors {result['errors']}"
+                )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
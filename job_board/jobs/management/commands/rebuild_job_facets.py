@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from jobs.facets import rebuild_facets
+from jobs.models import Job, JobFacet
+import time
+
+
+class Command(BaseCommand):
+    help = "Recompute the JobFacet rollup (jobs per category, location and company) from the jobs table."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild_facets(Job, JobFacet)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {rows} facet values in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from jobs.cache import bump_search_index_version, invalidate_job_lists
+from jobs.search_index import InvertedIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the in-memory job search index of every serving process (on its next refresh, "
+        "within JOB_SEARCH_INDEX_REFRESH_SECONDS) and report its size and build time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per database round-trip.")
+
+    def handle(self, *args, **options):
+        # Build once here first, so a failing build requests nothing
+        index = InvertedIndex()
+        seconds = index.build(chunk_size=options["chunk_size"])
+        bump_search_index_version()
+        # Cached search pages were ranked by the old index
+        invalidate_job_lists()
+        stats = index.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {stats['documents']} jobs in {seconds:.2f}s "
+            f"({stats['terms']} terms, {stats['postings']} postings). "
+            "Serving processes rebuild their index on their next refresh."
+        ))
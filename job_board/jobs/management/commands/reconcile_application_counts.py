@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from jobs.counters import reconcile_counters
+from jobs.models import Job, JobApplication
+import time
+
+
+class Command(BaseCommand):
+    help = "Recompute Job.application_count and Job.last_applied_at from the applications table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Jobs checked per batch.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        checked, fixed = reconcile_counters(Job, JobApplication, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} jobs in {time.perf_counter() - started:.2f}s, fixed {fixed}."
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from jobs.tasks import retry_failed_tasks, run_tasks
+import signal
+import threading
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (owner notifications, application counters, facet counts)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when no task is due instead of polling.")
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="Tasks claimed per batch (default JOB_TASK_BATCH_SIZE).")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds between polls of an empty queue.")
+        parser.add_argument("--retry-failed", action="store_true",
+                            help="Requeue the tasks that used up their attempts before running.")
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            self.stdout.write(f"Requeued {retry_failed_tasks()} failed tasks.")
+        # SIGTERM (deploys, container stops) lets the current batch finish
+        stopping = threading.Event()
+        previous = signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+        done = failed = 0
+        try:
+            while not stopping.is_set():
+                batch_done, batch_failed = run_tasks(options["batch_size"])
+                done += batch_done
+                failed += batch_failed
+                if not batch_done and not batch_failed:
+                    if options["once"]:
+                        break
+                    stopping.wait(options["sleep"])
+                    # Drop connections the server timed out while the queue was idle
+                    close_old_connections()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        self.stdout.write(self.style.SUCCESS(f"Ran {done} tasks, {failed} failed."))
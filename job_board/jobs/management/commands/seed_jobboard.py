@@ -0,0 +1,53 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from jobs.seeding import SEED_PASSWORD, seed
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Add deterministic synthetic users, jobs and applications with realistic distributions "
+        "(skewed categories, locations, companies and applications per job; long descriptions). "
+        "Every seeded user shares one precomputed password hash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=100000, help="Jobs to create.")
+        parser.add_argument("--users", type=int, help="Users to create (default: jobs / 10).")
+        parser.add_argument("--applications-per-job", type=int, default=3,
+                            help="Average applications per job (heavy-tailed; 0 for none).")
+        parser.add_argument("--seed", type=int, default=0, help="Same seed, same rows.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk_create and transaction.")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Processes writing chunks in parallel (ignored on SQLite).")
+        parser.add_argument("--password", default=SEED_PASSWORD, help="Password of every seeded user.")
+
+    def handle(self, *args, **options):
+        if options["jobs"] < 1 or options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--jobs, --chunk-size and --workers must be positive.")
+
+        started = time.perf_counter()
+        reported = {}
+
+        def progress(step, rows):
+            # One line per ~10 chunks keeps the output readable at 1M rows
+            if rows - reported.get(step, 0) >= options["chunk_size"] * 10:
+                reported[step] = rows
+                self.stdout.write(f"  {step}: {rows} rows, {time.perf_counter() - started:.1f}s")
+
+        created = seed(
+            jobs=options["jobs"],
+            users=options["users"],
+            applications_per_job=options["applications_per_job"],
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            password_hash=make_password(options["password"]),
+            workers=options["workers"],
+            progress=progress,
+        )
+        seconds = time.perf_counter() - started
+        rows = sum(created.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created['users']} users, {created['jobs']} jobs and {created['applications']} applications "
+            f"in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)."
+        ))
@@ -0,0 +1,168 @@
+"""
+    Request instrumentation: latency, SQL query count, DB time and response
+    size per view and method, kept in process memory and rendered in the
+    Prometheus text format by the /metrics endpoint. Each worker process
+    exposes its own numbers; Prometheus sums them across targets.
+"""
+from django.conf import settings
+from collections import Counter, defaultdict
+import bisect
+import contextvars
+import threading
+import time
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        """
+            Cumulative (le, count) pairs, ending with +Inf.
+        """
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+current_recorder = contextvars.ContextVar("query_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+        Execute wrapper installed on every connection (signals.py), passing
+        the query to the QueryRecorder of the request being served. The
+        recorder travels in a context variable rather than on a connection,
+        so queries the async ORM runs on sync_to_async threads count too.
+    """
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+class QueryRecorder:
+    """
+        Counts the queries of one request and their total time. With
+        `capture` set it also keeps each statement and its duration, for the
+        slow-request log.
+    """
+    def __init__(self, capture=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.capture = capture
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.seconds += duration
+            if self.capture:
+                self.statements.append((sql, duration))
+
+    def worst(self, limit=5):
+        """
+            The slowest statements, and the SQL templates run more than once
+            (the usual N+1 signature), most repeated first.
+        """
+        slowest = sorted(self.statements, key=lambda statement: statement[1], reverse=True)[:limit]
+        repeated = Counter(sql for sql, _ in self.statements)
+        return {
+            "slowest": [{"sql": sql, "ms": round(duration * 1000, 2)} for sql, duration in slowest],
+            "repeated": [{"sql": sql, "count": count} for sql, count in repeated.most_common(limit) if count > 1],
+        }
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = Counter()
+            self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+            self.db_seconds = Counter()
+            self.response_bytes = Counter()
+
+    def observe(self, view, method, status_code, seconds, recorder, response_bytes):
+        key = (view, method)
+        with self._lock:
+            self.requests[(view, method, str(status_code))] += 1
+            self.latency[key].observe(seconds)
+            self.queries[key].observe(recorder.count)
+            self.db_seconds[key] += recorder.seconds
+            if response_bytes is not None:
+                self.response_bytes[key] += response_bytes
+
+    def render(self):
+        """
+            Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+
+        def labels(**values):
+            return ",".join(f'{name}="{value}"' for name, value in values.items())
+
+        def histogram(name, help_text, series):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (view, method), value in sorted(series.items()):
+                for bound, count in value.samples():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{{{labels(view=view, method=method, le=le)}}} {count}")
+                lines.append(f"{name}_sum{{{labels(view=view, method=method)}}} {value.sum}")
+                lines.append(f"{name}_count{{{labels(view=view, method=method)}}} {sum(value.counts)}")
+
+        def counter(name, help_text, series):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (view, method), value in sorted(series.items()):
+                lines.append(f"{name}{{{labels(view=view, method=method)}}} {value}")
+
+        with self._lock:
+            lines.append("# HELP jobboard_requests_total Requests served.")
+            lines.append("# TYPE jobboard_requests_total counter")
+            for (view, method, status_code), value in sorted(self.requests.items()):
+                lines.append(f"jobboard_requests_total{{{labels(view=view, method=method, status=status_code)}}} {value}")
+            histogram("jobboard_request_duration_seconds", "Time spent serving a request.", self.latency)
+            histogram("jobboard_request_queries", "SQL queries run per request.", self.queries)
+            counter("jobboard_request_db_seconds_total", "Time spent in SQL queries.", self.db_seconds)
+            counter("jobboard_response_bytes_total", "Response body bytes (streaming responses excluded).",
+                    self.response_bytes)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def slow_request_threshold():
+    """
+        Seconds after which a request is logged with its worst SQL, or None
+        when METRICS_SLOW_REQUEST_MS is unset (the default).
+    """
+    milliseconds = getattr(settings, "METRICS_SLOW_REQUEST_MS", None)
+    return milliseconds / 1000 if milliseconds else None
+
+
+def server_timing(seconds, recorder):
+    return (
+        f'db;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries", '
+        f"total;dur={seconds * 1000:.1f}"
+    )
@@ -0,0 +1,205 @@
+from django.conf import settings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.cache import patch_vary_headers
+from .log import request_id_var
+from .metrics import QueryRecorder, current_recorder, registry, server_timing, slow_request_threshold
+import logging
+import re
+import time
+import uuid
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+_request_id_re = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+_accept_encoding_re = re.compile(r"([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+
+
+def accepted_encodings(header):
+    """
+        Codings from an Accept-Encoding header with a non-zero q-value.
+    """
+    accepted = set()
+    for part in header.lower().split(","):
+        match = _accept_encoding_re.match(part.strip())
+        if not match:
+            continue
+        coding, quality = match.groups()
+        try:
+            if quality is not None and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding)
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header or "")
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=getattr(settings, "COMPRESSION_BROTLI_QUALITY", 4))
+    compressor = zlib.compressobj(getattr(settings, "COMPRESSION_GZIP_LEVEL", 6), zlib.DEFLATED, 31)
+    return compressor.compress(content) + compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+        Compress responses of at least COMPRESSION_MIN_SIZE bytes with Brotli
+        or gzip, whichever the client accepts (Brotli first). Streaming
+        responses are left alone: exports compress themselves (?gzip=true).
+        Sync and async capable, so ASGI keeps the async views on the loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+
+        # The representation depends on Accept-Encoding even when it isn't compressed
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < getattr(settings, "COMPRESSION_MIN_SIZE", 1024):
+            return response
+
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # Same as GZipMiddleware: the compressed bytes differ, so a strong ETag becomes weak
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+
+class RequestIdMiddleware:
+    """
+        Tag the request with an id, from a well-formed X-Request-ID header or
+        a new uuid4, so every log line it produces can be correlated. The id
+        is echoed back in the response's X-Request-ID header. The id lives in
+        a context variable, which sync_to_async copies to its threads.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = request_id_var.set(self.tag(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response["X-Request-ID"] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = request_id_var.set(self.tag(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response["X-Request-ID"] = request.request_id
+        return response
+
+    def tag(self, request):
+        request_id = request.headers.get("X-Request-ID", "")
+        if not _request_id_re.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        return request_id
+
+
+class MetricsMiddleware:
+    """
+        Time each request, count its SQL queries and DB time (see
+        metrics.record_query), record them in jobs.metrics.registry and
+        report them in a Server-Timing header. With METRICS_SLOW_REQUEST_MS
+        set, slower requests are logged with their slowest and most repeated
+        SQL statements.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        recorder = QueryRecorder(capture=slow_request_threshold() is not None)
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.observe(request, response, time.perf_counter() - started, recorder)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(capture=slow_request_threshold() is not None)
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.observe(request, response, time.perf_counter() - started, recorder)
+
+    def observe(self, request, response, seconds, recorder):
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else "unmatched"
+        response_bytes = None if response.streaming else len(response.content)
+        registry.observe(view, request.method, response.status_code, seconds, recorder, response_bytes)
+        response["Server-Timing"] = server_timing(seconds, recorder)
+
+        threshold = slow_request_threshold()
+        if threshold is not None and seconds >= threshold:
+            logger.warning(
+                "Slow request: %s %s took %.1f ms with %s queries (%.1f ms in SQL)",
+                request.method, request.path, seconds * 1000, recorder.count, recorder.seconds * 1000,
+                extra={"view": view, "status_code": response.status_code, "sql": recorder.worst()}
+            )
+        return response
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+# Frozen copies of the jobs.search definitions at the time of this migration,
+# so later changes to the app code can't change what it creates
+
+SEARCH_COLUMNS = ("title", "company", "location", "category", "description")
+
+MYSQL_FULLTEXT_INDEXES = {
+    "jobs_job_search_ft": SEARCH_COLUMNS,
+    "jobs_job_title_ft": ("title",),
+    "jobs_job_company_ft": ("company",),
+    "jobs_job_location_ft": ("location",),
+}
+
+SQLITE_FTS_TABLE = "jobs_job_fts"
+
+SQLITE_FTS_COLUMNS = ", ".join(SEARCH_COLUMNS)
+SQLITE_FTS_NEW = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+SQLITE_FTS_OLD = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+SQLITE_CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    f"{SQLITE_FTS_COLUMNS}, content='jobs_job', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+
+SQLITE_CREATE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON jobs_job BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {SQLITE_FTS_COLUMNS}) VALUES (new.id, {SQLITE_FTS_NEW}); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON jobs_job BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {SQLITE_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {SQLITE_FTS_OLD}); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE ON jobs_job BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {SQLITE_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {SQLITE_FTS_OLD}); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {SQLITE_FTS_COLUMNS}) VALUES (new.id, {SQLITE_FTS_NEW}); "
+    f"END",
+)
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        for name, columns in MYSQL_FULLTEXT_INDEXES.items():
+            schema_editor.execute(f"CREATE FULLTEXT INDEX {name} ON jobs_job ({', '.join(columns)})")
+    elif vendor == "sqlite":
+        schema_editor.execute(SQLITE_CREATE_FTS_TABLE)
+        for statement in SQLITE_CREATE_TRIGGERS:
+            schema_editor.execute(statement)
+        schema_editor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        for name in MYSQL_FULLTEXT_INDEXES:
+            schema_editor.execute(f"DROP INDEX {name} ON jobs_job")
+    elif vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:54
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_applications(apps, schema_editor):
+    """
+        Keep the first application of each (job, applicant) pair so the unique
+        constraint can be created on existing data.
+    """
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    duplicates = (
+        JobApplication.objects.values('job_id', 'applicant_id')
+        .annotate(count=Count('id'), first_id=Min('id'))
+        .filter(count__gt=1)
+    )
+    for group in duplicates.iterator():
+        JobApplication.objects.filter(
+            job_id=group['job_id'], applicant_id=group['applicant_id']
+        ).exclude(id=group['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['date_created', 'id'], name='job_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['category', 'date_created'], name='job_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['posted_by', 'date_created'], name='job_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['date_updated'], name='job_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['date_updated'], name='application_updated_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(fields=('job', 'applicant'), name='unique_job_applicant'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:57
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def backfill_counters(apps, schema_editor):
+    # Self-contained (historical models only), so later changes to
+    # jobs.counters can't change this migration
+    Job = apps.get_model('jobs', 'Job')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    applications = JobApplication.objects.filter(job_id=OuterRef("pk")).order_by().values("job_id")
+    last_id = 0
+    while True:
+        ids = list(Job.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:BATCH_SIZE])
+        if not ids:
+            return
+        last_id = ids[-1]
+        Job.objects.filter(id__in=ids).update(
+            application_count=Coalesce(Subquery(applications.annotate(count=Count("id")).values("count")), 0),
+            last_applied_at=Subquery(applications.annotate(last=Max("date_created")).values("last")),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='last_applied_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.5 on 2026-10-17 23:59
+
+from django.db import migrations, models
+
+DESCRIPTION_PREVIEW_LENGTH = 200
+
+
+def make_description_preview(description, length=DESCRIPTION_PREVIEW_LENGTH):
+    # Frozen copy of jobs.models.make_description_preview as of this migration
+    text = " ".join((description or "").split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def backfill_previews(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    last_id = 0
+    while True:
+        jobs = list(Job.objects.filter(id__gt=last_id).order_by('id').only('id', 'description')[:1000])
+        if not jobs:
+            return
+        for job in jobs:
+            job.description_preview = make_description_preview(job.description)
+        Job.objects.bulk_update(jobs, ['description_preview'])
+        last_id = jobs[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_application_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='description_preview',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.RunPython(backfill_previews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_description_preview'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['applicant', 'date_created', 'id'], name='application_applicant_idx'),
+        ),
+    ]
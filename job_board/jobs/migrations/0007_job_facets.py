@@ -0,0 +1,45 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:21
+
+from django.db import migrations, models
+from django.db.models import Count
+
+FACET_COLUMNS = ("category", "location", "company")
+
+
+def backfill_facets(apps, schema_editor):
+    # Self-contained (historical models only), so later changes to
+    # jobs.facets can't change this migration
+    Job = apps.get_model('jobs', 'Job')
+    JobFacet = apps.get_model('jobs', 'JobFacet')
+    rows = []
+    for column in FACET_COLUMNS:
+        counts = (
+            Job.objects.exclude(**{f"{column}__isnull": True}).exclude(**{column: ""})
+            .values(column).annotate(count=Count("id")).order_by()
+        )
+        rows += [JobFacet(facet=column, value=row[column], count=row["count"]) for row in counts.iterator()]
+    JobFacet.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_applicant_applications_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['facet', '-count', 'value'], name='job_facet_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='unique_job_facet_value')],
+            },
+        ),
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,151 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+import unicodedata
+
+# Frozen copies of the jobs.dimensions / jobs.facets rules as of this
+# migration, used with the historical models only
+
+DIMENSION_COLUMNS = ("company", "location", "category")
+
+FACET_COLUMNS = ("category", "location", "company")
+
+KEY_LENGTH = 100
+
+
+def dimension_key(value):
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())[:KEY_LENGTH]
+
+
+def canonical_name(value):
+    return " ".join(str(value or "").split())
+
+
+def intern_jobs(jobs, models, rows):
+    """
+        Point the `<column>_ref` keys of `jobs` at their dimension rows,
+        creating missing ones, and rewrite the values to the canonical
+        names. `rows` maps (column, key) to (id, name) across batches.
+    """
+    for column, model in models.items():
+        names = {}
+        for job in jobs:
+            key = dimension_key(getattr(job, column))
+            if key and (column, key) not in rows:
+                names.setdefault(key, canonical_name(getattr(job, column)))
+        if names:
+            existing = set(model.objects.filter(key__in=names).values_list("key", flat=True))
+            model.objects.bulk_create([model(key=key, name=name) for key, name in names.items() if key not in existing])
+            for pk, key, name in model.objects.filter(key__in=names).values_list("id", "key", "name"):
+                rows[(column, key)] = (pk, name)
+        for job in jobs:
+            row = rows.get((column, dimension_key(getattr(job, column))))
+            if row:
+                setattr(job, column, row[1])
+            setattr(job, f"{column}_ref_id", row[0] if row else None)
+
+
+def rebuild_facets(Job, JobFacet):
+    rows = []
+    for column in FACET_COLUMNS:
+        counts = (
+            Job.objects.exclude(**{f"{column}__isnull": True}).exclude(**{column: ""})
+            .values(column).annotate(count=Count("id")).order_by()
+        )
+        rows += [JobFacet(facet=column, value=row[column], count=row["count"]) for row in counts.iterator()]
+    JobFacet.objects.all().delete()
+    JobFacet.objects.bulk_create(rows, batch_size=1000)
+
+
+def backfill_dimensions(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    models = {
+        'company': apps.get_model('jobs', 'Company'),
+        'location': apps.get_model('jobs', 'Location'),
+        'category': apps.get_model('jobs', 'Category'),
+    }
+    fields = [*DIMENSION_COLUMNS, *(f'{column}_ref' for column in DIMENSION_COLUMNS)]
+    rows = {}
+    last_id = 0
+    while True:
+        jobs = list(Job.objects.filter(id__gt=last_id).order_by('id').only('id', *DIMENSION_COLUMNS)[:1000])
+        if not jobs:
+            break
+        # Canonical names differ only in case, accents and spacing, which the
+        # full-text indexes ignore, so they need no rebuild
+        intern_jobs(jobs, models, rows)
+        Job.objects.bulk_update(jobs, fields)
+        last_id = jobs[-1].id
+    # Values that differed only in spelling are counted together now
+    rebuild_facets(Job, apps.get_model('jobs', 'JobFacet'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+            },
+        ),
+        migrations.CreateModel(
+            name='Company',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'companies',
+            },
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_category_created_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='category_ref',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='jobs', to='jobs.category'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='company_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='jobs', to='jobs.company'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='location_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='jobs', to='jobs.location'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['category_ref', 'date_created'], name='job_category_created_idx'),
+        ),
+        migrations.RunPython(backfill_dimensions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,158 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:32
+
+from django.db import migrations, models
+import math
+import unicodedata
+
+# Frozen copies of the jobs.geo grid and gazetteer as of this migration, so
+# later changes to them can't change what it writes
+
+GEO_FIELDS = ("latitude", "longitude", "geo_cell", "geo_x", "geo_y", "geo_z")
+
+GRID_DEGREES = 0.1
+GRID_ROWS = round(180 / GRID_DEGREES)
+GRID_COLUMNS = round(360 / GRID_DEGREES)
+
+GAZETTEER = {
+    # Mozambique
+    "Maputo": (-25.9692, 32.5732),
+    "Matola": (-25.9622, 32.4589),
+    "Beira": (-19.8436, 34.8389),
+    "Nampula": (-15.1165, 39.2666),
+    "Quelimane": (-17.8786, 36.8883),
+    "Tete": (-16.1564, 33.5867),
+    "Pemba": (-12.9740, 40.5178),
+    "Xai-Xai": (-25.0519, 33.6442),
+    "Chimoio": (-19.1164, 33.4833),
+    "Lichinga": (-13.3128, 35.2406),
+    "Inhambane": (-23.8650, 35.3833),
+    "Maxixe": (-23.8597, 35.3472),
+    "Nacala": (-14.5428, 40.6728),
+    "Dondo": (-19.6094, 34.7431),
+    "Cuamba": (-14.8031, 36.5372),
+    "Montepuez": (-13.1256, 38.9997),
+    "Gurúè": (-15.4667, 36.9833),
+    "Mocuba": (-16.8392, 36.9856),
+    "Chókwè": (-24.5333, 32.9833),
+    "Angoche": (-16.2325, 39.9086),
+    "Manica": (-18.9333, 32.8833),
+    "Moatize": (-16.1167, 33.7333),
+    "Vilankulo": (-22.0000, 35.3167),
+    "Ilha de Moçambique": (-15.0342, 40.7358),
+    # Region
+    "Johannesburg": (-26.2041, 28.0473),
+    "Pretoria": (-25.7479, 28.2293),
+    "Durban": (-29.8587, 31.0218),
+    "Cape Town": (-33.9249, 18.4241),
+    "Mbabane": (-26.3054, 31.1367),
+    "Harare": (-17.8252, 31.0335),
+    "Lilongwe": (-13.9626, 33.7741),
+    "Blantyre": (-15.7861, 35.0058),
+    "Lusaka": (-15.3875, 28.3228),
+    "Dar es Salaam": (-6.7924, 39.2083),
+    "Nairobi": (-1.2921, 36.8219),
+    "Luanda": (-8.8390, 13.2894),
+    "Lisboa": (38.7223, -9.1393),
+    "Porto": (41.1579, -8.6291),
+    "São Paulo": (-23.5505, -46.6333),
+}
+
+ALIASES = {
+    "Lisbon": "Lisboa",
+    "Joburg": "Johannesburg",
+    "Ilha": "Ilha de Moçambique",
+}
+
+
+
+def dimension_key(value):
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())[:100]
+
+
+PLACES = {dimension_key(name): point for name, point in GAZETTEER.items()}
+PLACES.update({dimension_key(alias): GAZETTEER[name] for alias, name in ALIASES.items()})
+
+
+def place_point(name):
+    key = dimension_key(name)
+    if not key:
+        return None
+    return PLACES.get(key) or PLACES.get(key.split(",")[0].strip())
+
+
+def locate_job(job):
+    # The coordinate columns were just added: every point comes from the gazetteer
+    point = place_point(job.location)
+    if point is None:
+        job.latitude = job.longitude = job.geo_cell = job.geo_x = job.geo_y = job.geo_z = None
+        return
+    job.latitude, job.longitude = float(point[0]), float(point[1])
+    row = min(max(math.floor((job.latitude + 90) / GRID_DEGREES), 0), GRID_ROWS - 1)
+    column = min(max(math.floor((job.longitude + 180) / GRID_DEGREES), 0), GRID_COLUMNS - 1)
+    job.geo_cell = row * GRID_COLUMNS + column
+    phi, lam = math.radians(job.latitude), math.radians(job.longitude)
+    job.geo_x, job.geo_y, job.geo_z = math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def backfill_coordinates(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    last_id = 0
+    while True:
+        jobs = list(
+            Job.objects.filter(id__gt=last_id).order_by('id').only('id', 'location', 'latitude', 'longitude')[:1000]
+        )
+        if not jobs:
+            break
+        for job in jobs:
+            locate_job(job)
+        Job.objects.bulk_update(jobs, GEO_FIELDS)
+        last_id = jobs[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_dimensions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geo_cell',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_x',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_y',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_z',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(
+                fields=['geo_cell', 'latitude', 'longitude', 'geo_x', 'geo_y', 'geo_z'], name='job_geo_cell_idx'
+            ),
+        ),
+        migrations.RunPython(backfill_coordinates, migrations.RunPython.noop),
+    ]
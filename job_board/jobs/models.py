@@ -1,5 +1,25 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from .dimensions import DIMENSION_COLUMNS, intern_jobs
+from .facets import loaded_facet_values
+from .geo import GEO_FIELDS, locate_job
+
+
+DESCRIPTION_PREVIEW_LENGTH = 200
+
+
+def make_description_preview(description, length=DESCRIPTION_PREVIEW_LENGTH):
+    """
+        First `length` characters of the description on one line, cut at a
+        word boundary.
+    """
+    text = " ".join((description or "").split())
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "…"
 
 
 class User(AbstractUser):
@@ -25,19 +45,118 @@ class User(AbstractUser):
         }
 
 
+class Dimension(models.Model):
+    """
+        A distinct company, location or category, referenced by jobs (see
+        dimensions.py). `key` is the folded spelling values are interned by.
+    """
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return self.name
+
+
+class Company(Dimension):
+    class Meta:
+        verbose_name_plural = "companies"
+
+
+class Location(Dimension):
+    pass
+
+
+class Category(Dimension):
+    class Meta:
+        verbose_name_plural = "categories"
+
+
+DIMENSION_MODELS = {"company": Company, "location": Location, "category": Category}
+
+
 class Job(models.Model):
     title = models.CharField(max_length=100)
+    # Canonical names of the *_ref rows, interned on save; bulk_create callers must intern_jobs
     company = models.CharField(max_length=100)
     location = models.CharField(max_length=100)
     description = models.TextField()
+    # Derived from description on save; bulk_create callers must set it
+    description_preview = models.CharField(max_length=DESCRIPTION_PREVIEW_LENGTH, blank=True, default="")
     category = models.CharField(max_length=50, null=True, blank=True)
+    company_ref = models.ForeignKey(Company, on_delete=models.PROTECT, null=True, blank=True, related_name="jobs")
+    location_ref = models.ForeignKey(Location, on_delete=models.PROTECT, null=True, blank=True, related_name="jobs")
+    # Leads job_category_created_idx, which serves its lookups
+    category_ref = models.ForeignKey(Category, on_delete=models.PROTECT, null=True, blank=True, related_name="jobs",
+                                     db_index=False)
     posted_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="jobs")
+    # From the gazetteer or the client; the geo_* columns are derived on save
+    # (see geo.py). bulk_create callers must locate_job
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geo_cell = models.IntegerField(null=True, blank=True)
+    geo_x = models.FloatField(null=True, blank=True)
+    geo_y = models.FloatField(null=True, blank=True)
+    geo_z = models.FloatField(null=True, blank=True)
+    # Denormalized from JobApplication, see jobs/counters.py
+    application_count = models.PositiveIntegerField(default=0)
+    last_applied_at = models.DateTimeField(null=True, blank=True)
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of /jobs (newest first)
+            models.Index(fields=["date_created", "id"], name="job_created_id_idx"),
+            models.Index(fields=["category_ref", "date_created"], name="job_category_created_idx"),
+            models.Index(fields=["posted_by", "date_created"], name="job_owner_created_idx"),
+            # Incremental exports, search index refresh and collection ETags
+            models.Index(fields=["date_updated"], name="job_updated_idx"),
+            # Grid cell ranges of geo searches; covers the exact check and distance ordering
+            models.Index(fields=["geo_cell", "latitude", "longitude", "geo_x", "geo_y", "geo_z"],
+                         name="job_geo_cell_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} at {self.company}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Facet values as stored, so saves can move the JobFacet counts
+        instance._stored_facets = loaded_facet_values(instance)
+        instance._stored_geo = instance.loaded_place()
+        return instance
+
+    def loaded_place(self):
+        # (location, latitude, longitude), or None if any of them is deferred
+        if all(field in self.__dict__ for field in ("location", "latitude", "longitude")):
+            return self.location, self.latitude, self.longitude
+        return None
+
+    def save(self, *args, **kwargs):
+        self.description_preview = make_description_preview(self.description)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "description" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "description_preview"}
+        # Only loaded values: reading a deferred one would cost a query
+        columns = [
+            column for column in DIMENSION_COLUMNS
+            if column in self.__dict__ and (update_fields is None or column in update_fields)
+        ]
+        intern_jobs([self], {column: DIMENSION_MODELS[column] for column in columns})
+        if update_fields is not None and columns:
+            kwargs["update_fields"] = {*kwargs["update_fields"], *(f"{column}_ref" for column in columns)}
+        place = {"location", "latitude", "longitude"}
+        if self.loaded_place() and (update_fields is None or place & set(update_fields)):
+            locate_job(self)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], *place, *GEO_FIELDS}
+        super().save(*args, **kwargs)
+        self._stored_geo = self.loaded_place()
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -54,6 +173,25 @@ class Job(models.Model):
         }
 
 
+class JobFacet(models.Model):
+    """
+        Number of jobs per category, location and company value (see
+        facets.py), for search facets over all jobs.
+    """
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["facet", "value"], name="unique_job_facet_value"),
+        ]
+        indexes = [
+            # Top values of a facet, read in index order
+            models.Index(fields=["facet", "-count", "value"], name="job_facet_top_idx"),
+        ]
+
+
 class JobApplication(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="applications")
     applicant = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -61,6 +199,17 @@ class JobApplication(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # One application per user and job; also serves (job, applicant) lookups
+            models.UniqueConstraint(fields=["job", "applicant"], name="unique_job_applicant"),
+        ]
+        indexes = [
+            models.Index(fields=["date_updated"], name="application_updated_idx"),
+            # Keyset pages of an applicant's own applications (newest first)
+            models.Index(fields=["applicant", "date_created", "id"], name="application_applicant_idx"),
+        ]
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -76,3 +225,25 @@ class JobApplication(models.Model):
             "cover_letter": self.cover_letter,
             "date_created": self.date_created.strftime("%Y-%m-%d %H:%M:%S"),
         }
+
+
+class Task(models.Model):
+    """
+        A queued side effect of a write (see tasks.py), run by the run_tasks
+        worker. `run_after` is NULL once the task has used up its attempts.
+    """
+    name = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Due tasks, oldest first
+            models.Index(fields=["run_after", "id"], name="task_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id}"
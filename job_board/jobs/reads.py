@@ -0,0 +1,80 @@
+"""
+    Cached read payloads shared by the DRF views (views.py) and their native
+    async counterparts (async_views.py), so both serve the same data from the
+    same cache entries. These are sync functions: async views call them
+    through sync_to_async.
+"""
+from .cache import get_or_set, job_detail_key, job_list_key
+from .models import Job
+from .pagination import paginate_by_keyset
+from .search import get_search_backend
+from .serializers import serialize_jobs_in_order
+
+
+def jobs_page(cursor, page_size, fieldset):
+    """
+        {"data", "next"} for one keyset page of jobs, or None past the end.
+    """
+    def load_page():
+        jobs, next_cursor = paginate_by_keyset(fieldset.values(), cursor=cursor, page_size=page_size)
+        if not jobs:
+            return None
+        return {"data": [fieldset.to_dict(job) for job in jobs], "next": next_cursor}
+
+    return get_or_set(
+        job_list_key("jobs", {"cursor": cursor or "", "page_size": page_size, "fields": fieldset.key}),
+        load_page
+    )
+
+
+def job_detail(job_id, fieldset):
+    """
+        The job's payload, or None when it doesn't exist.
+    """
+    def load_job():
+        row = fieldset.values(Job.objects.filter(id=job_id)).first()
+        return fieldset.to_dict(row) if row else None
+
+    return get_or_set(job_detail_key(job_id, None if fieldset.is_default else fieldset.key), load_job)
+
+
+def _search_filters(query):
+    return {name: value for name, value in vars(query).items() if value}
+
+
+def search_page(query, page, page_size, fieldset):
+    """
+        {"data", "has_next"} for one page of search results. Searches
+        centered on a point carry each job's `distance_km`.
+    """
+    def load_results():
+        # Rank matching job ids with the configured search backend
+        offset = (page - 1) * page_size
+        job_ids = get_search_backend().search(query, offset, page_size + 1)
+        page_ids = job_ids[:page_size]
+        jobs_list = serialize_jobs_in_order(page_ids, fieldset)
+        if query.area and query.area.center:
+            # Ordered nearest first: tell how near
+            points = {
+                job_id: (latitude, longitude) for job_id, latitude, longitude
+                in Job.objects.filter(id__in=page_ids).values_list("id", "latitude", "longitude")
+            }
+            for job, job_id in zip(jobs_list, [job_id for job_id in page_ids if job_id in points]):
+                job["distance_km"] = query.area.distance_km(*points[job_id])
+        return {
+            "data": jobs_list,
+            "has_next": len(job_ids) > page_size
+        }
+
+    return get_or_set(
+        job_list_key("search", dict(_search_filters(query), page=page, page_size=page_size, fields=fieldset.key)),
+        load_results
+    )
+
+
+def search_facets(query, facet_columns, facet_size):
+    # Cached apart from the pages: every page of a search shares them
+    return get_or_set(
+        job_list_key("facets", dict(_search_filters(query), facets=",".join(facet_columns), facet_size=facet_size)),
+        lambda: get_search_backend().facets(query, facet_columns, facet_size)
+    )
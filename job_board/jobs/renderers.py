@@ -0,0 +1,36 @@
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+from decimal import Decimal
+import orjson
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+        Drop-in replacement for DRF's JSONRenderer built on orjson. datetime,
+        date, UUID and dataclass values are encoded natively (RFC 3339, UTC as
+        `Z`); only values orjson can't handle go through `default`.
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    @staticmethod
+    def default(value):
+        if isinstance(value, Promise):
+            return force_str(value)
+        if isinstance(value, Decimal):
+            return str(value)
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        options = self.options
+        # Honour `Accept: application/json; indent=4` like JSONRenderer (orjson only indents by 2)
+        if accepted_media_type and "indent=" in accepted_media_type:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.default, option=options)
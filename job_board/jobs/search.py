@@ -0,0 +1,301 @@
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from dataclasses import dataclass
+from functools import lru_cache
+from .dimensions import lookup_value
+from .facets import group_facets, rollup_facets
+from .geo import Area
+from .models import DIMENSION_MODELS, Job, JobFacet
+import re
+
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Columns indexed for keyword search, in ranking weight order
+SEARCH_COLUMNS = ("title", "company", "location", "category", "description")
+
+# Columns that can be filtered on their own (title=, company=, location=)
+FIELD_COLUMNS = ("title", "company", "location")
+
+# Columns filtered by exact value (category=), compared on their dimension ids
+EQUALITY_COLUMNS = ("category",)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text or "")
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    keywords: str = None
+    title: str = None
+    company: str = None
+    location: str = None
+    category: str = None
+    area: Area = None
+
+    @classmethod
+    def from_params(cls, params):
+        """
+            Raises GeoError for an invalid area (see geo.Area.from_params).
+        """
+        return cls(
+            area=Area.from_params(params),
+            **{name: params.get(name) for name in ("keywords",) + FIELD_COLUMNS + EQUALITY_COLUMNS}
+        )
+
+    def field_terms(self):
+        return {field: tokenize(getattr(self, field)) for field in FIELD_COLUMNS if getattr(self, field)}
+
+    def keyword_terms(self):
+        return tokenize(self.keywords)
+
+    def has_terms(self):
+        return bool(self.keyword_terms() or self.field_terms())
+
+    def is_empty(self):
+        filters = [self.area, *(getattr(self, column) for column in EQUALITY_COLUMNS)]
+        return not self.has_terms() and not any(filters)
+
+    def dimension_ids(self):
+        """
+            {"<column>_ref_id": id} for the equality filters, or None when a
+            value names no dimension row (nothing can match).
+        """
+        ids = {}
+        for column in EQUALITY_COLUMNS:
+            if getattr(self, column):
+                ids[f"{column}_ref_id"] = lookup_value(DIMENSION_MODELS[column], getattr(self, column))
+                if ids[f"{column}_ref_id"] is None:
+                    return None
+        return ids
+
+
+class BaseSearchBackend:
+    """
+        A search backend turns a SearchQuery into a page of job ids ordered by
+        relevance. The view hydrates the rows with a single `id__in` query.
+
+        `matching` (the unordered Job queryset a query with terms selects,
+        equality and area filters included) is what facet counts are grouped
+        over. Searches around a point are ordered by distance instead of
+        relevance.
+    """
+    def search(self, query, offset, limit):
+        if query.area and query.area.center:
+            return self.nearest(query, offset, limit)
+        if not query.has_terms():
+            return self.browse(query, offset, limit)
+        return self.match(query, offset, limit)
+
+    def browse(self, query, offset, limit):
+        ids = self.filtered(Job.objects.all(), query).order_by("-date_created", "-id").values_list("id", flat=True)
+        return list(ids[offset:offset + limit])
+
+    def nearest(self, query, offset, limit):
+        queryset = self.matching(query) if query.has_terms() else self.filtered(Job.objects.all(), query)
+        ids = queryset.alias(closeness=query.area.closeness()).order_by("-closeness", "-id")
+        return list(ids.values_list("id", flat=True)[offset:offset + limit])
+
+    def filtered(self, queryset, query):
+        ids = query.dimension_ids()
+        if ids is None:
+            return queryset.none()
+        if query.area:
+            queryset = queryset.filter(query.area.condition())
+        return queryset.filter(**ids)
+
+    def match(self, query, offset, limit):
+        raise NotImplementedError
+
+    def matching(self, query):
+        raise NotImplementedError
+
+    def facets(self, query, columns, size):
+        """
+            {column: [{"value", "count"}, ...]}: the `size` most common values
+            of each facet column among the jobs matching `query`. Without
+            filters they are read from the JobFacet rollup.
+        """
+        if query.is_empty():
+            return rollup_facets(JobFacet, columns, size)
+        queryset = self.matching(query) if query.has_terms() else self.filtered(Job.objects.all(), query)
+        # Grouped on plain columns, SQLite walks a *_ref index in group order
+        # over the whole table instead of reading the area's grid cells
+        return group_facets(queryset, columns, size, group_on_index=not query.area)
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+        Portable fallback: every term must appear (case-insensitively) in its
+        column(s). This is a table scan and only meant for databases without a
+        full-text engine.
+    """
+    def match(self, query, offset, limit):
+        ids = self.matching(query).order_by("-date_created", "-id").values_list("id", flat=True)
+        return list(ids[offset:offset + limit])
+
+    def matching(self, query):
+        condition = Q()
+        for field, terms in query.field_terms().items():
+            for term in terms:
+                condition &= Q(**{f"{field}__icontains": term})
+        for term in query.keyword_terms():
+            term_condition = Q()
+            for column in SEARCH_COLUMNS:
+                term_condition |= Q(**{f"{column}__icontains": term})
+            condition &= term_condition
+        return self.filtered(Job.objects.filter(condition), query)
+
+
+"""
+    MySQL: InnoDB FULLTEXT indexes (created by migration 0002) queried in
+    BOOLEAN MODE
+"""
+def mysql_boolean_expression(terms):
+    # Every term is required and matched as a prefix: "dev" finds "developer"
+    return " ".join(f"+{term}*" for term in terms)
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    def conditions(self, query):
+        def against(columns, terms):
+            sql = f"MATCH ({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE)"
+            return sql, [mysql_boolean_expression(terms)]
+
+        conditions = []
+        keyword_terms = query.keyword_terms()
+        if keyword_terms:
+            conditions.append(against(SEARCH_COLUMNS, keyword_terms))
+        for field, terms in query.field_terms().items():
+            conditions.append(against((field,), terms))
+        return conditions
+
+    def matching(self, query):
+        queryset = Job.objects.all()
+        for sql, params in self.conditions(query):
+            queryset = queryset.filter(RawSQL(sql, params, output_field=BooleanField()))
+        return self.filtered(queryset, query)
+
+    def match(self, query, offset, limit):
+        score_sql = []
+        score_params = []
+        for sql, params in self.conditions(query):
+            score_sql.append(sql)
+            score_params += params
+
+        queryset = self.matching(query).annotate(
+            score=RawSQL(" + ".join(score_sql), score_params, output_field=FloatField())
+        ).order_by("-score", "-id")
+        return list(queryset.values_list("id", flat=True)[offset:offset + limit])
+
+
+"""
+    SQLite: FTS5 external-content table kept in sync by triggers
+"""
+SQLITE_FTS_TABLE = "jobs_job_fts"
+
+SQLITE_FTS_COLUMNS = ", ".join(SEARCH_COLUMNS)
+SQLITE_FTS_NEW = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+SQLITE_FTS_OLD = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+SQLITE_CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    f"{SQLITE_FTS_COLUMNS}, content='jobs_job', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+
+SQLITE_CREATE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON jobs_job BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {SQLITE_FTS_COLUMNS}) VALUES (new.id, {SQLITE_FTS_NEW}); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON jobs_job BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {SQLITE_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {SQLITE_FTS_OLD}); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE ON jobs_job BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {SQLITE_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, {SQLITE_FTS_OLD}); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {SQLITE_FTS_COLUMNS}) VALUES (new.id, {SQLITE_FTS_NEW}); "
+    f"END",
+)
+
+
+def sqlite_match_expression(query):
+    def phrase(term):
+        return '"' + term.replace('"', '""') + '"*'
+
+    parts = [phrase(term) for term in query.keyword_terms()]
+    for field, terms in query.field_terms().items():
+        parts += [f"{field} : {phrase(term)}" for term in terms]
+    return " AND ".join(parts)
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    # bm25() weights, one per SEARCH_COLUMNS entry
+    weights = (10.0, 5.0, 3.0, 2.0, 1.0)
+
+    def match(self, query, offset, limit):
+        filters, filter_params = "", []
+        if query.category or query.area:
+            narrowed = self.filtered(Job.objects.all(), query)
+            if narrowed.query.is_empty():
+                return []
+            subquery, filter_params = narrowed.values("id").query.sql_with_params()
+            filters = f"AND rowid IN ({subquery}) "
+        weights = ", ".join(str(weight) for weight in self.weights)
+        sql = (
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s {filters}"
+            f"ORDER BY bm25({SQLITE_FTS_TABLE}, {weights}), rowid DESC LIMIT %s OFFSET %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [sqlite_match_expression(query), *filter_params, limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+    def matching(self, query):
+        return self.filtered(Job.objects.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s",
+            [sqlite_match_expression(query)]
+        )), query)
+
+
+def ensure_sqlite_triggers(using):
+    """
+        SQLite migrations that rebuild jobs_job (most AlterField/AddField) drop
+        its triggers. Row ids are preserved by the rebuild, so re-creating the
+        triggers is enough to keep the FTS table in sync.
+    """
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        tables = conn.introspection.table_names(cursor)
+        if SQLITE_FTS_TABLE not in tables or "jobs_job" not in tables:
+            return
+        for statement in SQLITE_CREATE_TRIGGERS:
+            cursor.execute(statement)
+
+
+DEFAULT_BACKENDS = {
+    "mysql": "jobs.search.MySQLFullTextBackend",
+    "sqlite": "jobs.search.SQLiteFTS5Backend",
+}
+
+
+@lru_cache(maxsize=None)
+def load_search_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    """
+        Backend from the JOB_SEARCH_BACKEND setting, or the full-text engine of
+        the default database.
+    """
+    path = getattr(settings, "JOB_SEARCH_BACKEND", None)
+    if not path:
+        path = DEFAULT_BACKENDS.get(connection.vendor, "jobs.search.DatabaseSearchBackend")
+    return load_search_backend(path)
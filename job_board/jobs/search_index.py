@@ -0,0 +1,305 @@
+from django.conf import settings
+from collections import Counter, defaultdict
+from .cache import search_index_version
+from .dimensions import dimension_key
+from .facets import FACET_COLUMNS, count_facets
+from .models import Job
+from .search import BaseSearchBackend, FIELD_COLUMNS, SEARCH_COLUMNS, TOKEN_RE
+import bisect
+import math
+import threading
+import time
+import unicodedata
+
+
+FIELD_WEIGHTS = dict(zip(SEARCH_COLUMNS, (10.0, 5.0, 3.0, 2.0, 1.0)))
+
+# Job columns the index reads: the searched text plus the coordinates, so
+# area filters and distance ordering need no id__in query
+INDEX_COLUMNS = SEARCH_COLUMNS + ("latitude", "longitude")
+
+
+def normalize(text):
+    """
+        Lowercase and strip accents so "Gestão" and "gestao" index the same way.
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return TOKEN_RE.findall(stripped.casefold())
+
+
+class InvertedIndex:
+    """
+        Per-field postings (field -> term -> {job_id: term frequency}) plus a
+        sorted vocabulary used to expand query terms as prefixes. The raw
+        facet column values and the coordinates of each job are kept for
+        facet counts and area searches.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {field: defaultdict(dict) for field in SEARCH_COLUMNS}
+        self._documents = {}
+        self._facet_values = {}
+        self._points = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        self.watermark = None
+        self.version = None
+        self.last_refresh = 0.0
+
+    def __len__(self):
+        return len(self._documents)
+
+    def stats(self):
+        with self._lock:
+            terms = set()
+            postings = 0
+            for field_postings in self._postings.values():
+                terms.update(field_postings)
+                postings += sum(len(docs) for docs in field_postings.values())
+            return {"documents": len(self._documents), "terms": len(terms), "postings": postings}
+
+    def add(self, job_id, values):
+        with self._lock:
+            self._discard(job_id)
+            document = {}
+            for field in SEARCH_COLUMNS:
+                counts = Counter(normalize(values.get(field)))
+                for term, frequency in counts.items():
+                    if term not in self._postings[field]:
+                        self._vocabulary_dirty = True
+                    self._postings[field][term][job_id] = frequency
+                document[field] = tuple(counts)
+            self._documents[job_id] = document
+            self._facet_values[job_id] = {column: values.get(column) for column in FACET_COLUMNS}
+            point = (values.get("latitude"), values.get("longitude"))
+            if None not in point:
+                self._points[job_id] = point
+
+    def remove(self, job_id):
+        with self._lock:
+            self._discard(job_id)
+
+    def _discard(self, job_id):
+        self._facet_values.pop(job_id, None)
+        self._points.pop(job_id, None)
+        document = self._documents.pop(job_id, None)
+        if document is None:
+            return
+        for field, terms in document.items():
+            field_postings = self._postings[field]
+            for term in terms:
+                docs = field_postings.get(term)
+                if docs is None:
+                    continue
+                docs.pop(job_id, None)
+                if not docs:
+                    del field_postings[term]
+                    self._vocabulary_dirty = True
+
+    def _expand(self, term):
+        if self._vocabulary_dirty:
+            terms = set()
+            for field_postings in self._postings.values():
+                terms.update(field_postings)
+            self._vocabulary = sorted(terms)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\U0010ffff")
+        return self._vocabulary[start:end]
+
+    def _score_term(self, term, fields):
+        """
+            {job_id: score} for every document with a word starting with `term`
+            in one of `fields`, scored as weight * tf * idf.
+        """
+        total = len(self._documents) or 1
+        scores = defaultdict(float)
+        for expanded in self._expand(term):
+            for field in fields:
+                docs = self._postings[field].get(expanded)
+                if not docs:
+                    continue
+                idf = math.log(1 + total / len(docs))
+                weight = FIELD_WEIGHTS[field]
+                for job_id, frequency in docs.items():
+                    scores[job_id] += weight * frequency * idf
+        return scores
+
+    def search(self, query):
+        """
+            Ranked job ids matching every keyword (in any field), every field
+            filter term (in its own field), the category and the area, if any.
+        """
+        clauses = [(term, SEARCH_COLUMNS) for term in normalize(query.keywords)]
+        for field in FIELD_COLUMNS:
+            clauses += [(term, (field,)) for term in normalize(getattr(query, field))]
+
+        with self._lock:
+            totals = None
+            for term, fields in clauses:
+                scores = self._score_term(term, fields)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {job_id: totals[job_id] + score for job_id, score in scores.items() if job_id in totals}
+                if not totals:
+                    return []
+            if totals and query.category:
+                totals = self._in_category(totals, dimension_key(query.category))
+            if totals and query.area:
+                totals = {
+                    job_id: score for job_id, score in totals.items()
+                    if job_id in self._points and query.area.contains(*self._points[job_id])
+                }
+
+        return sorted(totals or {}, key=lambda job_id: (-totals[job_id], -job_id))
+
+    def _in_category(self, totals, key):
+        # Stored values are canonical names: fold each distinct one once
+        keys = {}
+        matching = {}
+        for job_id, score in totals.items():
+            value = self._facet_values[job_id]["category"]
+            if value not in keys:
+                keys[value] = dimension_key(value)
+            if keys[value] == key:
+                matching[job_id] = score
+        return matching
+
+    def by_distance(self, job_ids, area):
+        """
+            `job_ids` nearest the center of `area` first, ties by newest id,
+            as BaseSearchBackend.nearest orders them.
+        """
+        with self._lock:
+            closeness = {
+                job_id: area.closeness_to(*self._points[job_id]) for job_id in job_ids if job_id in self._points
+            }
+        return sorted(closeness, key=lambda job_id: (-closeness[job_id], -job_id))
+
+    def facets(self, job_ids, columns, size):
+        with self._lock:
+            values = [self._facet_values[job_id] for job_id in job_ids if job_id in self._facet_values]
+        return count_facets(values, columns, size)
+
+    def build(self, queryset=None, chunk_size=2000):
+        """
+            (Re)index every job from the database. Returns the build time in seconds.
+        """
+        started = time.perf_counter()
+        # Taken first: a rebuild requested while this one reads runs again
+        version = search_index_version()
+        if queryset is None:
+            queryset = Job.objects.all()
+        fresh = InvertedIndex()
+        for row in queryset.values("id", "date_updated", *INDEX_COLUMNS).iterator(chunk_size=chunk_size):
+            fresh.add(row["id"], row)
+            if fresh.watermark is None or row["date_updated"] > fresh.watermark:
+                fresh.watermark = row["date_updated"]
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._documents = fresh._documents
+            self._facet_values = fresh._facet_values
+            self._points = fresh._points
+            self._vocabulary_dirty = True
+            self.watermark = fresh.watermark
+            self.version = version
+            self.last_refresh = time.monotonic()
+        return time.perf_counter() - started
+
+    def refresh(self):
+        """
+            Catch up with writes made by other workers: re-index rows whose
+            date_updated is at or past the watermark, then drop deleted ids.
+        """
+        self.last_refresh = time.monotonic()
+        changed = Job.objects.all()
+        if self.watermark is not None:
+            changed = changed.filter(date_updated__gte=self.watermark)
+        rows = list(changed.values("id", "date_updated", *INDEX_COLUMNS))
+
+        with self._lock:
+            for row in rows:
+                self.add(row["id"], row)
+                if self.watermark is None or row["date_updated"] > self.watermark:
+                    self.watermark = row["date_updated"]
+            indexed = len(self._documents)
+
+        if Job.objects.count() != indexed:
+            existing = set(Job.objects.values_list("id", flat=True).iterator())
+            with self._lock:
+                for job_id in set(self._documents) - existing:
+                    self._discard(job_id)
+
+    def refresh_if_stale(self):
+        """
+            Every JOB_SEARCH_INDEX_REFRESH_SECONDS: rebuild if a rebuild was
+            requested (rebuild_search_index bumps the shared version), else
+            catch up with other workers' writes.
+        """
+        interval = getattr(settings, "JOB_SEARCH_INDEX_REFRESH_SECONDS", 5)
+        if time.monotonic() - self.last_refresh >= interval:
+            if search_index_version() != self.version:
+                self.build()
+            else:
+                self.refresh()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+        The process-wide index, built on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = InvertedIndex()
+                index.build()
+                _index = index
+    return _index
+
+
+def loaded_index():
+    """
+        The process-wide index if it has been built, without building it.
+    """
+    return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+class InMemorySearchBackend(BaseSearchBackend):
+    """
+        Answers searches from the in-process inverted index; the database is
+        only touched to hydrate the page of ids.
+    """
+    def ranked(self, query):
+        """
+            Every job id matching `query`, area included, best first.
+        """
+        index = get_index()
+        index.refresh_if_stale()
+        return index.search(query)
+
+    def match(self, query, offset, limit):
+        return self.ranked(query)[offset:offset + limit]
+
+    def nearest(self, query, offset, limit):
+        if not query.has_terms():
+            return super().nearest(query, offset, limit)
+        return get_index().by_distance(self.ranked(query), query.area)[offset:offset + limit]
+
+    def facets(self, query, columns, size):
+        if not query.has_terms():
+            return super().facets(query, columns, size)
+        return get_index().facets(self.ranked(query), columns, size)
@@ -0,0 +1,226 @@
+"""
+    Deterministic synthetic data for benchmarks and load tests: users, jobs
+    and applications written with bulk_create in chunks.
+
+    Every chunk draws from its own random generator, seeded from (seed, kind,
+    chunk number), so a seed produces the same users and jobs whether the
+    chunks run in one process or several (with several, jobs may get their
+    ids in a different order, and applications follow the ids).
+
+    Distributions are skewed like real traffic: a few categories, cities and
+    companies hold most jobs, description lengths have a long tail, and
+    applications per job follow a Pareto distribution (most jobs get a
+    handful, a few get hundreds).
+"""
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from .counters import reconcile_counters
+from .dimensions import intern_jobs
+from .facets import rebuild_facets
+from .geo import locate_job
+from .models import DIMENSION_MODELS, User, Job, JobApplication, JobFacet, make_description_preview
+import multiprocessing
+import random
+
+
+# Relative weights
+CATEGORIES = {
+    "IT": 25, "Sales": 15, "Finance": 12, "Health": 12, "Education": 10,
+    "Logistics": 9, "Engineering": 9, "Marketing": 8,
+}
+LOCATIONS = {
+    "Maputo": 35, "Matola": 15, "Beira": 12, "Nampula": 10, "Remote": 10,
+    "Quelimane": 6, "Tete": 5, "Pemba": 4, "Xai-Xai": 3,
+}
+TITLES = ("Backend Developer", "Data Analyst", "Accountant", "Nurse", "Teacher", "Sales Manager",
+          "Driver", "Civil Engineer", "Designer", "Support Technician", "Project Manager", "Pharmacist")
+SENIORITY = ("Junior", "", "", "Senior", "Lead")
+WORDS = (
+    "api backend python django mysql team remote senior junior design build maintain deploy cloud data "
+    "product customer support growth mobile web security testing review mentor lead scale performance "
+    "service platform integration payments logistics health education contract salary benefits flexible"
+).split()
+
+SEED_PASSWORD = "Password123!"
+
+
+def chunk_random(seed, kind, number):
+    return random.Random(f"{seed}:{kind}:{number}")
+
+
+def description(generator, words=None):
+    # Log-normal length: median ~150 words, a long tail past 1,000
+    words = words or min(max(int(generator.lognormvariate(5, 0.6)), 20), 1500)
+    return " ".join(generator.choices(WORDS, k=words)).capitalize() + "."
+
+
+def application_count(generator, mean, limit):
+    # paretovariate(1.5) - 1 has mean 2; scale it to `mean`
+    return min(round((generator.paretovariate(1.5) - 1) * mean / 2), limit)
+
+
+class Plan:
+    """
+        What to generate and the id ranges it lands in. Worker processes get
+        a copy when the pool forks.
+    """
+    def __init__(self, users, jobs, applications_per_job, seed, chunk_size, password_hash):
+        self.users = users
+        self.jobs = jobs
+        self.applications_per_job = applications_per_job
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.password_hash = password_hash
+        self.companies = max(jobs // 50, 1)
+        # bulk_create doesn't return ids on MySQL; new rows are the ones past the current max
+        self.last_user_id = User.objects.aggregate(last=Max("id"))["last"] or 0
+        self.last_job_id = Job.objects.aggregate(last=Max("id"))["last"] or 0
+        self.first_job_id = None
+        self._user_ids = None
+
+    def chunks(self, total):
+        return range((total + self.chunk_size - 1) // self.chunk_size)
+
+    @property
+    def user_ids(self):
+        if self._user_ids is None:
+            self._user_ids = list(
+                User.objects.filter(id__gt=self.last_user_id).order_by("id").values_list("id", flat=True)
+            )
+        return self._user_ids
+
+
+def create_users(plan, number):
+    start = number * plan.chunk_size
+    rows = []
+    for offset in range(start, min(start + plan.chunk_size, plan.users)):
+        name = f"seed_user{plan.last_user_id + offset + 1}"
+        rows.append(User(
+            username=name, email=f"{name}@example.com", first_name="User",
+            other_names=str(plan.last_user_id + offset + 1), password=plan.password_hash,
+        ))
+    with transaction.atomic():
+        User.objects.bulk_create(rows)
+    return len(rows)
+
+
+def create_jobs(plan, number):
+    generator = chunk_random(plan.seed, "jobs", number)
+    user_ids = plan.user_ids
+    categories, category_weights = zip(*CATEGORIES.items())
+    locations, location_weights = zip(*LOCATIONS.items())
+    start = number * plan.chunk_size
+    rows = []
+    for _ in range(start, min(start + plan.chunk_size, plan.jobs)):
+        text = description(generator)
+        rows.append(Job(
+            title=f"{generator.choice(SENIORITY)} {generator.choice(TITLES)}".strip(),
+            # Low company numbers post most of the jobs
+            company=f"Company {int(generator.paretovariate(1.2)) % plan.companies}",
+            location=generator.choices(locations, location_weights)[0],
+            description=text,
+            description_preview=make_description_preview(text),
+            category=generator.choices(categories, category_weights)[0],
+            posted_by_id=generator.choice(user_ids),
+        ))
+    with transaction.atomic():
+        intern_jobs(rows, DIMENSION_MODELS)
+        for job in rows:
+            locate_job(job)
+        Job.objects.bulk_create(rows)
+    return len(rows)
+
+
+def create_applications(plan, number):
+    """
+        Applications for the jobs in chunk `number` of the id range written
+        by create_jobs.
+    """
+    generator = chunk_random(plan.seed, "applications", number)
+    user_ids = plan.user_ids
+    low = plan.first_job_id + number * plan.chunk_size
+    jobs = Job.objects.filter(id__gte=low, id__lt=low + plan.chunk_size).order_by("id")
+    rows = []
+    for job_id, owner_id in jobs.values_list("id", "posted_by_id"):
+        count = application_count(generator, plan.applications_per_job, len(user_ids))
+        for index in generator.sample(range(len(user_ids)), count):
+            if user_ids[index] != owner_id:
+                rows.append(JobApplication(
+                    job_id=job_id, applicant_id=user_ids[index], cover_letter=description(generator, 40)
+                ))
+    with transaction.atomic():
+        JobApplication.objects.bulk_create(rows, batch_size=plan.chunk_size, ignore_conflicts=True)
+    return len(rows)
+
+
+_worker_plan = None
+
+
+def _start_worker(plan):
+    global _worker_plan
+    _worker_plan = plan
+    # A forked worker must open its own database connection
+    connections.close_all()
+
+
+def _run_worker_chunk(task):
+    step, number = task
+    return step(_worker_plan, number)
+
+
+def run_step(step, plan, chunks, workers=1, progress=None):
+    total = 0
+    if workers > 1 and len(chunks) > 1:
+        connections.close_all()
+        pool = multiprocessing.get_context("fork").Pool(workers, initializer=_start_worker, initargs=(plan,))
+        with pool:
+            for created in pool.imap_unordered(_run_worker_chunk, [(step, number) for number in chunks]):
+                total += created
+                if progress:
+                    progress(step.__name__, total)
+    else:
+        for number in chunks:
+            total += step(plan, number)
+            if progress:
+                progress(step.__name__, total)
+    return total
+
+
+def seed(jobs=10000, users=None, applications_per_job=3, seed=0, chunk_size=5000, password_hash=None,
+         workers=1, progress=None):
+    """
+        Add `users` users (default jobs // 10), `jobs` jobs and on average
+        `applications_per_job` applications per job, in chunks of
+        `chunk_size` rows, over `workers` processes (one on SQLite, which
+        takes one writer at a time). Every seeded user gets
+        the same precomputed password hash (of SEED_PASSWORD by default).
+        `progress(step, rows)` is called after each chunk. Returns the number
+        of rows created per model.
+    """
+    if connections["default"].vendor == "sqlite":
+        workers = 1
+    plan = Plan(
+        users=users or max(jobs // 10, 2),
+        jobs=jobs,
+        applications_per_job=applications_per_job,
+        seed=seed,
+        chunk_size=chunk_size,
+        password_hash=password_hash or make_password(SEED_PASSWORD),
+    )
+    created = {
+        "users": run_step(create_users, plan, plan.chunks(plan.users), workers, progress),
+        "jobs": run_step(create_jobs, plan, plan.chunks(plan.jobs), workers, progress),
+        "applications": 0,
+    }
+    if applications_per_job:
+        # Ids of deleted rows may be skipped and parallel chunks may leave gaps: cover the whole new range
+        new_jobs = Job.objects.filter(id__gt=plan.last_job_id).aggregate(first=Min("id"), last=Max("id"))
+        plan.first_job_id = new_jobs["first"] or plan.last_job_id + 1
+        chunks = plan.chunks((new_jobs["last"] or plan.last_job_id) - plan.first_job_id + 1)
+        created["applications"] = run_step(create_applications, plan, chunks, workers, progress)
+
+    # bulk_create skips the signals that maintain the denormalized counters and facets
+    reconcile_counters(Job, JobApplication, batch_size=chunk_size)
+    rebuild_facets(Job, JobFacet)
+    return created
@@ -1,6 +1,7 @@
-from .models import User
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from .models import User, Job, JobApplication
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 from typing import Optional
+from dataclasses import dataclass
 import re
 
 class UserSchema(BaseModel):
@@ -47,6 +48,255 @@ class JobSchema(BaseModel):
     location: str = Field(..., min_length=3, max_length=100, description="location is required!")
     description: str = Field(..., description="description is required!")
     category: Optional[str] = None
+    # Only needed for places the gazetteer doesn't know (see geo.py)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def validate_coordinates(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together.")
+        return self
     
 class JobApplicaitonSchema(BaseModel):
-    cover_letter: str = Field(..., description="cover_letter is required!")
\ No newline at end of file
+    cover_letter: str = Field(..., description="cover_letter is required!")
+
+
+"""
+    Bulk serialization
+
+    Build the same dicts as Job.to_dict() / JobApplication.to_dict() straight
+    from `.values()` rows, joining the related tables in the same SELECT, so a
+    listing costs one query no matter how many rows it returns.
+"""
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_datetime(value):
+    """
+        DATETIME_FORMAT without strftime: isoformat is about twice as fast and
+        gives the same first 19 characters.
+    """
+    return value.isoformat(" ", "seconds")[:19]
+
+JOB_VALUES = (
+    "id", "title", "company", "location", "description", "category",
+    "posted_by_id", "posted_by__first_name", "posted_by__other_names",
+    "date_created",
+)
+
+APPLICATION_VALUES = (
+    "id", "job__title", "job__company", "job__location",
+    "applicant_id", "applicant__first_name", "applicant__other_names",
+    "cover_letter", "date_created",
+)
+
+# An applicant's own applications: job summaries, no cover letters
+APPLICANT_APPLICATION_VALUES = (
+    "id", "job_id", "job__title", "job__company", "job__location", "job__category",
+    "date_created",
+)
+
+DASHBOARD_VALUES = (
+    "id", "title", "company", "location", "category",
+    "application_count", "last_applied_at", "date_created",
+)
+
+
+def job_row_to_dict(row):
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "company": row["company"],
+        "location": row["location"],
+        "description": row["description"],
+        "category": row["category"],
+        "posted_by": {
+            "id": row["posted_by_id"],
+            "full_name": f"{row['posted_by__first_name']} {row['posted_by__other_names']}"
+        },
+        "date_created": format_datetime(row["date_created"]),
+    }
+
+
+def application_row_to_dict(row):
+    return {
+        "id": row["id"],
+        "job": {
+            "title": row["job__title"],
+            "company": row["job__company"],
+            "location": row["job__location"]
+        },
+        "applicant": {
+            "id": row["applicant_id"],
+            "full_name": f"{row['applicant__first_name']} {row['applicant__other_names']}"
+        },
+        "cover_letter": row["cover_letter"],
+        "date_created": format_datetime(row["date_created"]),
+    }
+
+
+def applicant_application_row_to_dict(row):
+    return {
+        "id": row["id"],
+        "job": {
+            "id": row["job_id"],
+            "title": row["job__title"],
+            "company": row["job__company"],
+            "location": row["job__location"],
+            "category": row["job__category"],
+        },
+        "date_created": format_datetime(row["date_created"]),
+    }
+
+
+def dashboard_row_to_dict(row):
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "company": row["company"],
+        "location": row["location"],
+        "category": row["category"],
+        "application_count": row["application_count"],
+        "last_applied_at": format_datetime(row["last_applied_at"]) if row["last_applied_at"] else None,
+        "date_created": format_datetime(row["date_created"]),
+    }
+
+
+def job_values(queryset=None):
+    if queryset is None:
+        queryset = Job.objects.all()
+    return queryset.values(*JOB_VALUES)
+
+
+def application_values(queryset=None):
+    if queryset is None:
+        queryset = JobApplication.objects.all()
+    return queryset.values(*APPLICATION_VALUES)
+
+
+def serialize_jobs(queryset):
+    return [job_row_to_dict(row) for row in job_values(queryset)]
+
+
+def serialize_applications(queryset):
+    return [application_row_to_dict(row) for row in application_values(queryset)]
+
+
+def serialize_jobs_in_order(ids, fieldset=None):
+    """
+        Hydrate a ranked list of job ids with a single `id__in` query, keeping
+        the given order. Ids that no longer exist are skipped.
+    """
+    fieldset = fieldset or JobFieldset()
+    rows = {row["id"]: row for row in fieldset.values(Job.objects.filter(id__in=ids))}
+    return [fieldset.to_dict(rows[pk]) for pk in ids if pk in rows]
+
+
+"""
+    Sparse fieldsets
+    `?fields=id,title,description_preview` limits a job payload to the listed
+    keys and `?expand=posted_by` adds the poster's name (a join on the users
+    table). Only the columns behind the requested keys are SELECTed.
+"""
+JOB_FIELDS = {
+    "id": ("id",),
+    "title": ("title",),
+    "company": ("company",),
+    "location": ("location",),
+    "description": ("description",),
+    "description_preview": ("description_preview",),
+    "category": ("category",),
+    "latitude": ("latitude",),
+    "longitude": ("longitude",),
+    "posted_by": ("posted_by_id",),
+    "date_created": ("date_created",),
+}
+
+JOB_EXPANSIONS = {
+    "posted_by": ("posted_by__first_name", "posted_by__other_names"),
+}
+
+# The shape of Job.to_dict(), returned when no fields/expand are given
+DEFAULT_JOB_FIELDS = ("id", "title", "company", "location", "description", "category", "posted_by", "date_created")
+DEFAULT_JOB_EXPAND = ("posted_by",)
+
+
+class FieldSelectionError(ValueError):
+    pass
+
+
+def _split_param(value):
+    return tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+
+
+@dataclass(frozen=True)
+class JobFieldset:
+    fields: tuple = DEFAULT_JOB_FIELDS
+    expand: tuple = DEFAULT_JOB_EXPAND
+
+    @classmethod
+    def from_params(cls, params):
+        fields = params.get("fields")
+        expand = params.get("expand")
+        if fields is None and expand is None:
+            return cls()
+
+        fields = _split_param(fields) if fields is not None else DEFAULT_JOB_FIELDS
+        expand = _split_param(expand) if expand is not None else ()
+        unknown = [name for name in fields if name not in JOB_FIELDS]
+        if unknown:
+            raise FieldSelectionError(
+                f"Unknown field(s): {', '.join(unknown)}. Use any of: {', '.join(JOB_FIELDS)}."
+            )
+        unknown = [name for name in expand if name not in JOB_EXPANSIONS]
+        if unknown:
+            raise FieldSelectionError(
+                f"Unknown expansion(s): {', '.join(unknown)}. Use any of: {', '.join(JOB_EXPANSIONS)}."
+            )
+        if not fields:
+            raise FieldSelectionError("fields must name at least one field.")
+        # Expanding a relation implies returning it
+        fields += tuple(name for name in expand if name not in fields)
+        return cls(fields, expand)
+
+    @property
+    def is_default(self):
+        return self.fields == DEFAULT_JOB_FIELDS and self.expand == DEFAULT_JOB_EXPAND
+
+    @property
+    def key(self):
+        return f"{','.join(self.fields)};{','.join(self.expand)}"
+
+    @property
+    def columns(self):
+        # id and date_created are always read: result ordering and keyset cursors use them
+        columns = ["id", "date_created"]
+        for name in self.fields:
+            columns.extend(JOB_FIELDS[name])
+        for name in self.expand:
+            columns.extend(JOB_EXPANSIONS[name])
+        return tuple(dict.fromkeys(columns))
+
+    def values(self, queryset=None):
+        if self.is_default:
+            return job_values(queryset)
+        if queryset is None:
+            queryset = Job.objects.all()
+        return queryset.values(*self.columns)
+
+    def to_dict(self, row):
+        if self.is_default:
+            return job_row_to_dict(row)
+        data = {}
+        for name in self.fields:
+            if name == "posted_by":
+                posted_by = {"id": row["posted_by_id"]}
+                if "posted_by" in self.expand:
+                    posted_by["full_name"] = f"{row['posted_by__first_name']} {row['posted_by__other_names']}"
+                data[name] = posted_by
+            elif name == "date_created":
+                data[name] = format_datetime(row["date_created"])
+            else:
+                data[name] = row[name]
+        return data
@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from .authentication import revoked_users
+from .cache import invalidate_applicant, invalidate_job
+from .dimensions import interned
+from .facets import facet_changes, loaded_facet_values
+from .metrics import record_query
+from .models import User, Company, Location, Category, Job, JobApplication
+from .search import ensure_sqlite_triggers
+from .search_index import INDEX_COLUMNS, loaded_index
+from .tasks import enqueue
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Wrappers outlive reconnects of the same connection object
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == "jobs":
+        ensure_sqlite_triggers(using)
+
+
+@receiver(post_migrate)
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Category)
+def forget_interned_dimensions(sender, **kwargs):
+    # Remembered ids may be gone (deleted rows, or tables flushed by tests and loaddata)
+    interned.clear()
+
+
+@receiver(post_save, sender=Job)
+def index_saved_job(sender, instance, **kwargs):
+    index = loaded_index()
+    if index is None:
+        return
+    values = {field: getattr(instance, field) for field in INDEX_COLUMNS}
+    transaction.on_commit(lambda: index.add(instance.id, values))
+
+
+@receiver(post_delete, sender=Job)
+def unindex_deleted_job(sender, instance, **kwargs):
+    index = loaded_index()
+    if index is None:
+        return
+    job_id = instance.id
+    transaction.on_commit(lambda: index.remove(job_id))
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_cached_job(sender, instance, **kwargs):
+    job_id = instance.id
+    transaction.on_commit(lambda: invalidate_job(job_id))
+
+
+@receiver(post_save, sender=Job)
+def count_saved_job_facets(sender, instance, created, update_fields=None, **kwargs):
+    after = loaded_facet_values(instance)
+    if update_fields is not None:
+        after = {column: value for column, value in after.items() if column in update_fields}
+    if created:
+        before = {}
+    elif hasattr(instance, "_stored_facets"):
+        before = instance._stored_facets
+        # A column deferred at load has no known old value to take the count from
+        after = {column: value for column, value in after.items() if column in before}
+    else:
+        # Saved without being loaded (Job(id=...).save()): rebuild_job_facets repairs it
+        return
+    queue_facet_changes(facet_changes(before, after))
+    instance._stored_facets = {**before, **after}
+
+
+@receiver(post_delete, sender=Job)
+def count_deleted_job_facets(sender, instance, **kwargs):
+    stored = getattr(instance, "_stored_facets", None) or loaded_facet_values(instance)
+    queue_facet_changes(facet_changes(stored, {column: None for column in stored}))
+
+
+def queue_facet_changes(changes):
+    # The rollup rows are adjusted by the task worker, off the write's transaction
+    changes = [[facet, value, delta] for (facet, value), delta in changes.items() if delta and value not in (None, "")]
+    if changes:
+        enqueue(("adjust_facets", {"changes": changes}))
+
+
+@receiver(post_save, sender=JobApplication)
+def queue_created_application_tasks(sender, instance, created, **kwargs):
+    if created:
+        enqueue(
+            ("count_applications", {"job_id": instance.job_id}),
+            ("notify_job_owner", {"application_id": instance.id}),
+        )
+
+
+@receiver(post_delete, sender=JobApplication)
+def queue_deleted_application_tasks(sender, instance, **kwargs):
+    enqueue(("count_applications", {"job_id": instance.job_id}))
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_applicant_applications(sender, instance, created=True, **kwargs):
+    # Edits don't show in the listing (it has no cover letters); creates and deletes do
+    if created:
+        applicant_id = instance.applicant_id
+        transaction.on_commit(lambda: invalidate_applicant(applicant_id))
+
+
+@receiver(post_save, sender=User)
+def track_active_user(sender, instance, **kwargs):
+    revoked_users.user_saved(instance.id, instance.is_active)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    revoked_users.user_deleted(instance.id)
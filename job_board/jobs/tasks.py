@@ -0,0 +1,193 @@
+"""
+    Durable background tasks for the side effects of writes: recounting
+    application counters, adjusting the facet rollup and notifying job
+    owners. Tasks are rows of the Task table, so no broker is needed.
+
+    `enqueue` inserts the tasks in the writer's transaction (a transactional
+    outbox): they exist exactly when the write that produced them commits,
+    and the request returns without running them. The run_tasks command
+    claims due tasks in batches (FOR UPDATE SKIP LOCKED where supported,
+    plus a lease, so tasks claimed by a crashed worker come back) and calls
+    each handler once per batch with the payloads of all its tasks. A
+    handler's database writes commit together with the deletion of its
+    tasks. Handlers recompute from the source rows instead of applying
+    deltas, so a batch that runs twice (its lease ran out mid-run and
+    another worker claimed it) does no harm. Mail can't be rolled back, so
+    it is sent outside any transaction and its tasks are deleted afterwards,
+    in their own: at least once, never for a write that rolled back. A
+    failing batch is retried task by task; failing tasks are retried with
+    exponential backoff, then parked (`run_after` NULL) with their error
+    until `retry_failed_tasks` (run_tasks --retry-failed) requeues them.
+
+    With JOB_TASKS_EAGER, tasks run in the writing process once its
+    transaction commits (transaction.on_commit), for development without a
+    worker.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from datetime import timedelta
+from .counters import recount_applications
+from .facets import recount_facets
+from .models import Job, JobApplication, JobFacet, Task
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def task_handler(name, atomic=True):
+    """
+        Register `function(payloads)` to run the tasks named `name`. Handlers
+        with side effects outside the database pass atomic=False: they run
+        outside a transaction, and their tasks are deleted once they return.
+    """
+    def register(function):
+        _handlers[name] = (function, atomic)
+        return function
+    return register
+
+
+def enqueue(*tasks):
+    """
+        Queue (name, payload) tasks in the current transaction, with one
+        INSERT.
+    """
+    unknown = [name for name, _ in tasks if name not in _handlers]
+    if unknown:
+        raise ValueError(f"Unknown tasks: {', '.join(unknown)}.")
+    now = timezone.now()
+    rows = Task.objects.bulk_create([Task(name=name, payload=payload, run_after=now) for name, payload in tasks])
+    if getattr(settings, "JOB_TASKS_EAGER", False):
+        transaction.on_commit(run_due_tasks)
+    return rows
+
+
+def claim_tasks(batch_size):
+    """
+        Up to `batch_size` due tasks, oldest first, leased to the caller for
+        JOB_TASK_LEASE seconds.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, "JOB_TASK_LEASE", 300))
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+            .filter(run_after__lte=now).order_by("run_after", "id")[:batch_size]
+        )
+        if tasks:
+            Task.objects.filter(id__in=[task.id for task in tasks]).update(run_after=now + lease)
+    return tasks
+
+
+def run_tasks(batch_size=None):
+    """
+        Claim and run one batch of due tasks. Returns (done, failed).
+    """
+    tasks = claim_tasks(batch_size or getattr(settings, "JOB_TASK_BATCH_SIZE", 100))
+    groups = {}
+    for task in tasks:
+        groups.setdefault(task.name, []).append(task)
+
+    done = failed = 0
+    for name, group in groups.items():
+        error = _run(name, group)
+        if error is None:
+            done += len(group)
+            continue
+        # One bad payload must not hold back the rest of its batch
+        results = [(task, _run(name, [task])) for task in group] if len(group) > 1 else [(group[0], error)]
+        for task, error in results:
+            if error is None:
+                done += 1
+            else:
+                _retry(task, error)
+                failed += 1
+    return done, failed
+
+
+def run_due_tasks(batch_size=None):
+    """
+        Run batches until no task is due. Returns (done, failed).
+    """
+    done = failed = 0
+    while True:
+        batch_done, batch_failed = run_tasks(batch_size)
+        if not batch_done and not batch_failed:
+            return done, failed
+        done += batch_done
+        failed += batch_failed
+
+
+def retry_failed_tasks():
+    """
+        Requeue the parked tasks with fresh attempts. Returns their number.
+    """
+    return Task.objects.filter(run_after__isnull=True).update(run_after=timezone.now(), attempts=0)
+
+
+def _run(name, tasks):
+    handler, atomic = _handlers[name]
+    try:
+        if atomic:
+            with transaction.atomic():
+                handler([task.payload for task in tasks])
+                Task.objects.filter(id__in=[task.id for task in tasks]).delete()
+        else:
+            handler([task.payload for task in tasks])
+            Task.objects.filter(id__in=[task.id for task in tasks]).delete()
+    except Exception as error:
+        logger.warning("Task %s failed for %s task(s): %s", name, len(tasks), error, exc_info=True)
+        return error
+    return None
+
+
+def _retry(task, error):
+    attempts = task.attempts + 1
+    if attempts >= getattr(settings, "JOB_TASK_MAX_ATTEMPTS", 5):
+        logger.error("Task %s #%s failed %s times, giving up: %s", task.name, task.id, attempts, error)
+        run_after = None
+    else:
+        delay = getattr(settings, "JOB_TASK_RETRY_DELAY", 10) * 2 ** (attempts - 1)
+        run_after = timezone.now() + timedelta(seconds=delay)
+    Task.objects.filter(id=task.id).update(
+        attempts=attempts, run_after=run_after, last_error=f"{type(error).__name__}: {error}"
+    )
+
+
+@task_handler("count_applications")
+def count_applications(payloads):
+    recount_applications(Job, JobApplication, {payload["job_id"] for payload in payloads})
+
+
+@task_handler("adjust_facets")
+def adjust_facet_counts(payloads):
+    # The deltas only name the values to recount
+    recount_facets(Job, JobFacet, {
+        (facet, value) for payload in payloads for facet, value, _ in payload["changes"]
+    })
+
+
+@task_handler("notify_job_owner", atomic=False)
+def notify_job_owners(payloads):
+    # Applications deleted in the meantime are skipped
+    applications = JobApplication.objects.select_related("job__posted_by", "applicant").only(
+        "cover_letter", "job__title", "job__company", "job__posted_by__email",
+        "applicant__first_name", "applicant__other_names",
+    ).filter(id__in=[payload["application_id"] for payload in payloads])
+    messages = [
+        EmailMessage(
+            subject=f"New application for {application.job.title}",
+            body=(
+                f"{application.applicant.first_name} {application.applicant.other_names} applied for "
+                f"{application.job.title} at {application.job.company}.\n\n{application.cover_letter}"
+            ),
+            to=[application.job.posted_by.email],
+        )
+        for application in applications
+    ]
+    if messages:
+        get_connection().send_messages(messages)
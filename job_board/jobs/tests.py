@@ -1,3 +1,1496 @@
-from django.test import TestCase
+from django.core import mail
+from django.db import IntegrityError, connection, transaction
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.core.cache import cache
+from django.core.management import call_command
+from io import StringIO
+from datetime import timedelta
+import csv
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from unittest import mock
+import brotli
+from .models import User, Company, Location, Category, Job, JobApplication, JobFacet, Task
+from django.contrib.auth.hashers import make_password
+from asgiref.sync import sync_to_async
+from .authentication import issue_tokens, revoked_users
+from .dimensions import intern_values, interned
+from .geo import Area
+from .hashers import BoundedExecutor, LoginBusy
+from .benchmark import SCENARIOS, BenchmarkContext, compare, run_scenario
+from .loadtest import summarize
+from .seeding import SEED_PASSWORD, seed
+from .urls import urlpatterns
+from .log import QueueListenerHandler, RequestIdFilter
+from .metrics import registry as metrics_registry
+from .cache import cache_stats, get_or_set, invalidate_job, job_detail_key, reset_cache_stats
+from .pagination import encode_cursor, keyset_window
+from .importer import decode_lines, import_jobs, iter_records
+from .search import SearchQuery, get_search_backend
+from .serializers import JobApplicaitonSchema, job_values
+from .search_index import InvertedIndex, get_index, reset_index
+from .tasks import run_due_tasks
 
-# Create your tests here.
+
+def create_user(username, **kwargs):
+    return User.objects.create(
+        first_name=kwargs.pop("first_name", "John"),
+        other_names=kwargs.pop("other_names", "Doe"),
+        email=kwargs.pop("email", f"{username}@example.com"),
+        username=username,
+        password="!",
+        **kwargs
+    )
+
+
+def create_job(user, **kwargs):
+    return Job.objects.create(
+        title=kwargs.pop("title", "Backend Developer"),
+        company=kwargs.pop("company", "Onit"),
+        location=kwargs.pop("location", "Maputo"),
+        description=kwargs.pop("description", "Build and maintain APIs."),
+        category=kwargs.pop("category", "IT"),
+        posted_by=user,
+        **kwargs
+    )
+
+
+class APITestMixin:
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        # Ids remembered by captured on_commit callbacks are rolled back with the test
+        interned.clear()
+        self.addCleanup(interned.clear)
+        self.user = create_user("johndoe")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class JobsPaginationTests(APITestMixin, TestCase):
+    def test_pages_cover_all_jobs_newest_first(self):
+        jobs = [create_job(self.user, title=f"Job {i}") for i in range(7)]
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"page_size": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(reverse("jobs"), params)
+            self.assertEqual(response.status_code, 200)
+            seen += [job["id"] for job in response.data["data"]]
+            cursor = response.data["next"]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, [job.id for job in reversed(jobs)])
+
+    def test_page_size_is_capped(self):
+        create_job(self.user)
+        with self.settings(REST_FRAMEWORK={"PAGE_SIZE": 25, "MAX_PAGE_SIZE": 1}):
+            create_job(self.user)
+            response = self.client.get(reverse("jobs"), {"page_size": 50})
+        self.assertEqual(len(response.data["data"]), 1)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_cursor_is_rejected(self):
+        create_job(self.user)
+        response = self.client.get(reverse("jobs"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkSerializationQueryCountTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.owners = [create_user(f"owner{i}") for i in range(5)]
+        self.jobs = [create_job(owner) for owner in self.owners]
+
+    def test_job_listing_is_a_single_query(self):
+        # One aggregate for the ETag/Last-Modified validators (cached until
+        # the next write), one for the page
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("jobs"))
+        self.assertEqual(len(response.data["data"]), 5)
+        self.assertEqual(response.data["data"][0], self.jobs[-1].to_dict())
+
+    def test_search_ranks_then_hydrates_in_two_queries(self):
+        # Plus one aggregate for the ETag/Last-Modified validators
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("search_jobs"), {"title": "developer"})
+        self.assertEqual(len(response.data["data"]), 5)
+
+    def test_owner_applications_cost_two_queries(self):
+        job = create_job(self.user)
+        applications = [
+            JobApplication.objects.create(job=job, applicant=owner, cover_letter="Hi")
+            for owner in self.owners
+        ]
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("applications_for_job_owner", args=[job.id]))
+        self.assertEqual(len(response.data["data"]), 5)
+        self.assertIn(applications[0].to_dict(), response.data["data"])
+
+
+class SearchTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.python = create_job(self.user, title="Python Developer", description="Django REST APIs")
+        self.frontend = create_job(
+            self.user, title="Frontend Developer", location="Beira", description="React and Python tooling"
+        )
+        self.accountant = create_job(self.user, title="Contabilista", company="Banco", description="Gestão financeira")
+
+    def search(self, **params):
+        response = self.client.get(reverse("search_jobs"), params)
+        ids = [job["id"] for job in response.data.get("data", [])]
+        return response, ids
+
+    def test_keywords_are_ranked_by_relevance(self):
+        _, ids = self.search(keywords="python")
+        self.assertEqual(ids, [self.python.id, self.frontend.id])
+
+    def test_all_keywords_are_required(self):
+        _, ids = self.search(keywords="python react")
+        self.assertEqual(ids, [self.frontend.id])
+
+    def test_keywords_match_prefixes_and_ignore_accents(self):
+        _, ids = self.search(keywords="gestao financ")
+        self.assertEqual(ids, [self.accountant.id])
+
+    def test_field_filters_are_scoped_to_their_column(self):
+        _, ids = self.search(title="developer", location="beira")
+        self.assertEqual(ids, [self.frontend.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.python.title = "Data Engineer"
+        self.python.save()
+        self.frontend.delete()
+
+        _, ids = self.search(title="developer")
+        self.assertEqual(ids, [])
+        _, ids = self.search(title="engineer")
+        self.assertEqual(ids, [self.python.id])
+
+    def test_pagination(self):
+        response, ids = self.search(title="developer", page_size=1)
+        self.assertEqual(response.data["next_page"], 2)
+        response, next_ids = self.search(title="developer", page_size=1, page=2)
+        self.assertIsNone(response.data["next_page"])
+        self.assertEqual(len(ids + next_ids), 2)
+        self.assertNotEqual(ids, next_ids)
+
+    def test_facets_count_the_matching_jobs(self):
+        response, _ = self.search(keywords="python", facets="location,company")
+        self.assertEqual(response.data["facets"], {
+            "location": [{"value": "Beira", "count": 1}, {"value": "Maputo", "count": 1}],
+            "company": [{"value": "Onit", "count": 2}],
+        })
+
+    def test_category_is_an_exact_filter(self):
+        nurse = create_job(self.user, title="Python Nurse", category="Health")
+        _, ids = self.search(keywords="python", category=" HEALTH")
+        self.assertEqual(ids, [nurse.id])
+        _, ids = self.search(category="it")
+        self.assertEqual(ids, [self.accountant.id, self.frontend.id, self.python.id])
+        response, _ = self.search(category="Heal")
+        self.assertEqual(response.status_code, 404)
+
+        response, _ = self.search(category="IT", facets="company")
+        self.assertEqual(response.data["facets"], {
+            "company": [{"value": "Onit", "count": 2}, {"value": "Banco", "count": 1}],
+        })
+
+    def test_near_a_place_orders_by_distance(self):
+        matola = create_job(self.user, title="Python Analyst", location="Matola")
+        response, ids = self.search(near="maputo", radius_km=30)
+        self.assertEqual(ids, [self.accountant.id, self.python.id, matola.id])
+        self.assertEqual(response.data["data"][0]["distance_km"], 0)
+        self.assertAlmostEqual(response.data["data"][2]["distance_km"], 11.4, delta=0.5)
+
+        _, ids = self.search(keywords="python", lat="-19.84", lon="34.84", radius_km=5)
+        self.assertEqual(ids, [self.frontend.id])
+        response, _ = self.search(near="Matola", radius_km=5, facets="location")
+        self.assertEqual(response.data["facets"], {"location": [{"value": "Matola", "count": 1}]})
+        response, _ = self.search(keywords="python", near="Matola", radius_km=5, facets="location")
+        self.assertEqual(response.data["facets"], {"location": [{"value": "Matola", "count": 1}]})
+
+    def test_bounding_box(self):
+        _, ids = self.search(bbox="-21,34,-19,35")
+        self.assertEqual(ids, [self.frontend.id])
+        _, ids = self.search(keywords="python", bbox="-27,32,-25,33")
+        self.assertEqual(ids, [self.python.id])
+
+    def test_invalid_areas_are_rejected(self):
+        for params in ({"near": "Atlantis"}, {"lat": "-25.9"}, {"lat": "-25.9", "lon": "32.5", "radius_km": "5000"},
+                       {"bbox": "-27,32,-25"}, {"bbox": "-25,32,-27,33"}):
+            response, _ = self.search(**params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_unfiltered_facets(self):
+        run_due_tasks()
+        response, _ = self.search(facets="category,company", facet_size=1)
+        self.assertEqual(response.data["facets"], {
+            "category": [{"value": "IT", "count": 3}],
+            "company": [{"value": "Onit", "count": 2}],
+        })
+
+    @override_settings(JOB_SEARCH_BACKEND="jobs.search.DatabaseSearchBackend")
+    def test_database_backend_matches_the_same_jobs(self):
+        _, ids = self.search(keywords="python react")
+        self.assertEqual(ids, [self.frontend.id])
+
+
+@override_settings(
+    JOB_SEARCH_BACKEND="jobs.search_index.InMemorySearchBackend",
+    JOB_SEARCH_INDEX_REFRESH_SECONDS=3600,
+)
+class InMemorySearchTests(SearchTests):
+    def setUp(self):
+        reset_index()
+        self.addCleanup(reset_index)
+        super().setUp()
+
+    def test_index_follows_updates_and_deletes(self):
+        get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.title = "Data Engineer"
+            self.python.save()
+            self.frontend.delete()
+
+        _, ids = self.search(title="developer")
+        self.assertEqual(ids, [])
+        _, ids = self.search(title="engineer")
+        self.assertEqual(ids, [self.python.id])
+
+    def test_refresh_picks_up_writes_from_other_workers(self):
+        index = get_index()
+        Job.objects.filter(id=self.accountant.id).delete()
+        job = create_job(self.user, title="Motorista")
+        index.refresh()
+        self.assertEqual(index.search(SearchQuery(title="motorista")), [job.id])
+        self.assertEqual(index.search(SearchQuery(keywords="contabilista")), [])
+
+    def test_rebuild_command_rebuilds_the_serving_index(self):
+        index = get_index()
+        # A bulk UPDATE keeps date_updated, so a refresh can't see it
+        Job.objects.filter(id=self.python.id).update(title="Motorista")
+        index.last_refresh = 0
+        self.assertEqual(self.search(title="motorista")[1], [])
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 3 jobs", out.getvalue())
+        index.last_refresh = 0
+        self.assertEqual(self.search(title="motorista")[1], [self.python.id])
+        self.assertIs(get_index(), index)
+
+    def test_area_searches_bind_only_the_page_of_ids(self):
+        for _ in range(4):
+            create_job(self.user, title="Python Analyst", location="Matola")
+        get_index()
+        for params in ({"near": "maputo", "radius_km": 30}, {"bbox": "-27,32,-25,33"}):
+            with CaptureQueriesContext(connection) as context:
+                _, ids = self.search(keywords="python", page_size=2, facets="location", **params)
+            self.assertEqual(len(ids), 2)
+            for query in context.captured_queries:
+                for values in re.findall(r"IN \(([\d, ]+)\)", query["sql"]):
+                    self.assertLessEqual(len(values.split(",")), 2, query["sql"])
+
+
+class InvertedIndexTests(TestCase):
+    def test_accents_and_case_are_normalized(self):
+        index = InvertedIndex()
+        index.add(1, {"title": "Técnico de Manutenção", "location": "Maputo"})
+        index.add(2, {"title": "Tecnico", "location": "MAPUTO"})
+        self.assertEqual(index.search(SearchQuery(keywords="manutencao")), [1])
+        self.assertEqual(sorted(index.search(SearchQuery(location="maputo"))), [1, 2])
+        index.remove(1)
+        self.assertEqual(index.search(SearchQuery(keywords="técnico")), [2])
+        self.assertEqual(index.stats()["documents"], 1)
+
+
+class SparseFieldsetTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = create_job(self.user, description="Build   and maintain APIs.\n" + "Python " * 100)
+
+    def get_sql(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"], " ".join(q["sql"] for q in context.captured_queries)
+
+    def test_fields_limit_payload_and_columns(self):
+        urls = [reverse("jobs"), reverse("search_jobs"), reverse("job_detail", args=[self.job.id])]
+        for url in urls:
+            cache.clear()
+            data, sql = self.get_sql(url, {"fields": "id,title,description_preview", "keywords": "python"})
+            job = data[0] if isinstance(data, list) else data
+            self.assertEqual(list(job), ["id", "title", "description_preview"])
+            self.assertTrue(job["description_preview"].startswith("Build and maintain APIs. Python"))
+            self.assertNotIn('"description"', sql.replace("`", '"'))
+            self.assertNotIn("first_name", sql)
+
+    def test_expand_posted_by(self):
+        data, sql = self.get_sql(reverse("jobs"), {"fields": "id,posted_by"})
+        self.assertEqual(data[0]["posted_by"], {"id": self.user.id})
+        data, sql = self.get_sql(reverse("jobs"), {"fields": "id", "expand": "posted_by"})
+        self.assertEqual(data[0]["posted_by"], {"id": self.user.id, "full_name": "John Doe"})
+
+    def test_default_shape_unchanged(self):
+        data, _ = self.get_sql(reverse("job_detail", args=[self.job.id]), {})
+        self.assertEqual(data, Job.objects.get(id=self.job.id).to_dict())
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse("jobs"), {"fields": "id,salary"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("salary", response.json()["message"])
+
+    def test_preview_is_computed_on_save(self):
+        self.assertLessEqual(len(self.job.description_preview), 200)
+        self.assertTrue(self.job.description_preview.endswith("…"))
+        self.job.description = "Short."
+        self.job.save(update_fields=["description"])
+        self.assertEqual(Job.objects.get(id=self.job.id).description_preview, "Short.")
+
+
+class RenderingAndCompressionTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for number in range(20):
+            create_job(self.user, title=f"Job {number}", description="Build and maintain APIs. " * 20)
+
+    def test_orjson_renderer_keeps_payload(self):
+        response = self.client.get(reverse("jobs"))
+        self.assertEqual(response["Content-Type"], "application/json")
+        body = json.loads(response.content)
+        self.assertEqual(body["data"][0], Job.objects.order_by("-date_created", "-id")[0].to_dict())
+
+    def test_negotiated_compression(self):
+        for encoding, decompress in (("br", brotli.decompress), ("gzip", gzip.decompress)):
+            response = self.client.get(reverse("jobs"), headers={"accept-encoding": f"{encoding}, identity"})
+            self.assertEqual(response["Content-Encoding"], encoding)
+            self.assertIn("Accept-Encoding", response["Vary"])
+            self.assertEqual(json.loads(decompress(response.content))["data"][0]["title"], "Job 19")
+            self.assertTrue(response["ETag"].startswith('W/"'))
+
+            not_modified = self.client.get(
+                reverse("jobs"), headers={"accept-encoding": encoding, "if-none-match": response["ETag"]}
+            )
+            self.assertEqual(not_modified.status_code, 304)
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        response = self.client.get(reverse("jobs"), {"fields": "id"}, headers={"accept-encoding": "br, gzip"})
+        self.assertNotIn("Content-Encoding", response)
+        response = self.client.get(reverse("jobs"), headers={"accept-encoding": "gzip;q=0"})
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_brotli_is_optional(self):
+        with mock.patch("jobs.middleware.brotli", None):
+            response = self.client.get(reverse("jobs"), headers={"accept-encoding": "br, gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_rendering", "--sizes", "10", "--repeat", "1", stdout=out)
+        self.assertIn("ORJSONRenderer", out.getvalue())
+        self.assertIn("gzip:", out.getvalue())
+
+
+class CacheTests(APITestMixin, TestCase):
+    def test_job_detail_is_served_from_cache(self):
+        job = create_job(self.user)
+        url = reverse("job_detail", args=[job.id])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["data"], job.to_dict())
+        # The validator lookup caches the job body too: one miss, then hits
+        self.assertEqual(cache_stats()["hits"], 3)
+        self.assertEqual(cache_stats()["misses"], 1)
+
+    def test_writes_invalidate_detail_and_listings(self):
+        job = create_job(self.user, title="Old title")
+        self.client.get(reverse("job_detail", args=[job.id]))
+        self.client.get(reverse("jobs"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(reverse("job_detail", args=[job.id]), {"title": "New title"}, format="json")
+
+        response = self.client.get(reverse("job_detail", args=[job.id]))
+        self.assertEqual(response.data["data"]["title"], "New title")
+        response = self.client.get(reverse("jobs"))
+        self.assertEqual(response.data["data"][0]["title"], "New title")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new_job = create_job(self.user)
+        response = self.client.get(reverse("jobs"))
+        self.assertEqual(response.data["data"][0]["id"], new_job.id)
+
+    def test_payload_read_before_a_write_is_not_served_after_it(self):
+        job = create_job(self.user, title="Old title")
+
+        def load_then_write():
+            payload = {"id": job.id, "title": "Old title"}
+            # Another request's write commits while this one is still loading
+            Job.objects.filter(id=job.id).update(title="New title")
+            invalidate_job(job.id)
+            return payload
+
+        get_or_set(job_detail_key(job.id), load_then_write)
+        response = self.client.get(reverse("job_detail", args=[job.id]))
+        self.assertEqual(response.data["data"]["title"], "New title")
+
+    def test_not_found_is_cached_until_the_job_exists(self):
+        job = create_job(self.user)
+        missing_id = job.id + 1
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse("job_detail", args=[missing_id])).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse("job_detail", args=[missing_id])).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            created = create_job(self.user)
+        self.assertEqual(created.id, missing_id)
+        self.assertEqual(self.client.get(reverse("job_detail", args=[missing_id])).status_code, 200)
+
+    @override_settings(JOB_CACHE_LOCK_WAIT=5)
+    def test_waiters_stop_when_the_loader_gives_up(self):
+        # Another request holds the lock of a cold key, then fails without storing
+        cache.add("cold:lock", 1, 60)
+        threading.Timer(0.05, cache.delete, ["cold:lock"]).start()
+        started = time.monotonic()
+        self.assertEqual(get_or_set("cold", lambda: "loaded"), "loaded")
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_stale_entry_is_served_while_another_request_refreshes(self):
+        get_or_set("key", lambda: "old", timeout=1)
+        # Force the entry past its soft expiry and hold the refresh lock
+        cache.set("key", ("old", 0), 60)
+        cache.add("key:lock", 1, 60)
+
+        self.assertEqual(get_or_set("key", lambda: "new"), "old")
+        self.assertEqual(cache_stats()["stale_hits"], 1)
+
+        cache.delete("key:lock")
+        self.assertEqual(get_or_set("key", lambda: "new"), "new")
+
+    def test_stats_endpoint_is_admin_only(self):
+        response = self.client.get(reverse("cache_stats"))
+        self.assertEqual(response.status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("cache_stats"))
+        self.assertIn("hit_ratio", response.data["data"])
+
+
+class ConditionalRequestTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = create_job(self.user)
+
+    def test_job_detail_returns_304_for_matching_etag(self):
+        url = reverse("job_detail", args=[self.job.id])
+        response = self.client.get(url)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_collection_etag_changes_on_create_and_delete(self):
+        url = reverse("jobs")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = create_job(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(JOB_CACHE_TIMEOUT=0.2)
+    def test_collection_etag_follows_writes_the_cache_missed(self):
+        url = reverse("jobs")
+        etag = self.client.get(url)["ETag"]
+        # Another worker's write, invalidating only its own local cache
+        Job.objects.filter(id=self.job.id).update(date_updated=self.job.date_updated + timedelta(seconds=1))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        time.sleep(0.3)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        # The version expiring on its own leaves unchanged data's validators alone
+        time.sleep(0.3)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_search_etag_depends_on_query(self):
+        url = reverse("search_jobs")
+        etag = self.client.get(url, {"title": "backend"})["ETag"]
+        response = self.client.get(url, {"title": "back"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_application_validators_only_for_owner_or_applicant(self):
+        applicant = create_user("janedoe")
+        application = JobApplication.objects.create(job=self.job, applicant=applicant, cover_letter="Hi")
+        url = reverse("application_detail", args=[application.id])
+
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        stranger = APIClient()
+        stranger.force_authenticate(create_user("stranger"))
+        response = stranger.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+
+
+class ImportJobsTests(APITestMixin, TestCase):
+    def job_record(self, **overrides):
+        record = {"title": "Developer", "company": "Onit", "location": "Maputo", "description": "APIs"}
+        record.update(overrides)
+        return record
+
+    def test_jsonl_import_reports_invalid_rows(self):
+        lines = [
+            json.dumps(self.job_record(title="Developer 1")),
+            json.dumps(self.job_record(title="AB")),
+            "not json",
+            "",
+            json.dumps(self.job_record(title="Developer 2", category="IT")),
+        ]
+        response = self.client.post(
+            reverse("import_jobs") + "?batch_size=1",
+            data="\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, 201)
+        report = response.data["data"]
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 3])
+        self.assertEqual(report["errors"][0]["errors"][0]["field"], "title")
+        self.assertEqual(
+            set(Job.objects.filter(posted_by=self.user).values_list("title", flat=True)),
+            {"Developer 1", "Developer 2"}
+        )
+        self.assertEqual(set(Job.objects.values_list("description_preview", flat=True)), {"APIs"})
+
+    def test_undecodable_and_malformed_rows_are_reported_per_row(self):
+        lines = [
+            json.dumps(self.job_record(title="Developer 1")).encode(),
+            b'{"title": "Caf\xe9 Manager"}',
+            json.dumps(self.job_record(title="Developer 2")).encode(),
+        ]
+        response = self.client.post(
+            reverse("import_jobs") + "?batch_size=1", data=b"\n".join(lines), content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 201)
+        report = response.data["data"]
+        self.assertEqual((report["created"], report["failed"]), (2, 1))
+        self.assertEqual(report["errors"][0]["row"], 2)
+        self.assertIn("utf-8", report["errors"][0]["errors"][0]["message"])
+
+        rows = b"title,description\nCaf\xe9,APIs\nDeveloper,APIs\n"
+        records = list(iter_records(decode_lines(rows.splitlines(keepends=True)), "csv"))
+        self.assertEqual([(row, error is None) for row, _, error in records], [(2, False), (3, True)])
+
+        self.addCleanup(csv.field_size_limit, csv.field_size_limit(12))
+        records = list(iter_records(["title,description\n", "Developer,Builds APIs all day\n", "Other,APIs\n"], "csv"))
+        self.assertEqual([(row, error) for row, _, error in records], [
+            (2, "Invalid CSV: field larger than field limit (12)"), (3, None)
+        ])
+
+    @override_settings(JOB_IMPORT_MAX_BATCH_SIZE=2)
+    def test_batch_size_is_clamped(self):
+        lines = [json.dumps(self.job_record(title=f"Developer {number}")) for number in range(5)]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse("import_jobs") + "?batch_size=1000000", data="\n".join(lines),
+                content_type="application/x-ndjson"
+            )
+        self.assertEqual(response.data["data"]["created"], 5)
+        inserts = [q["sql"] for q in context.captured_queries if q["sql"].startswith('INSERT INTO "jobs_job"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_unsupported_content_type_is_rejected(self):
+        response = self.client.post(reverse("import_jobs"), data="x", content_type="text/plain")
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_command_reads_csv(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as csv_file:
+            csv_file.write("title,company,location,description,category\n")
+            csv_file.write("Developer,Onit,Maputo,APIs,\n")
+            csv_file.write("Accountant,Banco,Beira,Books,Finance\n")
+        self.addCleanup(os.remove, csv_file.name)
+        out = StringIO()
+        call_command("import_jobs", csv_file.name, user=self.user.email, stdout=out, stderr=StringIO())
+        self.assertIn("Imported 2 job(s), 0 row(s) failed", out.getvalue())
+        self.assertIsNone(Job.objects.get(title="Developer").category)
+
+
+@override_settings(JOB_EXPORT_CHUNK_SIZE=2)
+class ExportTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = True
+        self.user.save()
+        self.jobs = [create_job(self.user, title=f"Job {i}") for i in range(5)]
+
+    def export(self, resource, **params):
+        response = self.client.get(reverse("export", args=[resource]), params)
+        return response, b"".join(response.streaming_content)
+
+    def test_jsonl_export_streams_every_row(self):
+        response, body = self.export("jobs")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [job.id for job in self.jobs])
+
+    def test_gzipped_csv_export(self):
+        JobApplication.objects.create(job=self.jobs[0], applicant=create_user("jane"), cover_letter="Olá, tudo bem")
+        response, body = self.export("applications", output="csv", gzip="true")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        rows = list(csv.DictReader(gzip.decompress(body).decode().splitlines()))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["cover_letter"], "Olá, tudo bem")
+
+    def test_incremental_export_since_date_updated(self):
+        since = self.jobs[-1].date_updated
+        _, body = self.export("jobs", since=since.isoformat())
+        self.assertEqual([json.loads(line)["id"] for line in body.decode().splitlines()], [self.jobs[-1].id])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(reverse("export", args=["users"])).status_code, 400)
+        self.assertEqual(self.client.get(reverse("export", args=["jobs"]), {"since": "yesterday"}).status_code, 400)
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("export", args=["jobs"])).status_code, 403)
+
+    def test_export_command_writes_file(self):
+        with tempfile.NamedTemporaryFile(suffix=".jsonl.gz", delete=False) as export_file:
+            pass
+        self.addCleanup(os.remove, export_file.name)
+        call_command("export_data", "jobs", "--gzip", "--file", export_file.name)
+        with gzip.open(export_file.name, "rt") as stream:
+            self.assertEqual(len(stream.readlines()), 5)
+
+
+@override_settings(BCRYPT_ROUNDS=4)
+class FacetRollupTests(APITestMixin, TestCase):
+    def rollup(self, facet):
+        return dict(JobFacet.objects.filter(facet=facet, count__gt=0).values_list("value", "count"))
+
+    def test_rollup_follows_job_writes(self):
+        job = create_job(self.user, company="Onit")
+        create_job(self.user, company="Onit", category=None)
+        run_due_tasks()
+        self.assertEqual(self.rollup("company"), {"Onit": 2})
+        self.assertEqual(self.rollup("category"), {"IT": 1})
+
+        job.company = "Banco"
+        job.save()
+        run_due_tasks()
+        self.assertEqual(self.rollup("company"), {"Onit": 1, "Banco": 1})
+
+        # Deferred columns are left alone
+        partial = Job.objects.only("id", "title").get(id=job.id)
+        partial.title = "Renamed"
+        partial.save()
+        run_due_tasks()
+        self.assertEqual(self.rollup("company"), {"Onit": 1, "Banco": 1})
+
+        job.delete()
+        run_due_tasks()
+        self.assertEqual(self.rollup("company"), {"Onit": 1})
+
+    def test_unfiltered_facets_read_one_row_range_per_facet(self):
+        for company in ("Onit", "Onit", "Banco"):
+            create_job(self.user, company=company)
+        run_due_tasks()
+        backend = get_search_backend()
+        with self.assertNumQueries(2):
+            facets = backend.facets(SearchQuery(), ("company", "location"), 10)
+        self.assertEqual(facets["company"], [{"value": "Onit", "count": 2}, {"value": "Banco", "count": 1}])
+
+    def test_import_and_rebuild(self):
+        records = iter_records([json.dumps({
+            "title": "Backend Developer", "company": "Imported", "location": "Tete",
+            "description": "Bulk inserted.", "category": "IT",
+        }).encode()] * 3, "jsonl")
+        import_jobs(records, posted_by=self.user)
+        run_due_tasks()
+        self.assertEqual(self.rollup("location"), {"Tete": 3})
+
+        Job.objects.filter(location="Tete").update(location="Pemba")
+        call_command("rebuild_job_facets", stdout=StringIO())
+        self.assertEqual(self.rollup("location"), {"Pemba": 3})
+
+    def test_invalid_facets_are_rejected(self):
+        create_job(self.user)
+        self.assertEqual(self.client.get(reverse("search_jobs"), {"facets": "title"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("search_jobs"), {"facets": "company", "facet_size": "0"}).status_code, 400)
+
+
+class DimensionTests(APITestMixin, TestCase):
+    def test_values_are_interned_by_folded_spelling(self):
+        first = create_job(self.user, location="São Paulo")
+        second = create_job(self.user, location="  sao   PAULO ")
+        self.assertEqual(Location.objects.count(), 1)
+        second.refresh_from_db()
+        self.assertEqual((second.location, second.location_ref_id), ("São Paulo", first.location_ref_id))
+        self.assertIsNone(create_job(self.user, category=None).category_ref_id)
+
+    def test_api_writes_use_the_canonical_names(self):
+        create_job(self.user, company="Onit", location="Beira")
+        response = self.client.post(reverse("jobs"), {
+            "title": "Data Analyst", "company": "ONIT", "location": "Maputo",
+            "description": "Reports.", "category": "IT",
+        }, format="json")
+        self.assertEqual(response.data["data"]["company"], "Onit")
+
+        job_id = response.data["data"]["id"]
+        response = self.client.put(reverse("job_detail", args=[job_id]), {"location": "beira"}, format="json")
+        self.assertEqual(response.data["data"]["location"], "Beira")
+        self.assertEqual(
+            Job.objects.get(id=job_id).location_ref_id, Location.objects.get(key="beira").id
+        )
+        self.assertEqual(Company.objects.count(), 1)
+
+    def test_imports_intern_each_batch(self):
+        create_job(self.user, category="IT")
+        records = iter_records([
+            json.dumps({"title": "Developer", "company": "Imported", "location": "Tete",
+                        "description": "Bulk inserted.", "category": category}).encode()
+            for category in ("it", "It", "Health")
+        ], "jsonl")
+        import_jobs(records, posted_by=self.user)
+        self.assertEqual(sorted(Category.objects.values_list("name", flat=True)), ["Health", "IT"])
+        self.assertEqual(Job.objects.filter(category="IT", category_ref__key="it").count(), 3)
+
+    def test_committed_values_are_interned_without_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            intern_values(Company, ["Onit", "Banco"])
+        with self.assertNumQueries(0):
+            rows = intern_values(Company, ["ONIT", "banco "])
+        self.assertEqual({value: name for value, (_, name) in rows.items()}, {"ONIT": "Onit", "banco ": "Banco"})
+
+
+class GeoTests(APITestMixin, TestCase):
+    def test_coordinates_come_from_the_gazetteer(self):
+        job = create_job(self.user, location="beira")
+        self.assertEqual((job.latitude, job.longitude), (-19.8436, 34.8389))
+        self.assertIsNotNone(job.geo_cell)
+        self.assertIsNone(create_job(self.user, location="Remote").latitude)
+
+        response = self.client.put(reverse("job_detail", args=[job.id]), {"location": "Tete"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        job.refresh_from_db()
+        self.assertEqual((job.latitude, job.longitude), (-16.1564, 33.5867))
+
+    def test_client_coordinates_are_kept(self):
+        response = self.client.post(reverse("jobs"), {
+            "title": "Field Technician", "company": "Onit", "location": "Namaacha",
+            "description": "Site visits.", "latitude": -25.98, "longitude": 32.02,
+        }, format="json")
+        job = Job.objects.get(id=response.data["data"]["id"])
+        job.title = "Senior Field Technician"
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual((job.latitude, job.longitude), (-25.98, 32.02))
+
+        response = self.client.post(reverse("jobs"), {
+            "title": "Field Technician", "company": "Onit", "location": "Namaacha",
+            "description": "Site visits.", "latitude": -25.98,
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_radius_crossing_the_antimeridian(self):
+        east = create_job(self.user, location="Taveuni", latitude=-16.85, longitude=179.95)
+        west = create_job(self.user, location="Somewhere", latitude=-16.85, longitude=-179.95)
+        create_job(self.user, location="Far", latitude=-16.85, longitude=-179.5)
+        area = Area.from_params({"lat": "-16.85", "lon": "179.99", "radius_km": "20"})
+        self.assertEqual(len(area.boxes), 2)
+        self.assertEqual(
+            sorted(Job.objects.filter(area.condition()).values_list("id", flat=True)), [east.id, west.id]
+        )
+
+
+class ApplicantApplicationsTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        owner = create_user("owner")
+        self.jobs = [create_job(owner, title=f"Job {i}") for i in range(5)]
+        self.applications = [
+            JobApplication.objects.create(job=job, applicant=self.user, cover_letter="Hi") for job in self.jobs
+        ]
+        JobApplication.objects.create(job=self.jobs[0], applicant=owner, cover_letter="Not mine")
+
+    def test_pages_cover_own_applications_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            params = {"page_size": 2, **({"cursor": cursor} if cursor else {})}
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("my_applications"), params)
+            seen += response.data["data"]
+            cursor = response.data["next"]
+            if cursor is None:
+                break
+        self.assertEqual([row["id"] for row in seen], [application.id for application in reversed(self.applications)])
+        self.assertEqual(seen[-1]["job"], {
+            "id": self.jobs[0].id, "title": "Job 0", "company": "Onit", "location": "Maputo", "category": "IT",
+        })
+
+    def test_cached_until_the_user_applies(self):
+        self.client.get(reverse("my_applications"))
+        with self.assertNumQueries(0):
+            self.client.get(reverse("my_applications"))
+
+        job = create_job(create_user("other"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("apply_for_job", args=[job.id]), {"cover_letter": "Hello"}, format="json")
+        response = self.client.get(reverse("my_applications"))
+        self.assertEqual(response.data["data"][0]["job"]["id"], job.id)
+
+    def test_no_applications(self):
+        self.client.force_authenticate(create_user("newcomer"))
+        self.assertEqual(self.client.get(reverse("my_applications")).status_code, 404)
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revoked_users.clear()
+        self.user = create_user("johndoe")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {issue_tokens(self.user).access_token}")
+        # Load the revoked ids now, as an earlier request would have
+        revoked_users.is_revoked(self.user.id)
+
+    def test_job_detail_is_a_single_query(self):
+        job = create_job(self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("job_detail", args=[job.id]))
+        self.assertEqual(response.data["data"], job.to_dict())
+
+    def test_user_row_loads_only_when_needed(self):
+        response = self.client.post(reverse("jobs"), {
+            "title": "Backend Developer", "company": "Onit", "location": "Maputo",
+            "description": "Build APIs.", "category": "IT",
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["data"]["posted_by"]["id"], self.user.id)
+        self.assertEqual(self.client.get(reverse("cache_stats")).status_code, 403)
+
+    def test_apply_never_loads_the_user_row(self):
+        job = create_job(create_user("owner"))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse("apply_for_job", args=[job.id]), {"cover_letter": "Hello."}, format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["data"]["applicant"]["full_name"], "John Doe")
+        # Job lookup, insert and task insert; the applicant comes from the token
+        statements = [q["sql"] for q in context.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 3, statements)
+        self.assertFalse([sql for sql in statements if '"jobs_user"' in sql], statements)
+
+    def test_deactivated_user_is_rejected_at_once(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("jobs")).status_code, 401)
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("jobs")).status_code, 404)
+
+    def test_revoked_ids_are_reloaded_after_the_ttl(self):
+        # A bulk update fires no signal: only the reload sees it
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertEqual(self.client.get(reverse("jobs")).status_code, 404)
+        with self.settings(JWT_REVOCATION_CACHE_SECONDS=0):
+            self.assertEqual(self.client.get(reverse("jobs")).status_code, 401)
+
+    async def test_async_views_use_the_same_check(self):
+        await User.objects.filter(id=self.user.id).aupdate(is_active=False)
+        with self.settings(JWT_REVOCATION_CACHE_SECONDS=0):
+            response = await AsyncClient().get(
+                reverse("async_jobs"), headers={"Authorization": self.client._credentials["HTTP_AUTHORIZATION"]}
+            )
+        self.assertEqual(response.status_code, 401)
+
+
+class ApplyTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = create_job(create_user("owner"))
+
+    def apply(self, client=None):
+        return (client or self.client).post(
+            reverse("apply_for_job", args=[self.job.id]),
+            {"cover_letter": "I am very interested in this position."}, format="json"
+        )
+
+    def test_apply_once_then_conflict(self):
+        response = self.apply()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["job"]["title"], self.job.title)
+        self.assertEqual(self.apply().status_code, 409)
+        self.assertEqual(JobApplication.objects.count(), 1)
+
+    def test_owner_cannot_apply(self):
+        self.client.force_authenticate(self.job.posted_by)
+        self.assertEqual(self.apply().status_code, 409)
+        self.assertEqual(JobApplication.objects.count(), 0)
+
+    def test_deleted_job_or_applicant_is_not_a_conflict(self):
+        # Deleted after the view's checks, so the insert's foreign key fails
+        for model, row_id, status_code in ((User, self.user.id, 401), (Job, self.job.id, 404)):
+            def validate_then_delete(model=model, row_id=row_id, **data):
+                model.objects.filter(id=row_id).delete()
+                return JobApplicaitonSchema(**data)
+
+            with mock.patch("jobs.views.JobApplicaitonSchema", validate_then_delete), \
+                    mock.patch.object(JobApplication.objects, "create", side_effect=IntegrityError("FOREIGN KEY")):
+                self.assertEqual(self.apply().status_code, status_code)
+
+    def test_apply_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.apply().status_code, 201)
+        # Savepoints come from the test case's outer transaction; job lookup,
+        # insert, and one insert queueing its tasks in the same transaction
+        statements = [q["sql"] for q in context.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 3, statements)
+
+
+class ApplicationCounterTests(APITestMixin, TestCase):
+    def test_counters_follow_creates_and_deletes(self):
+        job = create_job(self.user)
+        first = JobApplication.objects.create(job=job, applicant=create_user("alice"), cover_letter="Hi")
+        second = JobApplication.objects.create(job=job, applicant=create_user("bob"), cover_letter="Hi")
+        run_due_tasks()
+        job.refresh_from_db()
+        self.assertEqual((job.application_count, job.last_applied_at), (2, second.date_created))
+
+        second.delete()
+        run_due_tasks()
+        job.refresh_from_db()
+        self.assertEqual((job.application_count, job.last_applied_at), (1, first.date_created))
+
+        first.delete()
+        run_due_tasks()
+        job.refresh_from_db()
+        self.assertEqual((job.application_count, job.last_applied_at), (0, None))
+
+    def test_dashboard_lists_own_jobs_in_one_query(self):
+        jobs = [create_job(self.user, title=f"Job {number}") for number in range(3)]
+        create_job(create_user("other"))
+        JobApplication.objects.create(job=jobs[0], applicant=create_user("alice"), cover_letter="Hi")
+        run_due_tasks()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("owner_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual([job["id"] for job in data], [job.id for job in reversed(jobs)])
+        self.assertEqual([job["application_count"] for job in data], [0, 0, 1])
+        self.assertIsNone(data[0]["last_applied_at"])
+
+    def test_reconcile_repairs_drift(self):
+        job = create_job(self.user)
+        applicant = create_user("alice")
+        JobApplication.objects.bulk_create([JobApplication(job=job, applicant=applicant, cover_letter="Hi")])
+        create_job(self.user)
+        self.assertEqual(Job.objects.get(id=job.id).application_count, 0)
+
+        out = StringIO()
+        call_command("reconcile_application_counts", "--batch-size", "1", stdout=out)
+        self.assertIn("Checked 2 jobs", out.getvalue())
+        self.assertIn("fixed 1", out.getvalue())
+        self.assertEqual(Job.objects.get(id=job.id).application_count, 1)
+
+
+class TaskQueueTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = create_job(create_user("owner"))
+        run_due_tasks()
+
+    def apply(self):
+        return self.client.post(
+            reverse("apply_for_job", args=[self.job.id]), {"cover_letter": "Hello"}, format="json"
+        )
+
+    def test_apply_queues_side_effects_for_the_worker(self):
+        self.assertEqual(self.apply().status_code, 201)
+        self.assertEqual(sorted(Task.objects.values_list("name", flat=True)), ["count_applications", "notify_job_owner"])
+        self.assertEqual(Job.objects.get(id=self.job.id).application_count, 0)
+        self.assertEqual(mail.outbox, [])
+
+        out = StringIO()
+        call_command("run_tasks", "--once", stdout=out)
+        self.assertIn("Ran 2 tasks, 0 failed", out.getvalue())
+        self.assertEqual(Job.objects.get(id=self.job.id).application_count, 1)
+        self.assertEqual([message.to for message in mail.outbox], [["owner@example.com"]])
+        self.assertFalse(Task.objects.exists())
+
+    def test_rolled_back_writes_queue_nothing(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            JobApplication.objects.create(job=self.job, applicant=self.user, cover_letter="Hi")
+            raise RuntimeError
+        self.assertFalse(Task.objects.exists())
+
+    def test_tasks_of_a_batch_run_together(self):
+        for username in ("alice", "bob", "carol"):
+            JobApplication.objects.create(job=self.job, applicant=create_user(username), cover_letter="Hi")
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(run_due_tasks(), (6, 0))
+        # Claim and lease; one recount and one lookup of the applications for
+        # all three, each followed by deleting its tasks; an empty claim
+        statements = [q["sql"] for q in context.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 7, statements)
+        self.assertEqual(Job.objects.get(id=self.job.id).application_count, 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(JOB_TASK_MAX_ATTEMPTS=2)
+    def test_failing_tasks_are_retried_then_parked(self):
+        self.apply()
+        with mock.patch("jobs.tasks.get_connection", side_effect=ConnectionError("SMTP down")):
+            self.assertEqual(run_due_tasks(), (1, 1))
+            task = Task.objects.get()
+            self.assertEqual((task.name, task.attempts), ("notify_job_owner", 1))
+            self.assertIn("SMTP down", task.last_error)
+
+            Task.objects.update(run_after=task.date_created)
+            self.assertEqual(run_due_tasks(), (0, 1))
+        self.assertIsNone(Task.objects.get().run_after)
+        self.assertEqual(Job.objects.get(id=self.job.id).application_count, 1)
+
+        out = StringIO()
+        call_command("run_tasks", "--once", "--retry-failed", stdout=out)
+        self.assertIn("Requeued 1 failed tasks.", out.getvalue())
+        self.assertIn("Ran 1 tasks, 0 failed", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_mail_is_sent_outside_the_task_transaction(self):
+        self.apply()
+        depth = len(connection.atomic_blocks)
+        sent = []
+        send_messages = mail.get_connection().__class__.send_messages
+
+        def record_depth(backend, messages):
+            sent.append((len(connection.atomic_blocks), Task.objects.filter(name="notify_job_owner").exists()))
+            return send_messages(backend, messages)
+
+        with mock.patch.object(mail.get_connection().__class__, "send_messages", record_depth):
+            self.assertEqual(run_due_tasks(), (2, 0))
+        # No transaction of its own, and the task is deleted only once the mail is out
+        self.assertEqual(sent, [(depth, True)])
+        self.assertFalse(Task.objects.exists())
+
+    def test_facet_tasks_can_run_twice(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_job(self.user, company="Banco")
+            other = create_job(self.user, company="Banco")
+        other.delete()
+        # As if a worker's lease ran out and another claimed its tasks again
+        for task in list(Task.objects.filter(name="adjust_facets")):
+            Task.objects.create(name=task.name, payload=task.payload, run_after=task.run_after)
+        run_due_tasks()
+        self.assertEqual(
+            JobFacet.objects.get(facet="company", value="Banco").count,
+            Job.objects.filter(company="Banco").count()
+        )
+        self.assertEqual(JobFacet.objects.get(facet="company", value="Onit").count, 1)
+
+    @override_settings(JOB_TASKS_EAGER=True)
+    def test_eager_tasks_run_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.apply().status_code, 201)
+        self.assertEqual(Job.objects.get(id=self.job.id).application_count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class ConcurrentApplyTests(TransactionTestCase):
+    def test_concurrent_submits_create_one_application(self):
+        applicant = create_user("johndoe")
+        job = create_job(create_user("owner"))
+        barrier = threading.Barrier(8)
+        statuses = []
+
+        def submit():
+            client = APIClient()
+            client.force_authenticate(applicant)
+            try:
+                barrier.wait()
+                response = client.post(
+                    reverse("apply_for_job", args=[job.id]), {"cover_letter": "Hello"}, format="json"
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(statuses), [201] + [409] * 7)
+        self.assertEqual(JobApplication.objects.count(), 1)
+        run_due_tasks()
+        self.assertEqual(Job.objects.get(id=job.id).application_count, 1)
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        self.user = create_user("johndoe")
+        self.user.password = make_password("Password123!")
+        self.user.save()
+        self.client = APIClient()
+
+    def login(self, identifier, password="Password123!"):
+        return self.client.post(reverse("login"), {"identifier": identifier, "password": password}, format="json")
+
+    def test_login_by_email_or_username(self):
+        self.assertEqual(self.login("johndoe@example.com").status_code, 200)
+        self.assertEqual(self.login("johndoe").status_code, 200)
+        self.assertEqual(self.login("johndoe", "wrong").status_code, 401)
+        self.assertEqual(self.login("nobody").status_code, 401)
+
+    def test_outdated_work_factor_is_rehashed_on_login(self):
+        with self.settings(BCRYPT_ROUNDS=5):
+            self.assertEqual(self.login("johndoe").status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIn("$05$", self.user.password)
+        self.assertEqual(self.login("johndoe").status_code, 200)
+
+    def test_saturated_pool_rejects_new_work(self):
+        executor = BoundedExecutor(max_workers=1, max_pending=0)
+        release = threading.Event()
+        executor.submit(release.wait)
+        with self.assertRaises(LoginBusy):
+            executor.submit(lambda: None)
+        release.set()
+
+
+class LoggingTests(TestCase):
+    def setUp(self):
+        self.stream = StringIO()
+        self.handler = QueueListenerHandler(self.stream)
+        self.handler.addFilter(RequestIdFilter())
+        logger = logging.getLogger("jobs")
+        logger.addHandler(self.handler)
+        self.addCleanup(logger.removeHandler, self.handler)
+        self.addCleanup(self.handler.close)
+
+    def records(self):
+        self.handler.close()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_json_lines_carry_request_id(self):
+        user = create_user("johndoe")
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse("job_detail", args=[1]), headers={"x-request-id": "abc-123"})
+        self.assertEqual(response["X-Request-ID"], "abc-123")
+
+        records = self.records()
+        self.assertTrue(records)
+        self.assertEqual({record["request_id"] for record in records}, {"abc-123"})
+        self.assertEqual(records[0]["logger"], "jobs.views")
+
+        response = client.get(reverse("job_detail", args=[1]), headers={"x-request-id": "bad id\n"})
+        self.assertRegex(response["X-Request-ID"], r"^[0-9a-f]{32}$")
+
+    async def test_async_requests_carry_request_id(self):
+        response = await AsyncClient().get(
+            reverse("async_jobs"), headers={"Authorization": "Bearer nope", "x-request-id": "async-123"}
+        )
+        self.assertEqual(response["X-Request-ID"], "async-123")
+        records = [record for record in self.records() if record["logger"] == "jobs.async_views"]
+        self.assertTrue(records)
+        self.assertEqual({record["request_id"] for record in records}, {"async-123"})
+
+    def test_passwords_are_never_logged(self):
+        client = APIClient()
+        payload = {
+            "first_name": "Jane", "other_names": "Doe", "email": "jane@example.com",
+            "username": "janedoe", "password": "Secret123!"
+        }
+        with self.settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]):
+            client.post(reverse("register_user"), payload, format="json")
+            client.post(reverse("register_user"), dict(payload, email="x", password="weakpass1"), format="json")
+            client.post(reverse("login"), {"identifier": "janedoe", "password": "Secret123!"}, format="json")
+        output = self.stream.getvalue() + json.dumps(self.records())
+        self.assertNotIn("Secret123!", output)
+        self.assertNotIn("weakpass1", output)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = QueueListenerHandler(StringIO(), queue_size=1)
+        handler.listener.stop()
+        record = logging.LogRecord("jobs", logging.INFO, __file__, 1, "message %s", ("arg",), None)
+        for _ in range(3):
+            handler.handle(record)
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(handler.queue.get_nowait().msg, "message arg")
+
+
+class MetricsTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        metrics_registry.reset()
+        create_job(self.user)
+
+    def test_requests_are_instrumented(self):
+        response = self.client.get(reverse("jobs"))
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[0-9.]+;desc="\d+ queries", total;dur=[0-9.]+$')
+        self.client.get(reverse("job_detail", args=[999]))
+
+        metrics = APIClient().get(reverse("metrics"))
+        self.assertEqual(metrics.status_code, 200)
+        self.assertTrue(metrics["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = metrics.content.decode()
+        self.assertIn('jobboard_requests_total{view="jobs",method="GET",status="200"} 1', body)
+        self.assertIn('jobboard_requests_total{view="job_detail",method="GET",status="404"} 1', body)
+        self.assertIn('jobboard_request_duration_seconds_bucket{view="jobs",method="GET",le="+Inf"} 1', body)
+        self.assertRegex(body, r'jobboard_request_queries_sum\{view="jobs",method="GET"\} [1-9]')
+        self.assertRegex(body, r'jobboard_response_bytes_total\{view="jobs",method="GET"\} [1-9]')
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_token(self):
+        self.assertEqual(APIClient().get(reverse("metrics")).status_code, 401)
+        response = APIClient().get(reverse("metrics"), headers={"authorization": "Bearer scrape-secret"})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0.001)
+    def test_slow_request_log_reports_repeated_sql(self):
+        for _ in range(3):
+            create_job(self.user)
+        with self.assertLogs("jobs.middleware", "WARNING") as logs:
+            # Job.to_dict() per row loads posted_by each time: an N+1 on purpose
+            with mock.patch("jobs.views.JobFieldset.values", lambda fieldset, queryset=None: Job.objects.all()), \
+                    mock.patch("jobs.views.JobFieldset.to_dict", lambda fieldset, job: job.to_dict()):
+                self.client.get(reverse("jobs"))
+        record = logs.records[0]
+        self.assertEqual(record.view, "jobs")
+        self.assertEqual(record.sql["repeated"][0]["count"], 4)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Ids remembered by captured on_commit callbacks are rolled back with the test
+        interned.clear()
+        self.addCleanup(interned.clear)
+        self.user = create_user("johndoe")
+        self.token = str(issue_tokens(self.user).access_token)
+        self.async_client = AsyncClient()
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(self.user)
+
+    async def test_async_views_match_sync_payloads(self):
+        job = await Job.objects.acreate(
+            title="Python Developer", company="Onit", location="Maputo", description="APIs", posted_by=self.user
+        )
+        applicant = await User.objects.acreate(username="jane", email="jane@example.com", first_name="Jane")
+        await JobApplication.objects.acreate(job=job, applicant=applicant, cover_letter="Hi")
+
+        pairs = [
+            (reverse("jobs"), reverse("async_jobs")),
+            (reverse("job_detail", args=[job.id]), reverse("async_job_detail", args=[job.id])),
+            (reverse("search_jobs") + "?keywords=python", reverse("async_search_jobs") + "?keywords=python"),
+            (
+                reverse("applications_for_job_owner", args=[job.id]),
+                reverse("async_applications_for_job_owner", args=[job.id]),
+            ),
+        ]
+        # Sparse fieldsets, geo search distances and facets
+        for sync_name, async_name, args, query in [
+            ("jobs", "async_jobs", [], "?fields=id,title,posted_by&expand=posted_by"),
+            ("job_detail", "async_job_detail", [job.id], "?fields=id,description_preview"),
+            ("search_jobs", "async_search_jobs", [], "?near=maputo&radius_km=30&facets=location"),
+        ]:
+            pairs.append((reverse(sync_name, args=args) + query, reverse(async_name, args=args) + query))
+        for sync_url, async_url in pairs:
+            response = await self.async_client.get(async_url, headers={"Authorization": f"Bearer {self.token}"})
+            self.assertEqual(response.status_code, 200, async_url)
+            sync_response = await sync_to_async(self.api_client.get)(sync_url)
+            payload = response.json()
+            self.assertEqual(payload, sync_response.json(), async_url)
+            self.assertEqual(response.has_header("ETag"), sync_response.has_header("ETag"), async_url)
+        self.assertEqual(payload["data"][0]["distance_km"], 0)
+        self.assertEqual(payload["facets"], {"location": [{"value": "Maputo", "count": 1}]})
+
+    async def test_async_views_answer_conditional_requests(self):
+        job = await Job.objects.acreate(
+            title="Python Developer", company="Onit", location="Maputo", description="APIs", posted_by=self.user
+        )
+        headers = {"Authorization": f"Bearer {self.token}"}
+        for url in (reverse("async_jobs"), reverse("async_job_detail", args=[job.id])):
+            etag = (await self.async_client.get(url, headers=headers))["ETag"]
+            response = await self.async_client.get(url, headers=dict(headers, if_none_match=etag))
+            self.assertEqual(response.status_code, 304, url)
+
+        # Served from the entries the sync view cached
+        await sync_to_async(self.api_client.get)(reverse("job_detail", args=[job.id]))
+        reset_cache_stats()
+        response = await self.async_client.get(reverse("async_job_detail", args=[job.id]), headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cache_stats()["misses"], 0)
+
+        def update_job():
+            with self.captureOnCommitCallbacks(execute=True):
+                job.save()
+
+        await sync_to_async(update_job)()
+        response = await self.async_client.get(url, headers=dict(headers, if_none_match=etag))
+        self.assertEqual(response.status_code, 200)
+
+    async def test_middleware_chain_stays_on_the_event_loop(self):
+        await Job.objects.acreate(
+            title="Python Developer", company="Onit", location="Maputo", description="APIs", posted_by=self.user
+        )
+        metrics_registry.reset()
+        threads = []
+        observe = metrics_registry.observe
+
+        def record_thread(*args):
+            threads.append(threading.get_ident())
+            return observe(*args)
+
+        with mock.patch.object(metrics_registry, "observe", side_effect=record_thread):
+            response = await self.async_client.get(
+                reverse("async_jobs"), headers={"Authorization": f"Bearer {self.token}", "x-request-id": "loop-1"}
+            )
+        self.assertEqual(response.status_code, 200)
+        # A sync-only middleware would have run the chain on a worker thread
+        self.assertEqual(threads, [threading.get_ident()])
+        self.assertEqual(response["X-Request-ID"], "loop-1")
+        # Queries run on the sync_to_async thread are counted
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[0-9.]+;desc="[1-9]\d* queries", total;dur=[0-9.]+$')
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    async def test_async_views_require_a_valid_token(self):
+        response = await AsyncClient().get(reverse("async_jobs"))
+        self.assertEqual(response.status_code, 401)
+        response = await AsyncClient().get(reverse("async_jobs"), headers={"Authorization": "Bearer nope"})
+        self.assertEqual(response.status_code, 401)
+
+
+class BenchmarkTests(TransactionTestCase):
+    def test_every_route_has_a_scenario(self):
+        routes = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(routes - {scenario.route for scenario in SCENARIOS}, set())
+
+    @override_settings(BCRYPT_ROUNDS=4)
+    def test_scenarios_run_against_seeded_data(self):
+        created = seed(jobs=30, applications_per_job=2, chunk_size=7)
+        self.assertEqual((created["users"], created["jobs"], Job.objects.count()), (3, 30, 30))
+        self.assertTrue(JobApplication.objects.exists())
+
+        context = BenchmarkContext()
+        names = {"GET jobs", "POST apply_for_job", "GET applications_for_job_owner", "GET export"}
+        for scenario in SCENARIOS:
+            if scenario.name in names:
+                result = run_scenario(scenario, context, total=6, concurrency=2)
+                self.assertEqual(result["errors"], 0, (scenario.name, result))
+                self.assertEqual(result["requests"], 6)
+                self.assertIsNotNone(result["queries_per_request"])
+
+    def test_compare_flags_regressions(self):
+        baseline = {"GET jobs": {"requests_per_second": 100, "p95_ms": 10, "queries_per_request": 2, "errors": 0}}
+        steady = {"GET jobs": {"requests_per_second": 95, "p95_ms": 11, "queries_per_request": 2, "errors": 0}}
+        worse = {"GET jobs": {"requests_per_second": 70, "p95_ms": 15, "queries_per_request": 3, "errors": 1}}
+        self.assertEqual(compare(steady, baseline, 0.2), [])
+        self.assertEqual(len(compare(worse, baseline, 0.2)), 4)
+
+
+class SeedingTests(TestCase):
+    def rows(self):
+        return list(Job.objects.order_by("id").values_list(
+            "title", "company", "location", "category", "description", "application_count"
+        ))
+
+    @override_settings(BCRYPT_ROUNDS=4)
+    def test_same_seed_same_rows(self):
+        first = seed(jobs=40, applications_per_job=3, seed=7, chunk_size=40)
+        rows = self.rows()
+        Job.objects.all().delete()
+        User.objects.all().delete()
+        again = seed(jobs=40, applications_per_job=3, seed=7, chunk_size=40)
+        self.assertEqual(first, again)
+        self.assertEqual(self.rows(), rows)
+        self.assertEqual(len({row[4] for row in rows}), 40)
+        self.assertEqual(sum(row[5] for row in rows), JobApplication.objects.count())
+
+    @override_settings(BCRYPT_ROUNDS=4)
+    def test_users_share_one_password_hash(self):
+        seed(jobs=20, users=5, applications_per_job=0, chunk_size=2)
+        self.assertEqual(User.objects.values("password").distinct().count(), 1)
+        self.assertTrue(User.objects.first().check_password(SEED_PASSWORD))
+        self.assertFalse(JobApplication.objects.exists())
+
+
+class LoadTestSummaryTests(TestCase):
+    def test_percentiles_and_throughput(self):
+        result = summarize([i / 1000 for i in range(1, 101)], errors=2, seconds=2)
+        self.assertEqual(result["requests"], 102)
+        self.assertEqual(result["requests_per_second"], 50.0)
+        self.assertEqual((result["p50_ms"], result["p95_ms"], result["p99_ms"]), (50.0, 95.0, 99.0))
+
+
+class QueryPlanTests(TestCase):
+    """
+        EXPLAIN the hot queries and fail if any of them regresses to a full
+        table scan or an extra sort step.
+    """
+    def assertUsesIndex(self, queryset):
+        if connection.vendor == "mysql":
+            plan = queryset.explain(format="json")
+            self.assertNotIn('"access_type": "ALL"', plan, plan)
+            self.assertNotIn('"using_filesort": true', plan, plan)
+        elif connection.vendor == "sqlite":
+            plan = queryset.explain()
+            for line in plan.splitlines():
+                if "SCAN" in line:
+                    self.assertIn("INDEX", line, plan)
+            self.assertNotIn("TEMP B-TREE", plan, plan)
+        else:
+            self.skipTest(f"No plan check for {connection.vendor}")
+
+    def test_hot_queries_use_indexes(self):
+        user = create_user("johndoe")
+        job = create_job(user)
+        cursor = encode_cursor(job.date_created, job.id)
+
+        self.assertUsesIndex(keyset_window(job_values(), None, 25))
+        self.assertUsesIndex(keyset_window(job_values(), cursor, 25))
+        self.assertUsesIndex(Job.objects.filter(category_ref_id=job.category_ref_id).order_by("-date_created")[:25])
+        self.assertUsesIndex(Job.objects.filter(posted_by=user).order_by("-date_created")[:25])
+        self.assertUsesIndex(Job.objects.filter(date_updated__gte=job.date_updated))
+        self.assertUsesIndex(JobApplication.objects.filter(job=job, applicant=user))
+        self.assertUsesIndex(JobApplication.objects.filter(job=job))
+        self.assertUsesIndex(keyset_window(JobApplication.objects.filter(applicant=user), cursor, 25))
+        self.assertUsesIndex(User.objects.filter(username="johndoe"))
+        self.assertUsesIndex(JobFacet.objects.filter(facet="company", count__gt=0).order_by("-count", "value")[:10])
+        self.assertUsesIndex(Job.objects.filter(Area.from_params({"near": "Maputo"}).condition()))
+        self.assertUsesIndex(User.objects.filter(email="johndoe@example.com"))
@@ -1,15 +1,27 @@
 from django.urls import path
+from . import async_views
 from .views import LoginUserAPIView, RegisterUserAPIView, JobsAPIView, JobDetailAPIView, \
     JobApplicationDetailAPIView, JobApplicationsByOwnerAPIView, CreateJobApplicationAPIView, \
-    SearchJobsAPIView
+    SearchJobsAPIView, CacheStatsAPIView, ImportJobsAPIView, ExportAPIView, OwnerDashboardAPIView, \
+    MetricsAPIView, ApplicantApplicationsAPIView
 
 urlpatterns = [
     path('auth/login', LoginUserAPIView.as_view(), name='login'),
     path('auth/register_user', RegisterUserAPIView.as_view(), name='register_user'),
     path('jobs', JobsAPIView.as_view(), name='jobs'),
+    path('jobs/import', ImportJobsAPIView.as_view(), name='import_jobs'),
     path('jobs/<int:job_id>', JobDetailAPIView.as_view(), name='job_detail'),
     path('jobs/<int:job_id>/apply', CreateJobApplicationAPIView.as_view(), name='apply_for_job'),
     path('jobs/<int:job_id>/applications/owner', JobApplicationsByOwnerAPIView.as_view(), name='applications_for_job_owner'),
+    path('applications/mine', ApplicantApplicationsAPIView.as_view(), name='my_applications'),
     path('applications/<int:application_id>', JobApplicationDetailAPIView.as_view(), name='application_detail'),
+    path('dashboard/jobs', OwnerDashboardAPIView.as_view(), name='owner_dashboard'),
     path('search', SearchJobsAPIView.as_view(), name='search_jobs'),
+    path('export/<str:resource>', ExportAPIView.as_view(), name='export'),
+    path('async/jobs', async_views.jobs_list, name='async_jobs'),
+    path('async/jobs/<int:job_id>', async_views.job_detail, name='async_job_detail'),
+    path('async/jobs/<int:job_id>/applications/owner', async_views.job_applications_by_owner, name='async_applications_for_job_owner'),
+    path('async/search', async_views.search_jobs, name='async_search_jobs'),
+    path('cache/stats', CacheStatsAPIView.as_view(), name='cache_stats'),
+    path('metrics', MetricsAPIView.as_view(), name='metrics'),
 ]
@@ -1,22 +1,36 @@
 from rest_framework.views import APIView
-from django.db.models import Q
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth.hashers import make_password, check_password
-from .serializers import UserSchema, LoginSchema, JobSchema, JobApplicaitonSchema
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.contrib.auth.hashers import make_password
+from .serializers import UserSchema, LoginSchema, JobSchema, JobApplicaitonSchema, \
+    APPLICANT_APPLICATION_VALUES, DASHBOARD_VALUES, FieldSelectionError, JobFieldset, \
+    applicant_application_row_to_dict, application_row_to_dict, dashboard_row_to_dict, serialize_applications
 from .models import User, Job, JobApplication
+from .pagination import PaginationError, get_page_number, get_page_size, paginate_by_keyset
+from .search import SearchQuery
+from .facets import FacetError, requested_facets
+from .geo import GeoError
+from .exporter import CONTENT_TYPES as EXPORT_CONTENT_TYPES, ExportError, export, export_filename, parse_since
+from .authentication import issue_tokens, user_names
+from .hashers import LoginBusy, verify_password
+from .importer import ImportFormatError, decode_lines, format_from_content_type, import_jobs, iter_records
+from .cache import applicant_list_key, cache_stats, get_or_set
+from .reads import job_detail, jobs_page, search_facets, search_page
+from .conditional import job_etag, job_last_modified, jobs_etag, jobs_last_modified, \
+    application_etag, application_last_modified
+from .metrics import registry as metrics_registry
 from datetime import datetime
+import hmac
 import logging
 
-# Set up logger
+# Handlers, format and level come from settings.LOGGING
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-handler = logging.StreamHandler()
-handler.setLevel(logging.DEBUG)
-logger.addHandler(handler)
 
 
 """
@@ -30,9 +44,9 @@ class RegisterUserAPIView(APIView):
             
             try:
                 data = UserSchema(**request.data)
-                logger.debug(f"RegisterUserAPIView: Data validated: {data}")
+                logger.debug("RegisterUserAPIView: Data validated for username %s", data.username)
             except Exception as validation_error:
-                logger.error(f"Validation Error: {validation_error.errors()}")
+                logger.error("Validation Error: %s", validation_error.errors(include_input=False))
                 return Response({
                     "success": False,
                     "message": "Validation errors occurred.",
@@ -48,7 +62,7 @@ class RegisterUserAPIView(APIView):
                     password=make_password(data.password),
                     date_created=datetime.now()
                 )
-                logger.info(f"User created successfully: {user.username}")
+                logger.info("User created successfully: %s", user.username)
                 return Response({
                     "success": True,
                     "message": "User registered successfully!",
@@ -56,7 +70,7 @@ class RegisterUserAPIView(APIView):
                 }, status=status.HTTP_201_CREATED)
                 
             except Exception as db_error:
-                logger.error(f"Database Error: {db_error}")
+                logger.error("Database Error: %s", db_error)
                 return Response({
                     "success": False,
                     "message": "An error occurred while creating the user.",
@@ -64,7 +78,7 @@ class RegisterUserAPIView(APIView):
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         except Exception as e:
-            logger.error(f"Internal Server Error: {e}", exc_info=True)
+            logger.error("Internal Server Error: %s", e, exc_info=True)
             return Response({
                 "success": False,
                 "message": "An unexpected error occurred. Please try again later.",
@@ -81,7 +95,7 @@ class LoginUserAPIView(APIView):
             try:
                 data = LoginSchema(**request.data)
             except Exception as validation_error:
-                logger.error(f"Validation Error: {validation_error.errors()}")
+                logger.error("Validation Error: %s", validation_error.errors(include_input=False))
                 return Response({
                     "success": False,
                     "message": "Validation errors occurred.",
@@ -92,14 +106,20 @@ class LoginUserAPIView(APIView):
             password = data.password
             
             try:
-                if '@' in identifier:
-                    user = User.objects.filter(email=identifier).first()
-                else:
-                    user = User.objects.filter(username=identifier).first()
+                # Single lookup on a unique index, fetching only what login needs
+                lookup = {"email": identifier} if '@' in identifier else {"username": identifier}
+                user = User.objects.only(
+                    "id", "username", "password", "is_active", "first_name", "other_names"
+                ).filter(**lookup).first()
+                
+                # bcrypt runs on the bounded hashing pool; outdated hashes are upgraded
+                is_correct, new_password = verify_password(password, user.password) if user else (False, None)
+                if is_correct and new_password:
+                    User.objects.filter(id=user.id).update(password=new_password)
                 
-                if user and check_password(password, user.password):
-                    refresh = RefreshToken.for_user(user)
-                    logger.info(f"LoginUserAPIView: Login successfully for user: {user.username}")
+                if is_correct:
+                    refresh = issue_tokens(user)
+                    logger.info("LoginUserAPIView: Login successfully for user: %s", user.username)
                     return Response({
                         "success": True,
                         "message": "Login successfully!",
@@ -112,8 +132,14 @@ class LoginUserAPIView(APIView):
                         "success": False,
                         "message": "Invalid username or password!"
                     }, status=status.HTTP_401_UNAUTHORIZED)
+            except (LoginBusy, TimeoutError) as busy_error:
+                logger.warning("LoginUserAPIView: Login rejected, hashing pool saturated: %s", busy_error)
+                return Response({
+                    "success": False,
+                    "message": "Too many login attempts at the moment. Please try again shortly."
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "1"})
             except Exception as db_error:
-                logger.error(f"LoginUserAPIView: Database Error during login: {db_error}")
+                logger.error("LoginUserAPIView: Database Error during login: %s", db_error)
                 return Response({
                     "success": False,
                     "message": "An error occurred while authenticating the user.",
@@ -121,7 +147,7 @@ class LoginUserAPIView(APIView):
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         except Exception as e:
-            logger.error(f"LoginUserAPIView: Internal Server Error: {e}", exc_info=True)
+            logger.error("LoginUserAPIView: Internal Server Error: %s", e, exc_info=True)
             return Response({
                 "success": False,
                 "message": "An unexpected error occurred. Please try again later.",
@@ -139,15 +165,26 @@ class JobsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     """
-        Retrieve all jobs.
+        Retrieve jobs, newest first, one keyset page at a time.
     """
+    @method_decorator(condition(etag_func=jobs_etag, last_modified_func=jobs_last_modified))
     def get(self, request):
         try:
             logger.info("JobsAPIView: Get jobs request received.")
-            jobs = Job.objects.all()
-            jobs_list = [job.to_dict() for job in jobs]
             
-            if len(jobs_list) == 0:
+            try:
+                page_size = get_page_size(request.query_params)
+                cursor = request.query_params.get("cursor")
+                fieldset = JobFieldset.from_params(request.query_params)
+                page = jobs_page(cursor, page_size, fieldset)
+            except (PaginationError, FieldSelectionError) as params_error:
+                logger.info("JobsAPIView: Invalid query parameters: %s", params_error)
+                return Response({
+                    "success": False,
+                    "message": str(params_error)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            if page is None:
                 logger.info("JobsAPIView: Jobs not found!")
                 return Response({
                     "success": False,
@@ -158,11 +195,12 @@ class JobsAPIView(APIView):
             return Response({
                 "success": True, 
                 "message": "Jobs found successfully!",
-                "data": jobs_list
+                "data": page["data"],
+                "next": page["next"]
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"JobsAPIView: Error retrieving jobs: {e}")
+            logger.error("JobsAPIView: Error retrieving jobs: %s", e)
             return Response({
                 "success": False, 
                 "message": "An unexpected error occurred. Please try again later."
@@ -177,10 +215,10 @@ class JobsAPIView(APIView):
             
             try:
                 data = JobSchema(**request.data)
-                logger.debug(f"JobsAPIView: Data validated: {data}")
+                logger.debug("JobsAPIView: Data validated: %s", data)
                 
             except Exception as validation_error:
-                logger.error(f"Validation Error: {str(validation_error.errors())}")
+                logger.error("Validation Error: %s", validation_error.errors(include_input=False))
                 return Response({
                     "success": False,
                     "message": "Validation errors occurred.",
@@ -189,23 +227,27 @@ class JobsAPIView(APIView):
                 
             # Check authenticated user
             if not isinstance(request.user, User):
-                logger.error(f"Authenticated user is not a valid User instance: {request.user}")
+                logger.error("Authenticated user is not a valid User instance: %s", request.user)
                 return Response({
                     "success": False,
                     "message": "Authentication error. User is not valid."
                 }, status=status.HTTP_401_UNAUTHORIZED)
 
-            logger.debug(f"Authenticated user: {request.user} (ID: {request.user.id})")
+            logger.debug("Authenticated user: %s (ID: %s)", request.user, request.user.id)
                 
-            job = Job.objects.create(
-                title=data.title,
-                company=data.company,
-                location=data.location,
-                description=data.description,
-                category=data.category,
-                posted_by=request.user,
-                date_created=datetime.now()
-            )
+            # The job and the tasks its signals queue commit together
+            with transaction.atomic():
+                job = Job.objects.create(
+                    title=data.title,
+                    company=data.company,
+                    location=data.location,
+                    description=data.description,
+                    category=data.category,
+                    latitude=data.latitude,
+                    longitude=data.longitude,
+                    posted_by=request.user,
+                    date_created=datetime.now()
+                )
             return Response({
                 "success": True, 
                 "message": "Job created successfully!", 
@@ -213,7 +255,7 @@ class JobsAPIView(APIView):
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            logger.error(f"JobsAPIView: Internal Server Error: {e}", exc_info=True)
+            logger.error("JobsAPIView: Internal Server Error: %s", e, exc_info=True)
             return Response({
                 "success": False,
                 "message": "An unexpected error occurred. Please try again later.",
@@ -221,32 +263,80 @@ class JobsAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# API to bulk import jobs from a JSON Lines or CSV stream
+class ImportJobsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        logger.info("ImportJobsAPIView: Bulk import request received.")
+        try:
+            try:
+                import_format = format_from_content_type(request.content_type)
+                batch_size = int(request.query_params.get("batch_size", settings.JOB_IMPORT_BATCH_SIZE))
+            except (ImportFormatError, ValueError) as request_error:
+                logger.info("ImportJobsAPIView: Invalid import request: %s", request_error)
+                return Response({
+                    "success": False,
+                    "message": str(request_error)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Read the raw request stream line by line instead of request.data,
+            # so the upload is never held in memory as a whole
+            records = iter_records(decode_lines(request._request), import_format)
+            report = import_jobs(records, posted_by=request.user, batch_size=batch_size)
+
+            logger.info("ImportJobsAPIView: Imported %s job(s), %s row(s) failed.", report.created, report.failed)
+            return Response({
+                "success": report.failed == 0,
+                "message": f"Imported {report.created} job(s), {report.failed} row(s) failed.",
+                "data": report.to_dict()
+            }, status=status.HTTP_201_CREATED if report.created else status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            logger.error("ImportJobsAPIView: Internal Server Error: %s", e, exc_info=True)
+            return Response({
+                "success": False,
+                "message": "An unexpected error occurred. Please try again later."
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class JobDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     """
         Retrieve details of a specific job.
     """
+    @method_decorator(condition(etag_func=job_etag, last_modified_func=job_last_modified))
     def get(self, request, job_id):
         try:
-            logger.info(f"JobDetailAPIView: GET /jobs/{job_id} - Retrieving job details")
-            job = Job.objects.filter(id=job_id).first()
+            logger.info("JobDetailAPIView: GET /jobs/%s - Retrieving job details", job_id)
+
+            try:
+                fieldset = JobFieldset.from_params(request.query_params)
+            except FieldSelectionError as fields_error:
+                logger.info("JobDetailAPIView: GET /jobs/%s - Invalid query parameters: %s", job_id, fields_error)
+                return Response({
+                    "success": False,
+                    "message": str(fields_error)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            job_dict = job_detail(job_id, fieldset)
             
-            if not job:
-                logger.info(f"JobDetailAPIView: GET /jobs/{job_id} - Job not found!")
+            if not job_dict:
+                logger.info("JobDetailAPIView: GET /jobs/%s - Job not found!", job_id)
                 return Response({
                     "success": False, 
                     "message": "Job not found!"
                 }, status=status.HTTP_404_NOT_FOUND)
                 
-            logger.info(f"JobDetailAPIView: GET /jobs/{job_id} - Retrieved job details: {job.to_dict()}.")
+            logger.info("JobDetailAPIView: GET /jobs/%s - Retrieved job details.", job_id)
             return Response({
                 "success": True, 
-                "data": job.to_dict()
+                "data": job_dict
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"JobDetailAPIView: Error retrieving job details: {e}")
+            logger.error("JobDetailAPIView: Error retrieving job details: %s", e)
             return Response({
                 "success": False, 
                 "message": "AAn unexpected error occurred. Please try again later."
@@ -258,11 +348,11 @@ class JobDetailAPIView(APIView):
     """
     def put(self, request, job_id):
         try:
-            logger.info(f"JobDetailAPIView: PUT /jobs/{job_id} - Updating job details")
+            logger.info("JobDetailAPIView: PUT /jobs/%s - Updating job details", job_id)
             job = Job.objects.filter(id=job_id).first()
             
             if not job:
-                logger.info(f"JobDetailAPIView: PUT /jobs/{job_id} - Job not found!")
+                logger.info("JobDetailAPIView: PUT /jobs/%s - Job not found!", job_id)
                 return Response({
                     "success": False, 
                     "message": "Job not found!"
@@ -270,9 +360,10 @@ class JobDetailAPIView(APIView):
                 
             for attr, value in request.data.items():
                 setattr(job, attr, value)
-            job.save()
+            with transaction.atomic():
+                job.save()
             
-            logger.info(f"JobDetailAPIView: PUT /jobs/{job_id} - Job updated successfully: {job.to_dict()}.")
+            logger.info("JobDetailAPIView: PUT /jobs/%s - Job updated successfully.", job_id)
             return Response({
                 "success": True, 
                 "message": "Job updated successfully!", 
@@ -280,7 +371,7 @@ class JobDetailAPIView(APIView):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"JobDetailAPIView: Error updating job: {e}")
+            logger.error("JobDetailAPIView: Error updating job: %s", e)
             return Response({
                 "success": False, 
                 "message": "An unexpected error occurred. Please try again later."
@@ -292,25 +383,25 @@ class JobDetailAPIView(APIView):
     """
     def delete(self, request, job_id):
         try:
-            logger.info(f"JobDetailAPIView: DELETE /jobs/{job_id} - Deleting job.")
+            logger.info("JobDetailAPIView: DELETE /jobs/%s - Deleting job.", job_id)
             job = Job.objects.filter(id=job_id).first()
             
             if not job:
-                logger.info(f"JobDetailAPIView: DELETE /jobs/{job_id} - Job not found!")
+                logger.info("JobDetailAPIView: DELETE /jobs/%s - Job not found!", job_id)
                 return Response({
                     "success": False, 
                     "message": "Job not found!"
                 }, status=status.HTTP_404_NOT_FOUND)
             job.delete()
             
-            logger.info(f"JobDetailAPIView: DELETE /jobs/{job_id} - Job deleted successfully.")
+            logger.info("JobDetailAPIView: DELETE /jobs/%s - Job deleted successfully.", job_id)
             return Response({
                 "success": True, 
                 "message": "Job deleted successfully."
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"JobDetailAPIView: Error deleting job: {e}")
+            logger.error("JobDetailAPIView: Error deleting job: %s", e)
             return Response({
                 "success": False, 
                 "message": "An unexpected error occurred. Please try again later."
@@ -327,13 +418,13 @@ class CreateJobApplicationAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, job_id):
-        logger.info(f"CreateJobApplicationAPIView: POST /jobs/{job_id}/apply - Job application request received.")
+        logger.info("CreateJobApplicationAPIView: POST /jobs/%s/apply - Job application request received.", job_id)
         try:
-            # Validate job existence
-            job = Job.objects.filter(id=job_id).first()
+            # Validate job existence (only what the response and the owner check need)
+            job = Job.objects.only("id", "title", "company", "location", "posted_by_id").filter(id=job_id).first()
             
             if not job:
-                logger.info(f"CreateJobApplicationAPIView: POST /jobs/{job_id}/apply - Job not found!")
+                logger.info("CreateJobApplicationAPIView: POST /jobs/%s/apply - Job not found!", job_id)
                 return Response({
                     "success": False, 
                     "message": "Job not found!"
@@ -342,10 +433,10 @@ class CreateJobApplicationAPIView(APIView):
             # Validate request data
             try:
                 data = JobApplicaitonSchema(**request.data)
-                logger.debug(f"CreateJobApplicationAPIView: Data validated: {data}")
+                logger.debug("CreateJobApplicationAPIView: Data validated: %s", data)
                 
             except Exception as validation_error:
-                logger.error(f"Validation Error: {validation_error.errors()}")
+                logger.error("Validation Error: %s", validation_error.errors(include_input=False))
                 return Response({
                     "success": False,
                     "message": "Validation errors occurred.",
@@ -353,40 +444,66 @@ class CreateJobApplicationAPIView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
                 
             
-            if job.posted_by == request.user:
-                logger.info(f"CreateJobApplicationAPIView: The applicant can't apply to the job that they posted!")
+            if job.posted_by_id == request.user.id:
+                logger.info("CreateJobApplicationAPIView: The applicant can't apply to the job that they posted!")
                 return Response({
                     "success": False,
                     "message": "The applicant can't apply to the job that they posted!"
                 }, status=status.HTTP_409_CONFLICT)
             
-            # Ensure user hasn't already applied
-            existing_application = JobApplication.objects.filter(job=job, applicant=request.user).first()
-            
-            if existing_application:
-                logger.info(f"CreateJobApplicationAPIView: User {request.user.id} already applied for job {job_id}.")
-                return Response({
-                    "success": False,
-                    "message": "You have already applied for this job."
-                }, status=status.HTTP_409_CONFLICT)
-
-            # Create job application
-            application = JobApplication.objects.create(
-                job=job,
-                applicant=request.user,
-                cover_letter=data.cover_letter,
-                date_created=datetime.now()
-            )
+            # Insert directly and let the unique (job, applicant) constraint reject
+            # duplicates, so two concurrent submits can't both get through
+            try:
+                with transaction.atomic():
+                    # By id: assigning request.user would load the lazy JWT user's row
+                    application = JobApplication.objects.create(
+                        job=job,
+                        applicant_id=request.user.id,
+                        cover_letter=data.cover_letter
+                    )
+            except IntegrityError:
+                # Only the unique constraint means a duplicate: a foreign key fails
+                # when the job or the applicant was deleted since they were read
+                if JobApplication.objects.filter(job_id=job.id, applicant_id=request.user.id).exists():
+                    logger.info("CreateJobApplicationAPIView: User %s already applied for job %s.", request.user.id, job_id)
+                    return Response({
+                        "success": False,
+                        "message": "You have already applied for this job."
+                    }, status=status.HTTP_409_CONFLICT)
+                if not Job.objects.filter(id=job.id).exists():
+                    logger.info("CreateJobApplicationAPIView: POST /jobs/%s/apply - Job not found!", job_id)
+                    return Response({
+                        "success": False,
+                        "message": "Job not found!"
+                    }, status=status.HTTP_404_NOT_FOUND)
+                if not User.objects.filter(id=request.user.id).exists():
+                    logger.info("CreateJobApplicationAPIView: Applicant %s no longer exists.", request.user.id)
+                    return Response({
+                        "success": False,
+                        "message": "Authentication error. User is not valid."
+                    }, status=status.HTTP_401_UNAUTHORIZED)
+                raise
 
-            logger.info(f"CreateJobApplicationAPIView: Job application created successfully for job {job_id}.")
+            logger.info("CreateJobApplicationAPIView: Job application created successfully for job %s.", job_id)
+            first_name, other_names = user_names(request.user)
             return Response({
                 "success": True,
                 "message": "Application submitted successfully!",
-                "data": application.to_dict()
+                "data": application_row_to_dict({
+                    "id": application.id,
+                    "job__title": job.title,
+                    "job__company": job.company,
+                    "job__location": job.location,
+                    "applicant_id": request.user.id,
+                    "applicant__first_name": first_name,
+                    "applicant__other_names": other_names,
+                    "cover_letter": application.cover_letter,
+                    "date_created": application.date_created,
+                })
             }, status=status.HTTP_201_CREATED)
 
         except Exception as e:
-            logger.error(f"Error while creating job application: {e}", exc_info=True)
+            logger.error("Error while creating job application: %s", e, exc_info=True)
             return Response({
                 "success": False,
                 "message": "An internal error occurred. Please try again later."
@@ -399,29 +516,28 @@ class JobApplicationsByOwnerAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, job_id):
-        logger.info(f"JobApplicationsByOwnerAPIView: GET /jobs/{job_id}/applications/owner - Retrieving applications for job posted by user.")
+        logger.info("JobApplicationsByOwnerAPIView: GET /jobs/%s/applications/owner - Retrieving applications for job posted by user.", job_id)
         try:
             # Check if the job exists
-            job = Job.objects.filter(id=job_id).first()
+            job = Job.objects.only("id", "posted_by").filter(id=job_id).first()
             
             if not job:
-                logger.info(f"JobApplicationsByOwnerAPIView: GET /jobs/{job_id}/applications/owner - Job not found!")
+                logger.info("JobApplicationsByOwnerAPIView: GET /jobs/%s/applications/owner - Job not found!", job_id)
                 return Response({
                     "success": False, 
                     "message": "Job not found!"
                 }, status=status.HTTP_404_NOT_FOUND)
 
             # Check if the user requesting is the owner of the job
-            if job.posted_by != request.user:
-                logger.info(f"JobApplicationsByOwnerAPIView: Unauthorized access by user {request.user.id} for job {job_id} applications.")
+            if job.posted_by_id != request.user.id:
+                logger.info("JobApplicationsByOwnerAPIView: Unauthorized access by user %s for job %s applications.", request.user.id, job_id)
                 return Response({
                     "success": False,
                     "message": "You are not authorized to view applications for this job."
                 }, status=status.HTTP_403_FORBIDDEN)
 
             # Retrieve all applications for the job
-            applications = JobApplication.objects.filter(job=job)
-            applications_list = [app.to_dict() for app in applications]
+            applications_list = serialize_applications(JobApplication.objects.filter(job_id=job.id))
             
             if len(applications_list) == 0:
                 logger.info("JobApplicationsByOwnerAPIView: Job doesn't have applications yet!")
@@ -431,7 +547,7 @@ class JobApplicationsByOwnerAPIView(APIView):
                 }, status=status.HTTP_404_NOT_FOUND)
                 
 
-            logger.info(f"JobApplicationsByOwnerAPIView: Retrieved {len(applications_list)} applications successfully for job {job_id}.")
+            logger.info("JobApplicationsByOwnerAPIView: Retrieved %s applications successfully for job %s.", len(applications_list), job_id)
             return Response({
                 "success": True,
                 "message": "Job applications found successfully!",
@@ -439,7 +555,112 @@ class JobApplicationsByOwnerAPIView(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"JobApplicationsByOwnerAPIView: Error while retrieving applications for job {job_id}: {e}", exc_info=True)
+            logger.error("JobApplicationsByOwnerAPIView: Error while retrieving applications for job %s: %s", job_id, e, exc_info=True)
+            return Response({
+                "success": False,
+                "message": "An internal error occurred. Please try again later."
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# API to get application stats for all the jobs posted by the user
+class OwnerDashboardAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    """
+        One keyset page of the user's jobs with their denormalized application
+        counters, read from the (posted_by, date_created) index in one query.
+    """
+    def get(self, request):
+        logger.info("OwnerDashboardAPIView: GET /dashboard/jobs - Retrieving job stats for user %s.", request.user.id)
+        try:
+            try:
+                jobs, next_cursor = paginate_by_keyset(
+                    Job.objects.filter(posted_by_id=request.user.id).values(*DASHBOARD_VALUES),
+                    cursor=request.query_params.get("cursor"),
+                    page_size=get_page_size(request.query_params)
+                )
+            except PaginationError as pagination_error:
+                logger.info("OwnerDashboardAPIView: Invalid pagination parameters: %s", pagination_error)
+                return Response({
+                    "success": False,
+                    "message": str(pagination_error)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if not jobs:
+                logger.info("OwnerDashboardAPIView: User %s hasn't posted any jobs yet!", request.user.id)
+                return Response({
+                    "success": False,
+                    "message": "You haven't posted any jobs yet!"
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            logger.info("OwnerDashboardAPIView: Retrieved stats for %s jobs of user %s.", len(jobs), request.user.id)
+            return Response({
+                "success": True,
+                "message": "Job stats found successfully!",
+                "data": [dashboard_row_to_dict(job) for job in jobs],
+                "next": next_cursor
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error("OwnerDashboardAPIView: Error while retrieving job stats: %s", e, exc_info=True)
+            return Response({
+                "success": False,
+                "message": "An internal error occurred. Please try again later."
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# API to get the applications of the authenticated user (for applicants)
+class ApplicantApplicationsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    """
+        One keyset page of the user's own applications, newest first, with a
+        summary of each job joined in the same query and read from the
+        (applicant, date_created, id) index. Pages are cached per user until
+        they apply again or a job changes.
+    """
+    def get(self, request):
+        logger.info("ApplicantApplicationsAPIView: GET /applications/mine - Retrieving applications of user %s.", request.user.id)
+        try:
+            try:
+                page_size = get_page_size(request.query_params)
+                cursor = request.query_params.get("cursor")
+
+                def load_page():
+                    applications, next_cursor = paginate_by_keyset(
+                        JobApplication.objects.filter(applicant_id=request.user.id).values(*APPLICANT_APPLICATION_VALUES),
+                        cursor=cursor,
+                        page_size=page_size
+                    )
+                    return {"data": [applicant_application_row_to_dict(row) for row in applications], "next": next_cursor}
+
+                page = get_or_set(
+                    applicant_list_key(request.user.id, {"cursor": cursor or "", "page_size": page_size}), load_page
+                )
+            except PaginationError as pagination_error:
+                logger.info("ApplicantApplicationsAPIView: Invalid pagination parameters: %s", pagination_error)
+                return Response({
+                    "success": False,
+                    "message": str(pagination_error)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if not page["data"]:
+                logger.info("ApplicantApplicationsAPIView: User %s hasn't applied for any jobs yet!", request.user.id)
+                return Response({
+                    "success": False,
+                    "message": "You haven't applied for any jobs yet!"
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            logger.info("ApplicantApplicationsAPIView: Retrieved %s applications of user %s.", len(page["data"]), request.user.id)
+            return Response({
+                "success": True,
+                "message": "Job applications found successfully!",
+                "data": page["data"],
+                "next": page["next"]
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error("ApplicantApplicationsAPIView: Error while retrieving applications: %s", e, exc_info=True)
             return Response({
                 "success": False,
                 "message": "An internal error occurred. Please try again later."
@@ -450,28 +671,29 @@ class JobApplicationsByOwnerAPIView(APIView):
 class JobApplicationDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(condition(etag_func=application_etag, last_modified_func=application_last_modified))
     def get(self, request, application_id):
-        logger.info(f"JobApplicationDetailAPIView: GET /applications/{application_id} - Retrieving job application details.")
+        logger.info("JobApplicationDetailAPIView: GET /applications/%s - Retrieving job application details.", application_id)
         try:
             # Retrieve the application
-            application = JobApplication.objects.filter(id=application_id).first()
+            application = JobApplication.objects.select_related("job", "applicant").filter(id=application_id).first()
             
             if not application:
-                logger.info(f"JobApplicationDetailAPIView: GET /applications/{application_id} - Job application not found!")
+                logger.info("JobApplicationDetailAPIView: GET /applications/%s - Job application not found!", application_id)
                 return Response({
                     "success": False, 
                     "message": "Job application not found!"
                 }, status=status.HTTP_404_NOT_FOUND)
 
             # Check if the user is authorized to view the application
-            if application.job.posted_by != request.user and application.applicant != request.user:
-                logger.info(f"JobApplicationDetailAPIView: Unauthorized access to application {application_id} by user {request.user.id}.")
+            if application.job.posted_by_id != request.user.id and application.applicant_id != request.user.id:
+                logger.info("JobApplicationDetailAPIView: Unauthorized access to application %s by user %s.", application_id, request.user.id)
                 return Response({
                     "success": False,
                     "message": "You are not authorized to view this application."
                 }, status=status.HTTP_403_FORBIDDEN)
 
-            logger.info(f"JobApplicationDetailAPIView: Application details retrieved successfully for application {application_id}.")
+            logger.info("JobApplicationDetailAPIView: Application details retrieved successfully for application %s.", application_id)
             return Response({
                 "success": True,
                 "message": "Job application found successfully!",
@@ -479,7 +701,7 @@ class JobApplicationDetailAPIView(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"JobApplicationDetailAPIView: Error while retrieving application {application_id}: {e}", exc_info=True)
+            logger.error("JobApplicationDetailAPIView: Error while retrieving application %s: %s", application_id, e, exc_info=True)
             return Response({
                 "success": False,
                 "message": "An internal error occurred. Please try again later."
@@ -492,30 +714,27 @@ class JobApplicationDetailAPIView(APIView):
 class SearchJobsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(condition(etag_func=jobs_etag, last_modified_func=jobs_last_modified))
     def get(self, request):
         logger.info("SearchJobsAPIView: Search request received.")
 
         try:
-            # Retrieve query parameters
-            title = request.query_params.get("title")
-            company = request.query_params.get("company")
-            location = request.query_params.get("location")
-            keywords = request.query_params.get("keywords")
-
-            # Build query using Q objects for flexible filtering
-            query = Q()
-            if title:
-                query &= Q(title__icontains=title)
-            if company:
-                query &= Q(company__icontains=company)
-            if location:
-                query &= Q(location__icontains=location)
-            if keywords:
-                query &= Q(description__icontains=keywords)
-
-            # Fetch jobs based on the query
-            jobs = Job.objects.filter(query)
-            jobs_list = [job.to_dict() for job in jobs]
+            try:
+                page = get_page_number(request.query_params)
+                page_size = get_page_size(request.query_params)
+                fieldset = JobFieldset.from_params(request.query_params)
+                facet_columns, facet_size = requested_facets(request.query_params)
+                query = SearchQuery.from_params(request.query_params)
+            except (PaginationError, FieldSelectionError, FacetError, GeoError) as params_error:
+                logger.info("SearchJobsAPIView: Invalid query parameters: %s", params_error)
+                return Response({
+                    "success": False,
+                    "message": str(params_error)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            results = search_page(query, page, page_size, fieldset)
+            jobs_list = results["data"]
+            has_next = results["has_next"]
 
             if not jobs_list:
                 logger.info("SearchJobsAPIView: No jobs found matching search criteria.")
@@ -524,16 +743,88 @@ class SearchJobsAPIView(APIView):
                     "message": "No jobs found matching search criteria."
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            logger.info(f"SearchJobsAPIView: Found {len(jobs_list)} job(s) matching criteria.")
-            return Response({
+            payload = {
                 "success": True,
                 "message": "Jobs found successfully!",
-                "data": jobs_list
-            }, status=status.HTTP_200_OK)
+                "data": jobs_list,
+                "page": page,
+                "next_page": page + 1 if has_next else None
+            }
+            if facet_columns:
+                payload["facets"] = search_facets(query, facet_columns, facet_size)
+
+            logger.info("SearchJobsAPIView: Found %s job(s) matching criteria.", len(jobs_list))
+            return Response(payload, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"SearchJobsAPIView: Error during search: {e}", exc_info=True)
+            logger.error("SearchJobsAPIView: Error during search: %s", e, exc_info=True)
             return Response({
                 "success": False,
                 "message": "An unexpected error occurred during the search. Please try again later."
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+"""
+    Export API
+"""
+class ExportAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, resource):
+        logger.info("ExportAPIView: GET /export/%s - Export request received.", resource)
+        try:
+            try:
+                export_format = request.query_params.get("output", "jsonl")
+                compress = request.query_params.get("gzip", "").lower() in ("1", "true", "yes")
+                chunks = export(
+                    resource,
+                    export_format=export_format,
+                    since=parse_since(request.query_params.get("since")),
+                    compress=compress
+                )
+            except ExportError as export_error:
+                logger.info("ExportAPIView: Invalid export request: %s", export_error)
+                return Response({
+                    "success": False,
+                    "message": str(export_error)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            response = StreamingHttpResponse(
+                chunks,
+                content_type="application/gzip" if compress else EXPORT_CONTENT_TYPES[export_format]
+            )
+            filename = export_filename(resource, export_format, compress)
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+
+        except Exception as e:
+            logger.error("ExportAPIView: Error while exporting %s: %s", resource, e, exc_info=True)
+            return Response({
+                "success": False,
+                "message": "An unexpected error occurred. Please try again later."
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+"""
+    Cache API
+"""
+class CacheStatsAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "success": True,
+            "data": cache_stats()
+        }, status=status.HTTP_200_OK)
+
+
+# Prometheus scrape endpoint for the request metrics of this process
+class MetricsAPIView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        token = getattr(settings, "METRICS_TOKEN", "")
+        if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+        return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")